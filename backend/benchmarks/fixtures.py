@@ -0,0 +1,148 @@
+import io
+import os
+import wave
+import zlib
+import tempfile
+import numpy as np
+
+# Deterministic fixtures generated on the fly, so the suite needs no network and no checked-in binaries
+SAMPLE_RATE = 16000
+FIXTURE_SEED = 1234
+
+def speech_like_audio(seconds: float) -> np.ndarray:
+    """
+    Mono 16kHz float32 signal: amplitude-modulated harmonics with short pauses,
+    roughly shaped like speech so VAD and decoding do realistic work.
+    """
+    rng = np.random.default_rng(FIXTURE_SEED)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = (np.sin(2 * np.pi * 3 * t) > -0.3).astype(np.float32)
+    signal = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(t.size)
+    return signal.astype(np.float32)
+
+def wav_bytes(samples: np.ndarray) -> bytes:
+    pcm = (np.clip(samples, -1, 1) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        out.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+def encoded_audio(samples: np.ndarray, container: str) -> bytes:
+    """
+    Encodes samples as 48kHz mono opus in a webm or ogg container, like a browser MediaRecorder.
+    """
+    import av
+
+    pcm = (np.clip(samples, -1, 1) * 32767).astype(np.int16).reshape(1, -1)
+    frame = av.AudioFrame.from_ndarray(pcm, format="s16", layout="mono")
+    frame.sample_rate = SAMPLE_RATE
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=48000)
+
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format=container) as out:
+        stream = out.add_stream("libopus", rate=48000)
+        stream.layout = "mono"
+        for resampled in resampler.resample(frame) + resampler.resample(None) + [None]:
+            for packet in stream.encode(resampled):
+                out.mux(packet)
+    return buffer.getvalue()
+
+def spooled(data: bytes):
+    """
+    Wraps bytes in the kind of spool an UploadFile reads from.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spool.write(data)
+    spool.seek(0)
+    return spool
+
+RESUME_TEXT = (
+    "Senior software engineer with seven years of experience building distributed systems in Python and Go. "
+    "Designed event driven microservices on Kubernetes, led migration from a monolith to FastAPI services, "
+    "and built data pipelines with Kafka, Spark and PostgreSQL. Mentored junior engineers, owned on-call "
+    "rotations and improved p99 latency of the payments API by forty percent through caching and profiling. "
+)
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer to scale our real-time analytics platform. You will design REST and "
+    "streaming APIs, tune PostgreSQL and Redis, run services on Kubernetes, and collaborate with machine "
+    "learning engineers on model serving. Strong Python, observability and distributed systems skills required."
+)
+
+def write_pdf(path: str, pages: int, text: str = RESUME_TEXT):
+    """
+    Writes a minimal multi-page PDF with wrapped Helvetica text, without any PDF library.
+    """
+    words = text.split()
+    lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)] * 6
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for _ in range(pages):
+        body = "BT /F1 10 Tf 50 780 Td 14 TL " + " ".join(
+            f"({line.replace('(', '').replace(')', '')}) '" for line in lines
+        ) + " ET"
+        stream = zlib.compress(body.encode("latin-1"))
+        objects.append(f"<< /Length {len(stream)} /Filter /FlateDecode >>".encode("latin-1") + b"\nstream\n" + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents {content_id} 0 R "
+            f"/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(out.tell())
+        data = obj if isinstance(obj, bytes) else obj.encode("latin-1")
+        out.write(f"{number} 0 obj\n".encode() + data + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+    with open(path, "wb") as f:
+        f.write(out.getvalue())
+
+def write_docx(path: str, paragraphs: int, text: str = RESUME_TEXT):
+    from docx import Document
+
+    doc = Document()
+    for _ in range(paragraphs):
+        doc.add_paragraph(text)
+    doc.save(path)
+
+def face_frames(count: int, width: int = 640, height: int = 480) -> list:
+    """
+    JPEG-encoded frames containing a simple synthetic face (skin ellipse, eyes, nose),
+    with a small per-frame drift so tracking has something to follow.
+    """
+    import cv2
+
+    frames = []
+    for i in range(count):
+        img = np.full((height, width, 3), 60, dtype=np.uint8)
+        cx, cy = width // 2 + (i % 10) - 5, height // 2
+        cv2.ellipse(img, (cx, cy), (110, 145), 0, 0, 360, (150, 180, 225), -1)
+        for dx in (-45, 45):
+            cv2.circle(img, (cx + dx, cy - 35), 14, (255, 255, 255), -1)
+            cv2.circle(img, (cx + dx, cy - 35), 6, (40, 30, 20), -1)
+        cv2.line(img, (cx, cy - 20), (cx, cy + 25), (110, 140, 190), 4)
+        cv2.ellipse(img, (cx, cy + 65), (40, 14), 0, 0, 180, (60, 60, 170), 4)
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        frames.append(buf.tobytes())
+    return frames
+
+def fixture_dir() -> str:
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fixtures")
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,335 @@
+"""
+Offline micro-benchmarks for the backend's CPU hot paths.
+
+Usage (from the backend directory):
+    python -m benchmarks.run                         # run everything
+    python -m benchmarks.run -k transcribe decode    # only benchmarks whose name contains a filter
+    python -m benchmarks.run --save baseline.json    # store results
+    python -m benchmarks.run --compare baseline.json # report change vs. a saved run, fail on regressions
+
+No network is used: all fixtures are generated deterministically, LLM/TTS calls are not benchmarked, and
+benchmarks whose model isn't installed locally are skipped rather than downloading it.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import atexit
+import shutil
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import contextlib
+import statistics
+import subprocess
+import importlib.util
+from benchmarks import fixtures
+
+# Keep model warm-up and LLM caching out of the measurements
+os.environ.setdefault("MODEL_WARMUP", "0")
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+# Whisper models must already be in the Hugging Face cache; the workers inherit this
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+# Benchmarks import only the modules they measure; should one still pull in main (which opens the
+# SQLite stores and the face log), keep those files out of the working tree
+BENCH_DATA_DIR = tempfile.mkdtemp(prefix="mockai-bench-")
+atexit.register(shutil.rmtree, BENCH_DATA_DIR, ignore_errors=True)
+for variable, filename in (
+    ("EVALUATION_DB_PATH", "evaluation.db"),
+    ("SESSION_DB_PATH", "sessions.db"),
+    ("FACE_LOG_PATH", "face_confidence_log.jsonl"),
+    ("RESUME_CACHE_PATH", "resume_cache.db"),
+):
+    os.environ.setdefault(variable, os.path.join(BENCH_DATA_DIR, filename))
+
+BENCHMARKS = []
+
+# Engines and sockets opened by benchmarks, closed when the run ends
+CLEANUP = contextlib.ExitStack()
+atexit.register(CLEANUP.close)
+
+class SkipBenchmark(Exception):
+    """
+    Raised by a benchmark's setup when a dependency or model it needs isn't installed.
+    """
+
+def require(module: str):
+    if importlib.util.find_spec(module) is None:
+        raise SkipBenchmark(f"{module} is not installed")
+
+_loop = None
+
+def run_async(coro):
+    """
+    Runs a coroutine on one event loop kept for the whole run, as the server does, so engine
+    state bound to the loop (batch dispatcher, semaphores) carries over between iterations.
+    """
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        CLEANUP.callback(_loop.close)
+    return _loop.run_until_complete(coro)
+
+def benchmark(name: str, iterations: int, warmup: int = 1):
+    """
+    Registers a benchmark. The decorated function receives nothing and returns
+    (run, ops) where run() performs one iteration and ops is the work units per iteration.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, iterations, warmup, setup))
+        return setup
+    return register
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(name, iterations, warmup, setup) -> dict:
+    run, ops = setup()
+    for _ in range(warmup):
+        run()
+
+    gc.collect()
+    rss_before = peak_rss_mb()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "throughput_ops_s": round(iterations * ops / total, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "peak_rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+
+# ---------------------------------------------------------------- audio
+
+def _decode_case(container):
+    require("faster_whisper")
+    from scripts.utils.whisper_utils import decode_to_array
+
+    # Browsers record answers as opus in webm (Chrome) or ogg (Firefox)
+    data = fixtures.encoded_audio(fixtures.speech_like_audio(30), container)
+    return (lambda: decode_to_array(data, container)), 1
+
+@benchmark("audio_decode_webm_30s", iterations=20)
+def bench_audio_decode_webm():
+    return _decode_case("webm")
+
+@benchmark("audio_decode_ogg_30s", iterations=20)
+def bench_audio_decode_ogg():
+    return _decode_case("ogg")
+
+def _transcribe_case(seconds):
+    require("faster_whisper")
+    from fastapi import UploadFile
+    from faster_whisper.utils import download_model
+    from scripts.utils import whisper_utils
+    from scripts.utils.transcription_engine import engine
+
+    try:
+        download_model(whisper_utils.WHISPER_MODEL_SIZE, local_files_only=True)
+    except Exception:
+        raise SkipBenchmark(f"Whisper model {whisper_utils.WHISPER_MODEL_SIZE} is not in the local cache")
+
+    # Whole answer path: decode the upload spool, queue it on the worker pool, transcribe
+    CLEANUP.callback(engine.shutdown)
+    engine.warm_up()  # Workers load the model outside the timed loop
+    upload = UploadFile(file=fixtures.spooled(fixtures.encoded_audio(fixtures.speech_like_audio(seconds), "webm")),
+                        filename="answer.webm")
+    return (lambda: run_async(whisper_utils.transcribe_audio(upload))), seconds
+
+@benchmark("transcribe_audio_webm_5s", iterations=5)
+def bench_transcribe_short():
+    return _transcribe_case(5)
+
+@benchmark("transcribe_audio_webm_60s", iterations=3)
+def bench_transcribe_long():
+    return _transcribe_case(60)
+
+# ---------------------------------------------------------------- text
+
+@benchmark("extract_keywords", iterations=30)
+def bench_extract_keywords():
+    require("spacy")
+    require("en_core_web_sm")
+    from scripts.utils.nlp_utils import extract_keywords_from
+
+    texts = [fixtures.RESUME_TEXT * 8, fixtures.JOB_DESCRIPTION * 4]
+    return (lambda: extract_keywords_from(texts)), 1
+
+@benchmark("extract_text_from_pdf_20p", iterations=10)
+def bench_extract_pdf():
+    from scripts.utils.extraction_utils import extract_text_from_pdf
+
+    path = os.path.join(fixtures.fixture_dir(), "resume_20p.pdf")
+    fixtures.write_pdf(path, pages=20)
+    return (lambda: extract_text_from_pdf(path)), 20
+
+@benchmark("extract_text_from_docx", iterations=20)
+def bench_extract_docx():
+    from scripts.utils.extraction_utils import extract_text_from_docx
+
+    path = os.path.join(fixtures.fixture_dir(), "resume.docx")
+    fixtures.write_docx(path, paragraphs=60)
+    return (lambda: extract_text_from_docx(path)), 1
+
+# ---------------------------------------------------------------- face
+
+@benchmark("face_tracker_frame", iterations=100, warmup=5)
+def bench_face_tracker():
+    require("mediapipe")
+    from scripts.utils.frame_utils import decode_binary_frame
+    from scripts.utils.face_utils import FaceTracker, load_face_mesh_module
+
+    frames = fixtures.face_frames(100)
+    tracker = FaceTracker(load_face_mesh_module())
+    state = {"i": 0}
+
+    # The per-frame compute of a face worker, in-process: decode, downscaled ROI tracking, score
+    def run():
+        frame = decode_binary_frame(frames[state["i"] % len(frames)])
+        tracker.process(frame)
+        state["i"] += 1
+
+    return run, 1
+
+@benchmark("face_engine_analyze", iterations=100, warmup=5)
+def bench_face_engine():
+    require("mediapipe")
+    from scripts.utils.frame_utils import decode_binary_frame
+    from scripts.utils.face_engine import engine
+
+    frames = fixtures.face_frames(100)
+    CLEANUP.callback(engine.shutdown)
+    engine.warm_up()
+    state = {"i": 0}
+
+    # What the socket does per frame: decode, then score on the stream's pinned worker via shared memory
+    async def analyze():
+        frame = await asyncio.to_thread(decode_binary_frame, frames[state["i"] % len(frames)])
+        await engine.analyze("bench", frame)
+        state["i"] += 1
+
+    return (lambda: run_async(analyze())), 1
+
+@benchmark("face_confidence_socket", iterations=100, warmup=5)
+def bench_face_socket():
+    require("mediapipe")
+    from fastapi.testclient import TestClient
+    from main import app
+
+    frames = fixtures.face_frames(100)
+    socket = CLEANUP.enter_context(TestClient(app).websocket_connect("/face-confidence"))
+    state = {"i": 0}
+
+    # Full round trip through detect_face_confidence: one binary frame in, one score out
+    def run():
+        socket.send_bytes(frames[state["i"] % len(frames)])
+        socket.receive_json()
+        state["i"] += 1
+
+    return run, 1
+
+# ---------------------------------------------------------------- scoring
+
+@benchmark("face_log_append_average", iterations=2000, warmup=10)
+def bench_face_log():
+    from scripts.utils.face_log import FaceConfidenceStore
+
+    store = FaceConfidenceStore(persist=False)
+    return (lambda: (store.append("bench", 87.5), store.average("bench"))), 1
+
+@benchmark("calculate_total_score", iterations=5000, warmup=10)
+def bench_total_score():
+    from scripts.utils.scoring_utils import calculate_total_score
+
+    return (lambda: calculate_total_score(82.0, 7.4, 7.0, 8)), 1
+
+# ---------------------------------------------------------------- harness
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+def compare(results: dict, baseline_path: str, threshold: float) -> bool:
+    """
+    Prints p50 and throughput changes vs. a baseline. Returns False if any p50 regressed beyond threshold.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    ok = True
+    print(f"\n{'benchmark':32} {'p50 base':>10} {'p50 now':>10} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline or "p50_ms" not in result or "p50_ms" not in baseline[name]:
+            continue
+        before, after = baseline[name]["p50_ms"], result["p50_ms"]
+        change = (after - before) / before if before else 0
+        flag = "  REGRESSION" if change > threshold else ""
+        ok = ok and not flag
+        print(f"{name:32} {before:>10.3f} {after:>10.3f} {change:>+8.1%}{flag}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline backend micro-benchmarks")
+    parser.add_argument("-k", nargs="*", default=[], help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--save", help="write results JSON to this path")
+    parser.add_argument("--compare", help="compare against a previously saved results JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p50 regression tolerance for --compare")
+    args = parser.parse_args()
+
+    results = {}
+    for name, iterations, warmup, setup in BENCHMARKS:
+        if args.k and not any(k in name for k in args.k):
+            continue
+        try:
+            results[name] = measure(name, iterations, warmup, setup)
+            r = results[name]
+            print(f"{name:32} p50={r['p50_ms']:>9.3f}ms p90={r['p90_ms']:>9.3f}ms p99={r['p99_ms']:>9.3f}ms "
+                  f"{r['throughput_ops_s']:>10.2f} ops/s  rss={r['peak_rss_mb']}MB")
+        except SkipBenchmark as e:
+            results[name] = {"skipped": str(e)}
+            print(f"{name:32} SKIPPED: {e}")
+        except Exception as e:
+            results[name] = {"error": str(e)}
+            print(f"{name:32} ERROR: {e}")
+
+    if args.save:
+        report = {
+            "revision": git_revision(),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
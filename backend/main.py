@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+import asyncio
 import os
 
 # Ensure necessary directories exist for file uploads and static content
@@ -9,11 +11,53 @@ os.makedirs("static", exist_ok=True)
 
 # Define base directory and log file paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Root path of backend directory
-EVALUATION_LOG_PATH = os.path.join(BASE_DIR, "evaluation.json")  # Path for storing evaluation results
-FACE_LOG_PATH = os.path.join(BASE_DIR, "face_confidence_log.json")  # Path for logging face confidence data
+EVALUATION_DB_PATH = os.getenv("EVALUATION_DB_PATH", os.path.join(BASE_DIR, "evaluation.db"))  # SQLite database for evaluation results
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(BASE_DIR, "sessions.db"))  # Shared session store (SESSION_BACKEND=sqlite)
+FACE_LOG_PATH = os.getenv("FACE_LOG_PATH", os.path.join(BASE_DIR, "face_confidence_log.jsonl"))  # Optional append-only face confidence log
+
+# Structured JSON logs for the hot paths (level via LOG_LEVEL)
+from scripts.utils.log_utils import configure_logging
+configure_logging()
+
+# Per-session face confidence time series, shared by the WebSocket and scoring
+# (averages live in the session database when SESSION_BACKEND=sqlite)
+from scripts.utils.face_log import create_face_store
+face_store = create_face_store(FACE_LOG_PATH, SESSION_DB_PATH)
+
+# Evaluation results repository, shared by answer submission and reporting
+from scripts.utils.evaluation_store import EvaluationStore
+evaluation_store = EvaluationStore(EVALUATION_DB_PATH)
+
+# Per-candidate interview state; idle sessions also drop their in-memory face samples
+from scripts.utils.session_manager import create_session_manager
+session_manager = create_session_manager(SESSION_DB_PATH)
+session_manager.on_evict.append(face_store.reset)
+
+# Worker pools and models started with the app and stopped on shutdown
+from scripts.utils.transcription_engine import engine as transcription_engine
+from scripts.utils.extraction_utils import engine as extraction_engine
+from scripts.utils.face_engine import engine as face_engine
+from scripts.utils.audio_utils import backend as tts_backend
+from scripts.utils.model_registry import registry, MODEL_WARMUP
+
+# Load models in the background so the app accepts connections immediately
+# (/readyz reports when they're done), and periodically evict idle interview sessions
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MODEL_WARMUP:
+        app.state.model_warmup = asyncio.create_task(registry.warm_up())
+    app.state.session_eviction = asyncio.create_task(session_manager.run_eviction())
+    try:
+        yield
+    finally:
+        app.state.session_eviction.cancel()
+        transcription_engine.shutdown()
+        extraction_engine.shutdown()
+        face_engine.shutdown()
+        tts_backend.shutdown()
 
 # Initialize FastAPI app instance
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Set up CORS to allow cross-origin requests (required for frontend-backend communication)
 app.add_middleware(
@@ -33,10 +77,14 @@ from scripts.routes.play_question import router as play_router
 from scripts.routes.submit_answer import router as answer_router
 from scripts.routes.face_confidence import router as face_router
 from scripts.routes.interview_report import router as report_router
+from scripts.routes.answer_stream import router as answer_stream_router
+from scripts.routes.health import router as health_router
 
 # Register all route modules with the FastAPI app
 app.include_router(resume_router)
 app.include_router(play_router)
 app.include_router(answer_router)
 app.include_router(face_router)
-app.include_router(report_router)
\ No newline at end of file
+app.include_router(report_router)
+app.include_router(answer_stream_router)
+app.include_router(health_router)
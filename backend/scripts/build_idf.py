@@ -0,0 +1,65 @@
+"""
+Builds the IDF table used by nlp_utils.extract_keywords from a corpus of job descriptions.
+
+Usage:
+    python -m scripts.build_idf data/jd_corpus.txt data/idf.json
+
+The corpus is either a .jsonl file with a "text" (or "description") field per line,
+or a plain text file with one job description per line. data/idf.json is built from the
+bundled data/jd_corpus.txt (job descriptions across engineering, healthcare, sales, finance,
+trades and other fields, so everyday job-ad words are seen); rebuild it from a larger
+corpus for better weights.
+
+Document frequencies are counted over every cleaned word, not just POS-filtered candidates,
+so building the table doesn't need the spaCy model. IDF is only looked up for candidate
+terms at ranking time.
+"""
+import os
+import sys
+import json
+import math
+from collections import Counter
+from scripts.utils.nlp_utils import clean_text
+
+def read_corpus(path: str):
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                yield record.get("text") or record.get("description") or ""
+            else:
+                yield line
+
+def build_idf(documents, min_df: int = 1) -> dict:
+    """
+    Computes smoothed IDF, log((1 + n) / (1 + df)) + 1, for terms in at least min_df documents.
+
+    Keep min_df at 1 for small corpora: a term dropped from the table gets the unseen-term IDF,
+    the highest weight there is.
+    """
+    doc_freq = Counter()
+    n_docs = 0
+    for document in documents:
+        doc_freq.update({word for word in clean_text(document).split() if len(word) > 2})
+        n_docs += 1
+
+    idf = {
+        term: round(math.log((1 + n_docs) / (1 + df)) + 1, 4)
+        for term, df in doc_freq.items()
+        if df >= min_df
+    }
+    return {"n_docs": n_docs, "idf": idf}
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+
+    table = build_idf(read_corpus(sys.argv[1]))
+    os.makedirs(os.path.dirname(os.path.abspath(sys.argv[2])), exist_ok=True)
+    with open(sys.argv[2], "w") as f:
+        json.dump(table, f, separators=(",", ":"), sort_keys=True)
+    print(f"Wrote IDF for {len(table['idf'])} terms from {table['n_docs']} documents to {sys.argv[2]}")
@@ -0,0 +1,79 @@
+from fastapi import WebSocket, WebSocketDisconnect, APIRouter
+import json
+from scripts.utils.stream_utils import StreamingTranscriber
+from scripts.routes.submit_answer import score_answer
+from scripts.utils.session_manager import get_session_id
+from scripts.utils.metrics import ACTIVE_WEBSOCKETS
+from scripts.utils.log_utils import get_logger
+
+router = APIRouter()
+logger = get_logger("answer_stream")
+
+# WebSocket route for transcribing an answer while the candidate speaks
+@router.websocket("/answer-stream")
+async def answer_stream(websocket: WebSocket):
+    """
+    Protocol:
+    - Client sends {"type": "start", "question": "...", "format": "webm" | "ogg" | "pcm16"}
+    - Client streams audio chunks as binary messages while recording
+    - Server replies with {"type": "partial", "transcript": ..., "mispronounced_words": ...} as segments finish
+    - Client sends {"type": "stop"}; server transcribes the last segment, scores the answer
+      and replies with {"type": "final", "evaluation": {...}}
+    """
+    await websocket.accept()
+    ACTIVE_WEBSOCKETS.inc(endpoint="answer-stream")
+
+    session_id = get_session_id(websocket)
+    transcriber = None
+    question = ""
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes") is not None:
+                if transcriber is None:
+                    transcriber = StreamingTranscriber()
+                transcriber.add_chunk(message["bytes"])
+                if await transcriber.process():
+                    await websocket.send_json({
+                        "type": "partial",
+                        "transcript": transcriber.transcript,
+                        "mispronounced_words": transcriber.mispronounced_words,
+                    })
+                continue
+
+            data = json.loads(message.get("text") or "{}")
+
+            if data.get("type") == "start":
+                question = data.get("question", "")
+                if transcriber is not None:
+                    transcriber.close()
+                transcriber = StreamingTranscriber(data.get("format", "webm"))
+
+            elif data.get("type") == "stop":
+                if transcriber is None:
+                    await websocket.send_json({"type": "error", "detail": "No audio received."})
+                    continue
+
+                await transcriber.process(final=True)
+                evaluation = await score_answer(
+                    question, transcriber.transcript, transcriber.mispronounced_words, session_id
+                )
+                await websocket.send_json({"type": "final", "evaluation": evaluation})
+                transcriber = None
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("answer_stream_failed", extra={"session_id": session_id, "error": str(e)})
+        try:
+            await websocket.send_json({"type": "error", "detail": "Streaming transcription failed."})
+        except Exception:
+            pass
+    finally:
+        if transcriber is not None:
+            transcriber.close()
+        ACTIVE_WEBSOCKETS.dec(endpoint="answer-stream")
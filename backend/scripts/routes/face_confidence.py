@@ -1,106 +1,140 @@
 from fastapi import WebSocket, WebSocketDisconnect, APIRouter
-import base64, io, time, os, json
-import cv2
-import numpy as np
-from PIL import Image
-import mediapipe as mp
-from main import FACE_LOG_PATH
+import base64, time, json, uuid
+import asyncio
+from main import face_store
+from scripts.utils.session_manager import get_session_id
+from scripts.utils.face_engine import engine as face_engine
+from scripts.utils.metrics import ACTIVE_WEBSOCKETS, ERRORS, FACE_FRAMES, STAGE_SECONDS
+from scripts.utils.log_utils import get_logger
+from scripts.utils.frame_utils import decode_binary_frame, decode_encoded_frame
 
 router = APIRouter()
+logger = get_logger("face")
 
-FRAME_WIDTH = 640
-FRAME_HEIGHT = 600
-# Decode base64-encoded image from frontend
-async def decode_image(img_string):
+# Decode base64-encoded image from frontend (JSON fallback)
+def decode_image(img_string):
     try:
-        img_data = base64.b64decode(img_string.split(",")[1])
-        image = Image.open(io.BytesIO(img_data))
-        return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        img_data = base64.b64decode(img_string.split(",")[-1])
+        return decode_encoded_frame(img_data)
     except Exception as e:
-        print(f"Error decoding image: {e}")
+        logger.debug("frame_decode_failed", extra={"error": str(e)})
         return None
 
-# Append face confidence data to local JSON file with timestamp
-def append_face_confidence(conf):
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-    entry = {"timestamp": timestamp, "confidence": conf}
-    print(f"Logging confidence entry: {entry}")
-
-    try:
-        if not os.path.exists(FACE_LOG_PATH):
-            with open(FACE_LOG_PATH, "w") as f:
-                json.dump([entry], f, indent=2)
-        else:
-            with open(FACE_LOG_PATH, "r+") as f:
-                try:
-                    data = json.load(f)
-                except json.JSONDecodeError:
-                    print("Log file was empty or corrupted. Resetting.")
-                    data = []
-
-                data.append(entry)
-                f.seek(0)
-                json.dump(data, f, indent=2)
-    except Exception as e:
-        print(f"Error logging face confidence: {e}")
+def decode_message(message):
+    """
+    Decodes a received WebSocket message into an RGB frame.
+    Binary frames are preferred; JSON/base64 data URLs remain supported.
+    """
+    if message.get("bytes") is not None:
+        return decode_binary_frame(message["bytes"])
+
+    data = json.loads(message.get("text") or "{}")
+    if "image" not in data:
+        logger.debug("frame_missing_image")
+        return None
+    return decode_image(data["image"])
+
+class LatestFrame:
+    """
+    Single-slot mailbox holding only the newest unprocessed frame.
+    A frame that is replaced before it is processed counts as dropped.
+    """
+
+    def __init__(self):
+        self.message = None
+        self.closed = False
+        self.dropped = 0
+        self.processed = 0
+        self._ready = asyncio.Event()
+
+    def put(self, message):
+        if self.message is not None:
+            self.dropped += 1
+        self.message = message
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    async def get(self):
+        """
+        Waits for the next frame; returns None once the socket has closed.
+        """
+        await self._ready.wait()
+        self._ready.clear()
+        message, self.message = self.message, None
+        if message is None and self.closed:
+            return None
+        return message
 
 # WebSocket route for real-time face confidence detection
 @router.websocket("/face-confidence")
 async def detect_face_confidence(websocket: WebSocket):
     await websocket.accept()
-    print("WebSocket connected: face-confidence")
+    ACTIVE_WEBSOCKETS.inc(endpoint="face-confidence")
 
+    session_id = get_session_id(websocket)
+    stream_id = uuid.uuid4().hex  # FaceMesh tracking state is per connection
     last_logged_time = time.time()
+    slot = LatestFrame()
+    avg_process_time = None  # Exponential moving average, in seconds
 
-    try:
-        with mp.solutions.face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1) as face_mesh:
+    # Receive continuously so stale frames are replaced instead of queuing behind FaceMesh
+    async def receive_frames():
+        try:
             while True:
-                data = await websocket.receive_json()
-
-                if "image" not in data:
-                    print("No image key in received data.")
-                    continue
-
-                frame = await decode_image(data["image"])
-                if frame is None:
-                    print("Frame decoding failed.")
-                    continue
-
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = face_mesh.process(rgb)
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                slot.put(message)
+        finally:
+            slot.close()
 
-                face_confidence = 100.0
+    receiver = asyncio.create_task(receive_frames())
 
-                if results.multi_face_landmarks:
-                    landmarks = results.multi_face_landmarks[0].landmark
-                    nose_x = int(landmarks[1].x * FRAME_WIDTH)
-                    left_eye_x = int(landmarks[33].x * FRAME_WIDTH)
-                    right_eye_x = int(landmarks[263].x * FRAME_WIDTH)
-
-                    center_x = FRAME_WIDTH // 2
-                    deviation_x = abs(nose_x - center_x)
-                    max_deviation = FRAME_WIDTH // 3
-
-                    if deviation_x > max_deviation:
-                        face_confidence -= min((deviation_x / FRAME_WIDTH) * 100, 40)
-
-                    eye_distance = abs(left_eye_x - right_eye_x)
-                    expected_eye_distance = FRAME_WIDTH // 5
-                    tilt_penalty = min(abs(expected_eye_distance - eye_distance) / expected_eye_distance * 40, 30)
-                    face_confidence -= tilt_penalty
-
-                    face_confidence = max(min(face_confidence, 100), 0)
-                else:
-                    face_confidence = 0  # No face detected
-
-                # Log every 2 seconds
-                if time.time() - last_logged_time >= 2:
-                    append_face_confidence(face_confidence)
-                    last_logged_time = time.time()
-
-                await websocket.send_json({"face_confidence": face_confidence})
+    try:
+        while True:
+            message = await slot.get()
+            if message is None:
+                if slot.closed:
+                    break
+                continue
+
+            started = time.perf_counter()
+            frame = await asyncio.to_thread(decode_message, message)
+            if frame is None:
+                ERRORS.inc(stage="face_frame")
+                continue
+            face_confidence = await face_engine.analyze(stream_id, frame)
+            elapsed = time.perf_counter() - started
+
+            STAGE_SECONDS.observe(elapsed, stage="face_frame")
+            FACE_FRAMES.inc(outcome="processed")
+            slot.processed += 1
+            avg_process_time = elapsed if avg_process_time is None else 0.8 * avg_process_time + 0.2 * elapsed
+
+            # Log every 2 seconds
+            if time.time() - last_logged_time >= 2:
+                face_store.append(session_id, face_confidence)
+                last_logged_time = time.time()
+
+            # Report the achievable rate so the client can lower its capture fps under load
+            await websocket.send_json({
+                "face_confidence": face_confidence,
+                "server_fps": round(1 / max(avg_process_time, 1e-3), 1),
+                "processed": slot.processed,
+                "dropped": slot.dropped,
+            })
 
     except WebSocketDisconnect:
-        print("WebSocket disconnected.")
+        pass
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.error("face_socket_failed", extra={"session_id": session_id, "error": str(e)})
+    finally:
+        receiver.cancel()
+        await face_engine.release(stream_id)
+        face_store.flush(session_id)
+        ACTIVE_WEBSOCKETS.dec(endpoint="face-confidence")
+        FACE_FRAMES.inc(slot.dropped, outcome="dropped")
+        logger.info("face_session_closed", extra={"session_id": session_id, "processed": slot.processed, "dropped": slot.dropped})
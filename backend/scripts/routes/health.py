@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from scripts.utils.model_registry import registry
+from scripts.utils import metrics
+
+router = APIRouter()
+
+@router.get("/healthz")
+async def healthz():
+    """
+    Liveness: the process is up and serving requests.
+    """
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz():
+    """
+    Readiness: every registered model is loaded. Returns 503 until then,
+    with per-model load status and load times.
+    """
+    body = {"ready": registry.ready, "models": registry.status()}
+    return JSONResponse(body, status_code=200 if registry.ready else 503)
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """
+    Prometheus scrape endpoint: per-stage latency histograms, error and cache counters,
+    active WebSocket sessions and worker queue depths.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,61 +1,76 @@
-from fastapi import APIRouter
-import json
-from main import EVALUATION_LOG_PATH
-from scripts.utils.openai_utils import summarize_feedback_with_gpt
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import JSONResponse
+from main import evaluation_store
+from scripts.utils.session_manager import SESSION_HEADER, get_session_id
+from scripts.utils.report_summary import get_summary
+from scripts.routes.submit_answer import score_pending_answers
+from scripts.utils.log_utils import get_logger
 
 router = APIRouter()
+logger = get_logger("interview_report")
 
 @router.get("/interview-report")
-async def get_report():
+async def get_report(request: Request):
     """
     Returns the full interview evaluation log, average scores, and an AI-generated summary.
+
+    Averages come from running totals and the summary is cached per evaluation version, so it is
+    only regenerated when new answers arrive. Responses carry an ETag for that version; a matching
+    If-None-Match gets 304 Not Modified. Answers that couldn't be scored yet (judges unavailable)
+    are counted in `pending_answers` and left out of the averages; such reports are never cached.
     """
+    session_id = get_session_id(request)
+
+    # Score any answers queued in deferred mode before aggregating
+    try:
+        await score_pending_answers(session_id)
+    except Exception as e:
+        logger.error("deferred_scoring_failed", extra={"session_id": session_id, "error": str(e)})
+
     try:
-        with open(EVALUATION_LOG_PATH, "r") as f:
-            data = json.load(f)
-            if not data:
-                return {"message": "Evaluation log is empty."}
-    except FileNotFoundError:
-        print("Evaluation log file not found.")
-        return {"message": "No evaluations yet."}
-    except json.JSONDecodeError:
-        print("Evaluation log file is corrupted or not valid JSON.")
-        return {"message": "Evaluation log is corrupted."}
+        averages = evaluation_store.averages(session_id)
+        pending = evaluation_store.pending_count(session_id)
+        if not averages["total"]:
+            if pending:
+                return {"message": "Answers are still being scored. Please retry shortly.", "pending_answers": pending}
+            return {"message": "No evaluations yet."}
     except Exception as e:
-        print(f"Unexpected error reading evaluation log: {e}")
+        logger.error("evaluation_store_read_failed", extra={"session_id": session_id, "error": str(e)})
         return {"message": "An unexpected error occurred."}
 
-    total = len(data)
+    version = averages["version"]
+    etag = f'"{session_id}:{version}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": f"{SESSION_HEADER}, Cookie"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if not pending and etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")) \
+            and evaluation_store.summary(session_id, version) is not None:
+        return Response(status_code=304, headers=cache_headers)
 
-    # Safely compute all averages
-    def safe_avg(key):
-        return round(sum(d.get(key, 0) for d in data) / total, 2)
+    data = evaluation_store.list(session_id)
 
+    # Averages are maintained incrementally as answers are stored
     summary = {
-        "average_clarity_score": safe_avg("clarity_score"),
-        "average_technical_score": safe_avg("technical_score"),
-        "average_structure_score": safe_avg("structure_score"),
-        "average_face_confidence": safe_avg("face_confidence"),
-        "average_pronunciation_score": safe_avg("pronunciation_score"),
-        "average_final_score": safe_avg("final_score"),
+        "average_clarity_score": averages["clarity_score"],
+        "average_technical_score": averages["technical_score"],
+        "average_structure_score": averages["structure_score"],
+        "average_face_confidence": averages["face_confidence"],
+        "average_pronunciation_score": averages["pronunciation_score"],
+        "average_final_score": averages["final_score"],
     }
 
-    # Collect GPT and Claude feedback only if available
-    gpt_feedbacks = [
-        entry["feedback"]["gpt"]
-        for entry in data
-        if "feedback" in entry and "gpt" in entry["feedback"]
-    ]
-    claude_feedbacks = [
-        entry["feedback"]["claude"]
-        for entry in data
-        if "feedback" in entry and "claude" in entry["feedback"]
-    ]
-
-    overall_feedback = summarize_feedback_with_gpt(gpt_feedbacks, claude_feedbacks)
-
-    return {
+    overall_feedback = await get_summary(session_id, version)
+
+    body = {
         "evaluations": data,
         "summary": summary,
         "overall_feedback": overall_feedback,
+        "pending_answers": pending,
     }
+    if overall_feedback is None:
+        # Don't let clients cache a report without its summary
+        body["overall_feedback"] = "Unable to generate summary due to an error."
+        return body
+    if pending:
+        # Unscored answers will change the report once they're scored
+        return body
+    return JSONResponse(body, headers=cache_headers)
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 import os
 import re
-from scripts.utils.audio_utils import text_to_speech
+import json
+import asyncio
+from scripts.utils.audio_utils import cached_speech, stream_speech, backend as tts_backend
+from scripts.utils.session_manager import get_session_id
+from main import session_manager
+from scripts.utils.log_utils import get_logger
 
 router = APIRouter()
+logger = get_logger("play_question")
+
+# How long /play-question waits for a question that is still being generated
+QUESTION_WAIT_TIMEOUT_S = 60
 
 def clean_question(raw_question: str) -> str:
     """
@@ -22,34 +32,89 @@ def clean_question(raw_question: str) -> str:
     return question.strip()
 
 @router.get("/play-question")
-async def play_question():
+async def play_question(request: Request):
     """
-    Returns the next question from session state along with the TTS audio URL.
+    Returns the next question from the caller's session state along with the TTS audio URL.
+
+    If the question was already pre-rendered, audio_url points at the cached file; otherwise
+    it points at the streaming endpoint so playback can start while synthesis continues.
+    If the next question is still being generated, waits for it to arrive.
     """
     try:
-        from scripts.routes.upload_resume import session_state
+        session_id = get_session_id(request)
+        deadline = asyncio.get_running_loop().time() + QUESTION_WAIT_TIMEOUT_S
 
-        if session_state["current_index"] >= len(session_state["questions"]):
-            return {"message": "No more questions."}
+        def take_next(state):
+            # Claims the next question atomically, so concurrent requests never get the same one
+            index = state["current_index"]
+            if index < len(state["questions"]):
+                state["current_index"] += 1
+                return index, state["questions"][index], True
+            return None, None, state.get("generating")
 
-        raw_question = session_state["questions"][session_state["current_index"]]
-        question_text = clean_question(raw_question)
+        while True:
+            index, question, generating = session_manager.update(session_id, take_next)
+            if index is not None:
+                question_text = clean_question(question)
+                break
 
-        filename = f"question_{session_state['current_index'] + 1}.mp3"
-        path = text_to_speech(question_text, filename)
+            if not generating or asyncio.get_running_loop().time() >= deadline:
+                return {"message": "No more questions."}
 
-        if not path or not os.path.exists(path):
-            print(f"[ERROR] Audio file not created: {filename}")
-            raise HTTPException(status_code=500, detail="Failed to generate question audio.")
+            await session_manager.wait_for_update(session_id, timeout=1)
+
+        # Usually already pre-rendered in the background after upload
+        path = cached_speech(question_text)
 
-        session_state["current_index"] += 1
         BASE_URL = os.getenv("BASE_URL", "https://mockai-mqnl.onrender.com")
+        stream_url = f"{BASE_URL}/question-audio-stream?session_id={session_id}&index={index}"
 
         return {
-            "audio_url": f"{BASE_URL}/static/{filename}",
+            "audio_url": f"{BASE_URL}/static/{os.path.basename(path)}" if path else stream_url,
+            "stream_url": stream_url,
             "question_text": question_text
         }
 
     except Exception as e:
-        print(f"[ERROR] play-question failed: {e}")
+        logger.error("play_question_failed", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail="Internal server error while playing question.")
+
+@router.get("/question-audio-stream")
+async def question_audio_stream(request: Request, index: int):
+    """
+    Streams a question's audio sentence by sentence as it is synthesized.
+    Takes the session id as a query parameter so it can be used directly as an <audio> src.
+    """
+    session_state = session_manager.get(get_session_id(request))
+
+    if not 0 <= index < len(session_state["questions"]):
+        raise HTTPException(status_code=404, detail="Question not found.")
+
+    question_text = clean_question(session_state["questions"][index])
+    return StreamingResponse(stream_speech(question_text), media_type=tts_backend.media_type)
+
+@router.get("/questions-stream")
+async def questions_stream(request: Request):
+    """
+    Server-Sent Events feed of the session's questions: one "question" event per question
+    as soon as it is generated, then a "done" event.
+    """
+    session_id = get_session_id(request)
+
+    async def events():
+        sent = 0
+        while True:
+            session_state = session_manager.get(session_id)
+            for index in range(sent, len(session_state["questions"])):
+                payload = {"index": index, "question": clean_question(session_state["questions"][index])}
+                yield f"event: question\ndata: {json.dumps(payload)}\n\n"
+            sent = len(session_state["questions"])
+
+            if not session_state.get("generating"):
+                yield f"event: done\ndata: {json.dumps({'total_questions': sent})}\n\n"
+                return
+            if await request.is_disconnected():
+                return
+            await session_manager.wait_for_update(session_id, timeout=1)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,79 +1,176 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request
+import uuid
 from scripts.utils.whisper_utils import transcribe_audio
-from scripts.utils.openai_utils import evaluate_with_chatgpt, evaluate_with_claude
+from scripts.utils.transcription_engine import TranscriptionQueueFull
+from scripts.utils.openai_utils import evaluate_answer, evaluate_answers_batch
 from scripts.utils.scoring_utils import get_average_face_confidence, calculate_total_score
-from main import EVALUATION_LOG_PATH
-import os
-import json
+from main import evaluation_store, face_store, session_manager
+from scripts.utils.session_manager import DEFAULT_SESSION, get_session_id
+from scripts.utils.report_summary import prefetch_summary
+from scripts.utils.metrics import ERRORS, track_stage
+from scripts.utils.log_utils import get_logger
 
 router = APIRouter()
+logger = get_logger("submit_answer")
 
-@router.post("/submit-answer")
-async def evaluate_response(file: UploadFile = File(...), question: str = Form(...)):
+def build_evaluation(question: str, transcript: str, mispronounced_words: list, face_conf: float,
+                     gpt_result: dict, claude_result: dict):
     """
-    Evaluates a submitted interview answer:
-    - Transcribes audio using Whisper
-    - Evaluates response using GPT and Claude
-    - Scores clarity, technical depth, structure, pronunciation, and face confidence
-    - Stores evaluation results to a local JSON log
+    Combines the judges' scores with pronunciation and face confidence into one evaluation record.
+    Judges that failed or missed the deadline are left out rather than counted as zeros;
+    `judges` records which ones contributed.
+
+    Returns None when no judge produced a score, so the answer can stay queued instead of
+    being stored (and averaged into the report) with zero scores.
     """
-    try:
-        transcript, mispronounced_words = await transcribe_audio(file)
+    results = {"gpt": gpt_result, "claude": claude_result}
+    judged = {name: r for name, r in results.items() if not r.get("failed")}
+    if not judged:
+        return None
+
+    def average(key):
+        return round(sum(r[key] for r in judged.values()) / len(judged), 2)
+
+    clarity = average("clarity")
+    tech = average("technical_depth")
+    structure = average("structure")
 
-        gpt_result = evaluate_with_chatgpt(question, transcript)
-        claude_result = evaluate_with_claude(question, transcript)
+    answer_score = round((clarity * 0.3 + tech * 0.4 + structure * 0.3), 2)
+    pronunciation_score = max(2, 10 - len(mispronounced_words))
 
-        clarity = round((gpt_result["clarity"] + claude_result["clarity"]) / 2, 2)
-        tech = round((gpt_result["technical_depth"] + claude_result["technical_depth"]) / 2, 2)
-        structure = round((gpt_result["structure"] + claude_result["structure"]) / 2, 2)
+    final_score = calculate_total_score(face_conf, answer_score, clarity, pronunciation_score)
 
-        answer_score = round((clarity * 0.3 + tech * 0.4 + structure * 0.3), 2)
-        pronunciation_score = max(2, 10 - len(mispronounced_words))
-        face_conf = get_average_face_confidence()
+    return {
+        "question": question,
+        "transcription": transcript,
+        "clarity_score": clarity,
+        "technical_score": tech,
+        "structure_score": structure,
+        "answer_score": answer_score,
+        "pronunciation_score": pronunciation_score,
+        "face_confidence": face_conf,
+        "final_score": final_score,
+        "mispronounced_words": mispronounced_words,
+        "judges": list(judged),
+        "feedback": {name: r["feedback"] for name, r in judged.items()},
+    }
 
-        final_score = calculate_total_score(face_conf, answer_score, clarity, pronunciation_score)
+async def score_answer(question: str, transcript: str, mispronounced_words: list, session_id: str = DEFAULT_SESSION):
+    """
+    Scores a transcribed answer and stores the result in the evaluation store.
+    Shared by the upload (/submit-answer) and streaming (/answer-stream) paths.
+
+    In deferred scoring mode the answer is only queued; it is scored in a batch
+    when the interview report is requested.
+    """
+    face_conf = get_average_face_confidence(face_store, session_id)
+    pending_answer = {
+        "question": question,
+        "transcription": transcript,
+        "mispronounced_words": mispronounced_words,
+        "face_confidence": face_conf,
+    }
 
-        output = {
+    if session_manager.get(session_id).get("scoring_mode") == "deferred":
+        evaluation_store.add_pending(session_id, pending_answer)
+        return {
+            "message": "Answer recorded. It will be scored in the interview report.",
             "question": question,
             "transcription": transcript,
-            "clarity_score": clarity,
-            "technical_score": tech,
-            "structure_score": structure,
-            "answer_score": answer_score,
-            "pronunciation_score": pronunciation_score,
-            "face_confidence": face_conf,
-            "final_score": final_score,
             "mispronounced_words": mispronounced_words,
-            "feedback": {
-                "gpt": gpt_result["feedback"],
-                "claude": claude_result["feedback"],
-            }
         }
 
-        # Write to evaluation log
-        try:
-            if not os.path.exists(EVALUATION_LOG_PATH):
-                with open(EVALUATION_LOG_PATH, "w") as f:
-                    json.dump([output], f, indent=2)
-            else:
-                with open(EVALUATION_LOG_PATH, "r+") as f:
-                    try:
-                        data = json.load(f)
-                    except json.JSONDecodeError:
-                        print("Evaluation log was empty or corrupted. Reinitializing.")
-                        data = []
+    with track_stage("evaluation"):
+        gpt_result, claude_result = await evaluate_answer(question, transcript)
+    output = build_evaluation(question, transcript, mispronounced_words, face_conf, gpt_result, claude_result)
 
-                    data.append(output)
-                    f.seek(0)
-                    json.dump(data, f, indent=2)
+    # No judge answered (outage or deadline): queue it to be scored when the report is requested
+    if output is None:
+        ERRORS.inc(stage="evaluation_unscored")
+        evaluation_store.add_pending(session_id, pending_answer)
+        logger.warning("evaluation_unscored", extra={"session_id": session_id})
+        return {
+            "message": "Answer recorded. Scoring is temporarily unavailable; it will be scored in the interview report.",
+            "unscored": True,
+            "question": question,
+            "transcription": transcript,
+            "mispronounced_words": mispronounced_words,
+        }
 
-            print(f"[INFO] Evaluation log written to: {EVALUATION_LOG_PATH}")
+    # Write to evaluation store
+    try:
+        with track_stage("evaluation_store_write"):
+            evaluation_store.add(session_id, output)
+        logger.debug("evaluation_stored", extra={"session_id": session_id})
+    except Exception as store_error:
+        logger.error("evaluation_store_failed", extra={"session_id": session_id, "error": str(store_error)})
+    else:
+        # Last answer of the interview: have the report summary ready before the Results page asks
+        state = session_manager.get(session_id)
+        questions = state.get("questions") or []
+        if questions and not state.get("generating") and evaluation_store.averages(session_id)["total"] >= len(questions):
+            prefetch_summary(session_id)
 
-        except Exception as file_error:
-            print(f"[ERROR] Failed to write to evaluation log: {file_error}")
+    return output
 
-        return output
+async def score_pending_answers(session_id: str) -> int:
+    """
+    Scores all of a session's queued answers with one multi-answer prompt per provider.
+    Answers no judge could score stay queued for the next report request.
+
+    The answers are claimed in the evaluation store first, so a concurrent report request
+    in another worker process skips them instead of scoring them a second time.
+
+    Returns:
+        int: Number of answers scored.
+    """
+    async with session_manager.lock(session_id):
+        claim_id = uuid.uuid4().hex
+        pending = evaluation_store.claim_pending(session_id, claim_id)
+        if not pending:
+            return 0
+
+        try:
+            answers = [answer for _, answer in pending]
+            with track_stage("evaluation_batch"):
+                gpt_results, claude_results = await evaluate_answers_batch(
+                    [(a["question"], a["transcription"]) for a in answers]
+                )
+
+            scored = []
+            for (pending_id, a), gpt, claude in zip(pending, gpt_results, claude_results):
+                output = build_evaluation(
+                    a["question"], a["transcription"], a["mispronounced_words"], a["face_confidence"], gpt, claude
+                )
+                if output is not None:
+                    scored.append((pending_id, output))
+        except BaseException:
+            evaluation_store.release_claim(claim_id)
+            raise
+
+        stored = evaluation_store.resolve_claim(session_id, claim_id, scored)
+        logger.info("pending_answers_scored", extra={
+            "session_id": session_id, "count": stored, "unscored": len(pending) - stored,
+        })
+        return stored
+
+@router.post("/submit-answer")
+async def evaluate_response(request: Request, file: UploadFile = File(...), question: str = Form(...)):
+    """
+    Evaluates a submitted interview answer:
+    - Transcribes audio using Whisper
+    - Evaluates response using GPT and Claude concurrently
+    - Scores clarity, technical depth, structure, pronunciation, and face confidence
+    - Stores evaluation results in the SQLite evaluation store
+    """
+    try:
+        transcript, mispronounced_words = await transcribe_audio(file)
+        return await score_answer(question, transcript, mispronounced_words, get_session_id(request))
 
+    except TranscriptionQueueFull as e:
+        ERRORS.inc(stage="transcription_queue_full")
+        logger.warning("transcription_queue_full", extra={"error": str(e)})
+        raise HTTPException(status_code=503, detail="Server is busy transcribing other answers. Please retry shortly.")
     except Exception as e:
-        print(f"[ERROR] Failed to process answer: {e}")
+        logger.error("submit_answer_failed", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail="Evaluation failed.")
@@ -1,121 +1,200 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from scripts.utils.openai_utils import generate_questions
-from scripts.utils.nlp_utils import extract_keywords
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, Response
+from scripts.utils.openai_utils import generate_questions_stream
+from scripts.utils.nlp_utils import extract_keywords_from
+from scripts.utils.audio_utils import prerender_speech
+from scripts.utils.extraction_utils import ExtractionError, UploadTooLarge, spool_upload, engine as extraction_engine
+from scripts.utils.resume_cache import RESUME_CACHE_QUESTIONS, resume_cache, resume_key
+from scripts.routes.play_question import clean_question
+import asyncio
+import uuid
 import os
-import pdfplumber
-from docx import Document
-import json
-from main import EVALUATION_LOG_PATH, FACE_LOG_PATH
-import glob
+from main import evaluation_store, face_store, session_manager
+from scripts.utils.session_manager import DEFAULT_SESSION, SESSION_COOKIE, SCORING_MODE, get_session_id
+from scripts.utils.log_utils import get_logger
 
 router = APIRouter()
+logger = get_logger("upload_resume")
 
-# In-memory session tracking
-session_state = {
-    "questions": [],
-    "current_index": 0  # Start from 0 always
-}
+# Strong references to fire-and-forget tasks so they aren't garbage collected mid-run
+background_tasks = set()
 
-def reset_interview_logs():
-    """
-    Clears previous evaluation data:
-    - evaluation.json
-    - face_confidence_log.json
-    - generated MP3 question files
-    """
-    try:
-        with open(EVALUATION_LOG_PATH, "w") as f:
-            json.dump([], f)
-        with open(FACE_LOG_PATH, "w") as f:
-            json.dump([], f)
-        print("Cleared evaluation and face confidence logs.")
-    except Exception as e:
-        print(f"Error clearing log files: {e}")
-
-    # Remove old question audio files
-    mp3_files = glob.glob(os.path.join("static", "question_*.mp3"))
-    for file_path in mp3_files:
-        try:
-            os.remove(file_path)
-            print(f"Removed: {file_path}")
-        except Exception as e:
-            print(f"Failed to delete {file_path}: {e}")
-
-def extract_text_from_pdf(file_path: str) -> str:
+# How long /upload-resume waits for the first streamed question before responding
+FIRST_QUESTION_TIMEOUT_S = 60
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+async def publish_questions(session_id: str, generation_id: str, resume: str, jd: str, keywords, num_questions: int,
+                            cache_key: str = None):
     """
-    Extracts text from a PDF file using pdfplumber.
+    Streams questions from the model into the session as each one is completed,
+    starting its TTS render right away so question 1 is playable while later ones are generated.
+    The set is saved under cache_key in the resume cache only if the stream completed
+    without errors and produced exactly num_questions questions.
     """
-    text = ""
+    async def update(mutate):
+        def apply(state):
+            # A newer upload for this session supersedes this generation
+            if state.get("generation_id") != generation_id:
+                return False
+            mutate(state)
+            return True
+
+        if not session_manager.update(session_id, apply):
+            return False
+        session_manager.notify(session_id)
+        return True
+
+    questions = []
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        print("PDF text extracted successfully.")
+        async for question in generate_questions_stream(resume, jd, keywords, num_questions=num_questions,
+                                                         raise_errors=True):
+            if not await update(lambda state: state["questions"].append(question)):
+                return
+            questions.append(question)
+            run_in_background(prerender_speech([clean_question(question)]))
+
+        if cache_key and len(questions) == num_questions:
+            resume_cache.set_questions(cache_key, num_questions, questions)
     except Exception as e:
-        print(f"Error reading PDF: {e}")
-        raise HTTPException(status_code=400, detail=f"PDF read error: {str(e)}")
-    return text
+        # Keep the questions published so far, but don't cache an incomplete set
+        logger.warning("question_generation_failed", extra={
+            "session_id": session_id, "published": len(questions), "error": str(e),
+        })
+    finally:
+        await update(lambda state: state.update(generating=False))
 
-def extract_text_from_docx(file_path: str) -> str:
+def reset_interview_logs(session_id: str):
     """
-    Extracts text from a DOCX file using python-docx.
+    Clears a session's previous evaluation data:
+    - stored evaluations
+    - face confidence samples
+
+    Question audio lives in the shared content-addressed TTS cache and is not deleted here.
     """
     try:
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        evaluation_store.clear(session_id)
+        face_store.reset(session_id)
+        logger.debug("session_logs_cleared", extra={"session_id": session_id})
     except Exception as e:
-        print(f"Error reading DOCX: {e}")
-        raise HTTPException(status_code=400, detail="DOCX read error.")
+        logger.error("session_logs_clear_failed", extra={"session_id": session_id, "error": str(e)})
 
 @router.post("/upload-resume")
 async def upload_resume(
+    request: Request,
+    response: Response,
     file: UploadFile = File(...), 
     job_description: str = Form(...), 
-    num_questions: int = Form(2)
+    num_questions: int = Form(2),
+    scoring_mode: str = Form(SCORING_MODE)
 ):
     """
     Accepts resume file and job description, extracts keywords,
     and generates a set of interview questions.
+
+    scoring_mode is "realtime" (score each answer on submit) or "deferred" (batch-score
+    all answers when the report is requested).
+
+    Starts a new session unless the client already sent one; the session id is returned
+    in the body and as a cookie, and must accompany later requests.
     """
-    reset_interview_logs()
+    if scoring_mode not in ("realtime", "deferred"):
+        raise HTTPException(status_code=400, detail="scoring_mode must be 'realtime' or 'deferred'.")
 
+    # python-docx only reads DOCX, so legacy Word .doc files are rejected along with other types
     extension = os.path.splitext(file.filename)[1].lower()
-    file_path = os.path.join("uploads", file.filename)
+    if extension not in (".pdf", ".docx"):
+        raise HTTPException(status_code=415, detail="Unsupported file type. Please upload a PDF or DOCX.")
 
-    # Save uploaded file
+    session_id = get_session_id(request)
+    if session_id == DEFAULT_SESSION:
+        session_id = session_manager.create()
+    reset_interview_logs(session_id)
+
+    # Spool uploaded file to disk in chunks, stored under the hash of its content
     try:
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-        print(f"File saved at: {file_path}")
+        file_path, file_hash = await spool_upload(file, "uploads", extension)
+        logger.debug("upload_saved", extra={"path": file_path})
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        print(f"Failed to save uploaded file: {e}")
+        logger.error("upload_save_failed", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail="Failed to save uploaded file.")
 
-    # Extract text from uploaded resume
-    if extension == ".pdf":
-        text = extract_text_from_pdf(file_path)
-    elif extension in [".docx", ".doc"]:
-        text = extract_text_from_docx(file_path)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or DOCX.")
+    # A resume + JD seen before skips extraction, keyword ranking and (if allowed) question generation
+    cache_key = resume_key(file_hash, job_description)
+    cached = resume_cache.get(cache_key)
+    if cached is not None:
+        cached_questions = cached["questions"].get(str(num_questions)) if RESUME_CACHE_QUESTIONS else None
+        return await start_interview(
+            session_id, response, cached["text"], job_description, cached["keywords"],
+            num_questions, scoring_mode, cache_key, cached_questions,
+        )
+
+    # Extract text from uploaded resume in the extraction worker pool (or reuse it from an upload with another JD)
+    try:
+        text = resume_cache.text_for_file(file_hash)
+        if text is None:
+            text = await extraction_engine.extract(file_path, extension)
+        logger.debug("resume_extracted", extra={"chars": len(text)})
+    except ExtractionError as e:
+        logger.warning("resume_extraction_failed", extra={"format": extension, "error": str(e)})
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("resume_extraction_failed", extra={"format": extension, "error": str(e)})
+        detail = f"PDF read error: {str(e)}" if extension == ".pdf" else "DOCX read error."
+        raise HTTPException(status_code=400, detail=detail)
 
     if not text.strip():
         raise HTTPException(status_code=400, detail="No readable text found in resume.")
 
-    # Extract keywords and generate interview questions
-    keywords = extract_keywords(text + job_description)
-    questions = generate_questions(text, job_description, keywords, num_questions=num_questions)
+    keywords = extract_keywords_from([text, job_description])
+    resume_cache.set(cache_key, file_hash, file_path, text, keywords)
+
+    return await start_interview(
+        session_id, response, text, job_description, keywords, num_questions, scoring_mode, cache_key
+    )
+
+async def start_interview(session_id: str, response: Response, text: str, job_description: str, keywords,
+                          num_questions: int, scoring_mode: str, cache_key: str, cached_questions: list = None):
+    """
+    Resets the session's interview state and fills it with questions: the cached set if one is
+    given, otherwise questions streamed from the model in the background.
+    Responds once the first question exists.
+    """
+    generation_id = uuid.uuid4().hex
+
+    session_manager.update(session_id, lambda state: state.update(
+        questions=list(cached_questions or []),
+        current_index=0,
+        scoring_mode=scoring_mode,
+        generating=not cached_questions,
+        generation_id=generation_id,
+    ))
+
+    if cached_questions:
+        run_in_background(prerender_speech([clean_question(q) for q in cached_questions]))
+    else:
+        run_in_background(
+            publish_questions(session_id, generation_id, text, job_description, keywords, num_questions, cache_key)
+        )
 
-    for i, q in enumerate(questions, 1):
-        print(f"Q{i}: {q}")
+    # Respond as soon as the first question exists; the rest keep arriving via
+    # /questions-stream (SSE) or are awaited by /play-question
+    deadline = asyncio.get_running_loop().time() + FIRST_QUESTION_TIMEOUT_S
+    state = session_manager.get(session_id)
+    while not state["questions"] and state["generating"] and asyncio.get_running_loop().time() < deadline:
+        await session_manager.wait_for_update(session_id, timeout=1)
+        state = session_manager.get(session_id)
 
-    session_state["questions"] = questions
-    session_state["current_index"] = 0
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
 
     return {
-        "message": "Questions generated successfully",
-        "total_questions": len(questions),
-        "questions": questions
+        "message": "Questions generated successfully" if not state["generating"] else "Question generation started",
+        "session_id": session_id,
+        "total_questions": len(state["questions"]) if not state["generating"] else num_questions,
+        "questions": state["questions"]
     }
@@ -1,34 +1,318 @@
 import os
-from gtts import gTTS
+import io
+import re
+import time
+import wave
+import struct
+import asyncio
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from scripts.utils.metrics import CACHE_REQUESTS, track_stage
+from scripts.utils.log_utils import get_logger
 
-# Directory to store generated MP3s
+# Directory to store generated audio
 STATIC_DIR = "static"
 os.makedirs(STATIC_DIR, exist_ok=True)
 
-def text_to_speech(text: str, filename: str) -> str:
+# TTS engine: "gtts" (Google, needs network) or "pyttsx3" (local, offline)
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts")
+TTS_NUM_WORKERS = int(os.getenv("TTS_NUM_WORKERS", "2"))
+
+# Cache bounds (overridable via environment)
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+TTS_CACHE_MAX_AGE_S = float(os.getenv("TTS_CACHE_MAX_AGE_S", str(7 * 24 * 60 * 60)))
+TTS_PRERENDER_CONCURRENCY = int(os.getenv("TTS_PRERENDER_CONCURRENCY", "4"))
+
+# Renders currently in progress, keyed by cache key, so concurrent requests share one synthesis
+_inflight = {}
+
+class GTTSBackend:
+    """
+    Google Text-to-Speech; `voice` is the gTTS top-level domain, which selects the accent.
+    """
+    name = "gtts"
+    extension = "mp3"
+    media_type = "audio/mpeg"
+    default_voice = "com"
+
+    def synthesize(self, text: str, lang: str, voice: str) -> bytes:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, tld=voice, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    def shutdown(self):
+        pass
+
+    def join(self, chunks: list) -> bytes:
+        # MP3 streams are frame-based, so concatenated clips play back as one file
+        return b"".join(chunks)
+
+# pyttsx3 engine owned by the current TTS worker process
+_worker_engine = None
+
+def _init_pyttsx3_worker():
+    global _worker_engine
+    import pyttsx3
+    _worker_engine = pyttsx3.init()
+
+def _pyttsx3_render(text: str, voice: str) -> bytes:
+    if _worker_engine is None:
+        _init_pyttsx3_worker()
+    if voice:
+        _worker_engine.setProperty("voice", voice)
+
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        _worker_engine.save_to_file(text, path)
+        _worker_engine.runAndWait()
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+class Pyttsx3Backend:
+    """
+    Offline synthesis with pyttsx3 in a pool of worker processes, each owning one engine
+    (pyttsx3 engines are neither thread-safe nor shareable). `voice` is a pyttsx3 voice id.
+    """
+    name = "pyttsx3"
+    extension = "wav"
+    media_type = "audio/wav"
+    default_voice = os.getenv("PYTTSX3_VOICE", "")
+
+    def __init__(self, num_workers: int = TTS_NUM_WORKERS):
+        self.num_workers = num_workers
+        self._executor = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the worker pool on first use. Renders run in several threads at once,
+        so creation is locked to make sure only one pool is ever started.
+        """
+        if self._executor is None:
+            with self._start_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.num_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_pyttsx3_worker,
+                    )
+        return self._executor
+
+    def synthesize(self, text: str, lang: str, voice: str) -> bytes:
+        return self.start().submit(_pyttsx3_render, text, voice).result()
+
+    def shutdown(self):
+        with self._start_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def join(self, chunks: list) -> bytes:
+        params, frames = None, []
+        for chunk in chunks:
+            params, data = read_wav(chunk)
+            frames.append(data)
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as out:
+            out.setparams(params)
+            out.writeframes(b"".join(frames))
+        return buffer.getvalue()
+
+def read_wav(data: bytes):
+    """
+    Returns (params, raw PCM frames) of a WAV clip.
+    """
+    with wave.open(io.BytesIO(data), "rb") as clip:
+        return clip.getparams(), clip.readframes(clip.getnframes())
+
+def wav_stream_header(params) -> bytes:
+    """
+    WAV header with unknown (maximal) length, so PCM can follow as it is produced.
+    """
+    byte_rate = params.framerate * params.nchannels * params.sampwidth
+    block_align = params.nchannels * params.sampwidth
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, params.nchannels, params.framerate,
+                                byte_rate, block_align, params.sampwidth * 8)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+_backends = {"gtts": GTTSBackend, "pyttsx3": Pyttsx3Backend}
+backend = _backends[TTS_BACKEND]()
+
+logger = get_logger("tts")
+
+def split_sentences(text: str) -> list:
+    return [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s]
+
+def audio_cache_key(text: str, lang: str = "en", voice: str = None) -> str:
+    """
+    Content hash of everything that affects the synthesized audio.
     """
-    Converts the given text into an MP3 audio file using Google Text-to-Speech.
-    
-    If the file already exists, it will be reused.
+    voice = backend.default_voice if voice is None else voice
+    return hashlib.sha256(f"{backend.name}\x00{lang}\x00{voice}\x00{text}".encode("utf-8")).hexdigest()[:32]
+
+def audio_cache_path(text: str, lang: str = "en", voice: str = None) -> str:
+    return os.path.join(STATIC_DIR, f"tts_{audio_cache_key(text, lang, voice)}.{backend.extension}")
+
+def _write_atomic(file_path: str, data: bytes):
+    # Unique temp file per write: the same clip can be rendered by several threads of one process
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates owner-only files; cached audio is served as static
+        os.replace(tmp_path, file_path)  # Never serve a half-written file
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _synthesize(text: str, lang: str, voice: str) -> bytes:
+    with track_stage("tts"):
+        return backend.synthesize(text, lang, voice)
+
+def text_to_speech(text: str, lang: str = "en", voice: str = None) -> str:
+    """
+    Converts the given text into an audio file using the configured TTS backend.
+
+    Files are content-addressed by backend, text, language and voice, so a cached file is
+    only reused when it was rendered from exactly the same input.
 
     Args:
         text (str): The text to convert to speech.
-        filename (str): The desired filename for the audio file.
+        lang (str): Language code.
+        voice (str): Backend-specific voice (defaults to the backend's default voice).
 
     Returns:
-        str: Path to the generated or reused MP3 file, or None if failed.
+        str: Path to the generated or reused audio file, or None if failed.
     """
-    file_path = os.path.join(STATIC_DIR, filename)
+    voice = backend.default_voice if voice is None else voice
+    file_path = audio_cache_path(text, lang, voice)
 
     if os.path.exists(file_path):
-        print(f"[INFO] Reusing existing audio: {file_path}")
+        os.utime(file_path)  # Mark as recently used for LRU eviction
+        CACHE_REQUESTS.inc(cache="tts", result="hit")
         return file_path
 
+    CACHE_REQUESTS.inc(cache="tts", result="miss")
     try:
-        tts = gTTS(text=text, lang="en", slow=False)
-        tts.save(file_path)
-        print(f"[INFO] Audio saved: {file_path}")
+        _write_atomic(file_path, _synthesize(text, lang, voice))
+        logger.debug("audio_saved", extra={"path": file_path})
         return file_path
     except Exception as e:
-        print(f"[ERROR] Failed to generate speech: {e}")
+        logger.error("speech_failed", extra={"error": str(e)})
         return None
+
+def cached_speech(text: str, lang: str = "en", voice: str = None):
+    """
+    Returns the cached audio path for text if it has already been rendered, else None.
+    """
+    file_path = audio_cache_path(text, lang, voice)
+    return file_path if os.path.exists(file_path) else None
+
+async def stream_speech(text: str, lang: str = "en", voice: str = None):
+    """
+    Yields audio bytes sentence by sentence, so playback can start before the whole text is synthesized.
+    All sentences are synthesized concurrently and emitted in order; the joined result is then cached.
+    """
+    voice = backend.default_voice if voice is None else voice
+    file_path = audio_cache_path(text, lang, voice)
+    if os.path.exists(file_path):
+        CACHE_REQUESTS.inc(cache="tts", result="hit")
+        with open(file_path, "rb") as f:
+            yield f.read()
+        return
+
+    CACHE_REQUESTS.inc(cache="tts", result="miss")
+    sentences = split_sentences(text)
+    tasks = [asyncio.ensure_future(asyncio.to_thread(_synthesize, s, lang, voice)) for s in sentences]
+    chunks = []
+    try:
+        for i, task in enumerate(tasks):
+            audio = await task
+            chunks.append(audio)
+            if backend.extension == "wav":
+                params, frames = read_wav(audio)
+                yield (wav_stream_header(params) if i == 0 else b"") + frames
+            else:
+                yield audio
+
+        if chunks:
+            await asyncio.to_thread(_write_atomic, file_path, backend.join(chunks))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def text_to_speech_async(text: str, lang: str = "en", voice: str = None) -> str:
+    """
+    Non-blocking text_to_speech; joins an in-progress render of the same text if there is one.
+    """
+    file_path = audio_cache_path(text, lang, voice)
+    if os.path.exists(file_path):
+        os.utime(file_path)
+        return file_path
+
+    key = audio_cache_key(text, lang, voice)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(asyncio.to_thread(text_to_speech, text, lang, voice))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await task
+
+async def prerender_speech(texts: list, lang: str = "en", voice: str = None):
+    """
+    Renders all texts concurrently (bounded) in the background, then trims the cache.
+    """
+    semaphore = asyncio.Semaphore(TTS_PRERENDER_CONCURRENCY)
+
+    async def render(text):
+        async with semaphore:
+            return await text_to_speech_async(text, lang, voice)
+
+    started = time.time()
+    await asyncio.gather(*(render(t) for t in texts))
+    logger.info("questions_prerendered", extra={"count": len(texts), "seconds": round(time.time() - started, 2)})
+    await asyncio.to_thread(evict_audio_cache)
+
+def evict_audio_cache(max_bytes: int = TTS_CACHE_MAX_BYTES, max_age: float = TTS_CACHE_MAX_AGE_S):
+    """
+    Deletes cached audio older than max_age, then least recently used files until under max_bytes.
+    """
+    now = time.time()
+    entries = []
+    for name in os.listdir(STATIC_DIR):
+        if not (name.startswith("tts_") and name.endswith((".mp3", ".wav"))):
+            continue
+        path = os.path.join(STATIC_DIR, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if now - stat.st_mtime > max_age:
+            _remove(path)
+        else:
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.warning("audio_delete_failed", extra={"path": path, "error": str(e)})
@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# Numeric score columns, in the order they appear in the table
+SCORE_COLUMNS = [
+    "clarity_score",
+    "technical_score",
+    "structure_score",
+    "answer_score",
+    "pronunciation_score",
+    "face_confidence",
+    "final_score",
+]
+
+# A claim on queued answers older than this is assumed abandoned (e.g. its worker died) and can be re-claimed
+PENDING_CLAIM_TIMEOUT_S = float(os.getenv("PENDING_CLAIM_TIMEOUT_S", "600"))
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    question TEXT,
+    transcription TEXT,
+    {", ".join(f"{col} REAL" for col in SCORE_COLUMNS)},
+    mispronounced_words TEXT,
+    gpt_feedback TEXT,
+    claude_feedback TEXT,
+    judges TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_session ON evaluations (session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_evaluations_created ON evaluations (created_at);
+CREATE TABLE IF NOT EXISTS pending_answers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    answer TEXT NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pending_session ON pending_answers (session_id, created_at);
+CREATE TABLE IF NOT EXISTS session_aggregates (
+    session_id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    {", ".join(f"sum_{col} REAL NOT NULL" for col in SCORE_COLUMNS)},
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_summaries (
+    session_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Running per-session totals, bumped in the same transaction as each insert. The version is a
+# microsecond timestamp (kept strictly increasing), so a session that is cleared and restarted
+# never reuses an old version
+AGGREGATE_UPSERT = f"""
+INSERT INTO session_aggregates (session_id, total, {", ".join(f"sum_{col}" for col in SCORE_COLUMNS)}, version, updated_at)
+VALUES (?, ?, {", ".join("?" for _ in SCORE_COLUMNS)}, ?, ?)
+ON CONFLICT(session_id) DO UPDATE SET
+    total = total + excluded.total,
+    {", ".join(f"sum_{col} = sum_{col} + excluded.sum_{col}" for col in SCORE_COLUMNS)},
+    version = MAX(version + 1, excluded.version),
+    updated_at = excluded.updated_at
+"""
+
+# One-time backfill for databases created before aggregates were kept
+AGGREGATE_BACKFILL = f"""
+INSERT INTO session_aggregates (session_id, total, {", ".join(f"sum_{col}" for col in SCORE_COLUMNS)}, version, updated_at)
+SELECT session_id, COUNT(*), {", ".join(f"SUM(COALESCE({col}, 0))" for col in SCORE_COLUMNS)},
+       CAST(MAX(created_at) * 1000000 AS INTEGER), MAX(created_at)
+FROM evaluations
+WHERE session_id NOT IN (SELECT session_id FROM session_aggregates)
+GROUP BY session_id
+"""
+
+INSERT_COLUMNS = ["session_id", "created_at", "question", "transcription", *SCORE_COLUMNS,
+                  "mispronounced_words", "gpt_feedback", "claude_feedback", "judges"]
+
+class EvaluationStore:
+    """
+    SQLite-backed repository of per-answer evaluations.
+
+    Runs in WAL mode so report reads don't block answer writes, and serializes writers
+    through a single connection guarded by a lock. Per-session score totals are kept up to
+    date on every insert, along with a version that changes whenever a session gets new
+    evaluations; cached report summaries are stamped with that version.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.execute(AGGREGATE_BACKFILL)
+
+    def _migrate(self):
+        # Columns added after the first release
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(evaluations)")}
+        if "judges" not in columns:
+            self._conn.execute("ALTER TABLE evaluations ADD COLUMN judges TEXT")
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(pending_answers)")}
+        if "claimed_by" not in columns:
+            self._conn.execute("ALTER TABLE pending_answers ADD COLUMN claimed_by TEXT")
+            self._conn.execute("ALTER TABLE pending_answers ADD COLUMN claimed_at REAL")
+
+    @staticmethod
+    def _to_row(session_id, evaluation):
+        feedback = evaluation.get("feedback", {})
+        return (
+            session_id,
+            time.time(),
+            evaluation.get("question"),
+            evaluation.get("transcription"),
+            *(evaluation.get(col, 0) for col in SCORE_COLUMNS),
+            json.dumps(evaluation.get("mispronounced_words", [])),
+            feedback.get("gpt"),
+            feedback.get("claude"),
+            json.dumps(evaluation["judges"]) if "judges" in evaluation else None,
+        )
+
+    @staticmethod
+    def _from_row(row):
+        evaluation = {
+            "question": row["question"],
+            "transcription": row["transcription"],
+            **{col: row[col] for col in SCORE_COLUMNS},
+            "mispronounced_words": json.loads(row["mispronounced_words"] or "[]"),
+            "judges": json.loads(row["judges"]) if row["judges"] else ["gpt", "claude"],
+            "feedback": {},
+        }
+        if row["gpt_feedback"] is not None:
+            evaluation["feedback"]["gpt"] = row["gpt_feedback"]
+        if row["claude_feedback"] is not None:
+            evaluation["feedback"]["claude"] = row["claude_feedback"]
+        return evaluation
+
+    def add(self, session_id: str, evaluation: dict):
+        self.add_many(session_id, [evaluation])
+
+    def _insert(self, session_id: str, evaluations: list):
+        # Caller holds the lock and an open transaction
+        placeholders = ", ".join("?" for _ in INSERT_COLUMNS)
+        rows = [self._to_row(session_id, e) for e in evaluations]
+        sums = [sum(e.get(col) or 0 for e in evaluations) for col in SCORE_COLUMNS]
+        self._conn.executemany(
+            f"INSERT INTO evaluations ({', '.join(INSERT_COLUMNS)}) VALUES ({placeholders})", rows
+        )
+        now = time.time()
+        self._conn.execute(AGGREGATE_UPSERT, (session_id, len(evaluations), *sums, int(now * 1_000_000), now))
+
+    def add_many(self, session_id: str, evaluations: list):
+        """
+        Inserts several evaluations in a single transaction.
+        """
+        if not evaluations:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._insert(session_id, evaluations)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def add_pending(self, session_id: str, answer: dict):
+        """
+        Queues a transcribed answer for deferred (batch) scoring.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pending_answers (session_id, created_at, answer) VALUES (?, ?, ?)",
+                (session_id, time.time(), json.dumps(answer)),
+            )
+
+    def pending(self, session_id: str) -> list:
+        """
+        Returns a session's queued answers as (id, answer) pairs in submission order.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, answer FROM pending_answers WHERE session_id = ? ORDER BY created_at, id", (session_id,)
+            ).fetchall()
+        return [(row["id"], json.loads(row["answer"])) for row in rows]
+
+    def claim_pending(self, session_id: str, claim_id: str, stale_after: float = PENDING_CLAIM_TIMEOUT_S) -> list:
+        """
+        Atomically claims a session's queued answers that nobody else is scoring (or whose claim
+        went stale) and returns them as (id, answer) pairs in submission order.
+
+        Claims live in the database, so report requests handled by different worker processes
+        never score the same answer twice: whoever claims a row first owns it.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE pending_answers SET claimed_by = ?, claimed_at = ? "
+                    "WHERE session_id = ? AND (claimed_by IS NULL OR claimed_at < ?)",
+                    (claim_id, now, session_id, now - stale_after),
+                )
+                rows = self._conn.execute(
+                    "SELECT id, answer FROM pending_answers WHERE claimed_by = ? ORDER BY created_at, id", (claim_id,)
+                ).fetchall()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(row["id"], json.loads(row["answer"])) for row in rows]
+
+    def resolve_claim(self, session_id: str, claim_id: str, scored: list) -> int:
+        """
+        Stores the evaluations scored from claimed answers, given as (pending id, evaluation) pairs,
+        and releases the claim on any answers left unscored, all in one transaction.
+
+        An answer is only stored if its pending row is still held by this claim when it is
+        deleted, so a claim that went stale and was taken over can't produce a duplicate.
+
+        Returns:
+            int: Number of evaluations stored.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                owned = []
+                for pending_id, evaluation in scored:
+                    deleted = self._conn.execute(
+                        "DELETE FROM pending_answers WHERE id = ? AND claimed_by = ?", (pending_id, claim_id)
+                    )
+                    if deleted.rowcount == 1:
+                        owned.append(evaluation)
+                if owned:
+                    self._insert(session_id, owned)
+                self._conn.execute(
+                    "UPDATE pending_answers SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by = ?", (claim_id,)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(owned)
+
+    def release_claim(self, claim_id: str):
+        """
+        Returns claimed answers to the queue untouched (e.g. when scoring failed outright).
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pending_answers SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by = ?", (claim_id,)
+            )
+
+    def pending_count(self, session_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS n FROM pending_answers WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row["n"]
+
+    def list(self, session_id: str) -> list:
+        """
+        Returns a session's evaluations in submission order.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM evaluations WHERE session_id = ? ORDER BY created_at, id", (session_id,)
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def averages(self, session_id: str) -> dict:
+        """
+        Returns the answer count, per-score averages (rounded to 2 decimals) and version
+        from the session's running totals, without scanning its evaluations.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM session_aggregates WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return {"total": 0, "version": 0, **{col: None for col in SCORE_COLUMNS}}
+        return {
+            "total": row["total"],
+            "version": row["version"],
+            **{col: round(row[f"sum_{col}"] / row["total"], 2) for col in SCORE_COLUMNS},
+        }
+
+    def version(self, session_id: str) -> int:
+        """
+        Returns a counter that changes whenever the session gets new evaluations (0 if it has none).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM session_aggregates WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row["version"] if row else 0
+
+    def summary(self, session_id: str, version: int):
+        """
+        Returns the cached report summary for exactly this version of the session, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM report_summaries WHERE session_id = ? AND version = ?", (session_id, version)
+            ).fetchone()
+        return row["summary"] if row else None
+
+    def set_summary(self, session_id: str, version: int, summary: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_summaries (session_id, version, summary, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, version, summary, time.time()),
+            )
+
+    def feedbacks(self, session_id: str):
+        """
+        Returns the GPT and Claude feedback lists for a session.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT gpt_feedback, claude_feedback FROM evaluations WHERE session_id = ? ORDER BY created_at, id",
+                (session_id,),
+            ).fetchall()
+        gpt = [r["gpt_feedback"] for r in rows if r["gpt_feedback"] is not None]
+        claude = [r["claude_feedback"] for r in rows if r["claude_feedback"] is not None]
+        return gpt, claude
+
+    def clear(self, session_id: str = None):
+        """
+        Deletes one session's evaluations, pending answers, totals and cached summary,
+        or everyone's when session_id is None.
+        """
+        with self._lock:
+            for table in ("evaluations", "pending_answers", "session_aggregates", "report_summaries"):
+                if session_id is None:
+                    self._conn.execute(f"DELETE FROM {table}")
+                else:
+                    self._conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
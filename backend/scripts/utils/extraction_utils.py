@@ -0,0 +1,212 @@
+import os
+import uuid
+import hashlib
+import asyncio
+import importlib.util
+import multiprocessing
+from scripts.utils.metrics import track_stage
+
+# Extraction limits (overridable via environment)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 256 * 1024
+EXTRACT_MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", "30"))
+EXTRACT_TIMEOUT_S = float(os.getenv("EXTRACT_TIMEOUT_S", "20"))
+EXTRACT_NUM_WORKERS = int(os.getenv("EXTRACT_NUM_WORKERS", "2"))
+# "pypdfium2" (fast, text only) or "pdfplumber" (layout-aware, slower)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pypdfium2")
+
+class UploadTooLarge(Exception):
+    """
+    Raised when an upload exceeds UPLOAD_MAX_BYTES.
+    """
+
+class ExtractionError(Exception):
+    """
+    Raised when a document can't be read or extraction exceeds its time limit.
+    """
+
+def _pdf_backend(backend: str) -> str:
+    # pypdfium2 is optional; fall back to pdfplumber when it isn't installed
+    if backend == "pypdfium2" and importlib.util.find_spec("pypdfium2") is None:
+        return "pdfplumber"
+    return backend
+
+def count_pdf_pages(file_path: str, backend: str = PDF_BACKEND) -> int:
+    if _pdf_backend(backend) == "pypdfium2":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+def extract_pdf_pages(file_path: str, start: int, end: int, backend: str = PDF_BACKEND) -> list:
+    """
+    Extracts text from pages [start, end) of a PDF.
+    """
+    if _pdf_backend(backend) == "pypdfium2":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            pages = []
+            for i in range(start, end):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return pages
+        finally:
+            pdf.close()
+
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, end)]
+
+def extract_text_from_pdf(file_path: str, backend: str = PDF_BACKEND, max_pages: int = EXTRACT_MAX_PAGES) -> str:
+    """
+    Extracts text from a PDF file (up to max_pages) in the current process.
+    """
+    pages = extract_pdf_pages(file_path, 0, min(count_pdf_pages(file_path, backend), max_pages), backend)
+    return "\n".join(page for page in pages if page)
+
+def extract_text_from_docx(file_path: str) -> str:
+    """
+    Extracts text from a DOCX file using python-docx.
+    """
+    from docx import Document
+
+    doc = Document(file_path)
+    return "\n".join([para.text for para in doc.paragraphs])
+
+async def spool_upload(file, dest_dir: str, extension: str, max_bytes: int = UPLOAD_MAX_BYTES):
+    """
+    Copies an UploadFile to disk in chunks, enforcing a size cap, and stores it content-addressed
+    as <sha256><extension> so identical uploads are only kept once.
+
+    Returns:
+        Tuple[str, str]: Path of the stored file and the SHA-256 hex digest of its bytes.
+    """
+    tmp_path = os.path.join(dest_dir, f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes.")
+                digest.update(chunk)
+                f.write(chunk)
+
+        file_path = os.path.join(dest_dir, f"{digest.hexdigest()}{extension}")
+        if os.path.exists(file_path):
+            os.remove(tmp_path)  # Duplicate of a stored upload
+        else:
+            os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return file_path, digest.hexdigest()
+
+class ExtractionEngine:
+    """
+    Extracts resume text in a pool of worker processes. PDF pages are split into
+    contiguous ranges, one per worker, and joined once at the end.
+
+    An extraction that exceeds `timeout` gets its pool terminated and replaced, since the worker
+    would otherwise keep parsing the document and hold its slot. Other extractions running
+    in that pool at the time fail with ExtractionError and can be retried.
+
+    Uses multiprocessing.Pool rather than ProcessPoolExecutor because Pool.terminate() stops
+    workers in the middle of a task; the executor has no public way to do that.
+    """
+
+    def __init__(self, num_workers: int = EXTRACT_NUM_WORKERS, max_pages: int = EXTRACT_MAX_PAGES,
+                 timeout: float = EXTRACT_TIMEOUT_S, backend: str = PDF_BACKEND):
+        self.num_workers = num_workers
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.backend = backend
+        self._pool = None
+        self._running = {}  # pool -> futures of its unfinished jobs
+
+    def start(self):
+        if self._pool is None:
+            # spawn avoids forking the server process with its running threads and sockets
+            self._pool = multiprocessing.get_context("spawn").Pool(processes=self.num_workers)
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    async def _restart(self, pool):
+        """
+        Terminates the given pool's worker processes and fails its unfinished jobs;
+        the next extraction starts a fresh pool.
+        """
+        if self._pool is pool:
+            self._pool = None
+        for future in self._running.pop(pool, ()):
+            if not future.done():
+                future.set_exception(ExtractionError("Text extraction was interrupted. Please try again."))
+        # terminate() joins the killed workers, so keep it off the event loop
+        await asyncio.to_thread(pool.terminate)
+
+    async def _run(self, pool, fn, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(set_outcome, value):
+            if not future.done():
+                set_outcome(value)
+
+        running = self._running.setdefault(pool, set())
+        running.add(future)
+        # Pool callbacks run on its result-handler thread
+        pool.apply_async(
+            fn, args,
+            callback=lambda result: loop.call_soon_threadsafe(resolve, future.set_result, result),
+            error_callback=lambda error: loop.call_soon_threadsafe(resolve, future.set_exception, error),
+        )
+        try:
+            return await future
+        finally:
+            running.discard(future)
+
+    async def extract(self, file_path: str, extension: str) -> str:
+        """
+        Extracts text from a PDF or DOCX within the configured page and time limits.
+        """
+        pool = self.start()
+        try:
+            with track_stage("resume_extraction"):
+                return await asyncio.wait_for(self._extract(pool, file_path, extension), self.timeout)
+        except asyncio.TimeoutError:
+            await self._restart(pool)
+            raise ExtractionError(f"Text extraction took longer than {self.timeout:.0f}s.")
+
+    async def _extract(self, pool, file_path: str, extension: str) -> str:
+        if extension == ".docx":
+            return await self._run(pool, extract_text_from_docx, file_path)
+
+        page_count = min(await self._run(pool, count_pdf_pages, file_path, self.backend), self.max_pages)
+        if page_count == 0:
+            return ""
+
+        step = -(-page_count // self.num_workers)  # Ceiling division
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        chunks = await asyncio.gather(
+            *(self._run(pool, extract_pdf_pages, file_path, start, end, self.backend) for start, end in ranges)
+        )
+        return "\n".join(page for chunk in chunks for page in chunk if page)
+
+# Shared engine used by the upload route
+engine = ExtractionEngine()
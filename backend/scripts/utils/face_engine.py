@@ -0,0 +1,144 @@
+import os
+import asyncio
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from scripts.utils import face_utils
+from scripts.utils.model_registry import registry
+from scripts.utils.metrics import QUEUE_DEPTH
+from scripts.utils.log_utils import get_logger
+
+# Pool sizing (overridable via environment)
+FACE_NUM_WORKERS = int(os.getenv("FACE_NUM_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+FACE_FRAME_BYTES = face_utils.FRAME_WIDTH * face_utils.FRAME_HEIGHT * 3
+
+logger = get_logger("face_engine")
+
+class FaceEngine:
+    """
+    Runs MediaPipe FaceMesh in a pool of worker processes shared by every face-confidence socket,
+    so face analysis scales across cores and never runs on the API event loop.
+
+    Each worker is a single-process pool, and each video stream (one per socket) is pinned to one worker for its lifetime
+    so MediaPipe's tracking state carries over between frames. Frames are written into a
+    per-stream shared-memory buffer; only the buffer name and frame shape are pickled.
+    """
+
+    def __init__(self, num_workers: int = FACE_NUM_WORKERS):
+        self.num_workers = num_workers
+        self._workers = []
+        self._assignments = {}  # stream_id -> worker index
+        self._buffers = {}  # stream_id -> SharedMemory
+        self._pending = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of frames currently queued or being analysed.
+        """
+        return self._pending
+
+    @property
+    def active_streams(self) -> int:
+        return len(self._assignments)
+
+    def start(self):
+        """
+        Starts the worker processes (idempotent).
+        """
+        if not self._workers:
+            # spawn avoids forking the server process with its running threads and sockets
+            context = multiprocessing.get_context("spawn")
+            self._workers = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=face_utils.init_worker)
+                for _ in range(self.num_workers)
+            ]
+            logger.info("face_engine_started", extra={"workers": self.num_workers})
+        return self._workers
+
+    def warm_up(self):
+        """
+        Starts every worker and blocks until each has imported MediaPipe.
+        """
+        wait([worker.submit(face_utils.ping) for worker in self.start()])
+        return self
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.shutdown(wait=False, cancel_futures=True)
+        self._workers = []
+        self._assignments.clear()
+        for stream_id in list(self._buffers):
+            self._free_buffer(stream_id)
+
+    def _worker_for(self, stream_id: str) -> int:
+        index = self._assignments.get(stream_id)
+        if index is None:
+            # Least-loaded worker by number of streams pinned to it
+            load = [0] * self.num_workers
+            for assigned in self._assignments.values():
+                load[assigned] += 1
+            index = self._assignments[stream_id] = load.index(min(load))
+        return index
+
+    def _buffer_for(self, stream_id: str, nbytes: int) -> shared_memory.SharedMemory:
+        buffer = self._buffers.get(stream_id)
+        if buffer is None or buffer.size < nbytes:
+            self._free_buffer(stream_id)
+            buffer = self._buffers[stream_id] = shared_memory.SharedMemory(create=True, size=max(nbytes, FACE_FRAME_BYTES))
+        return buffer
+
+    def _free_buffer(self, stream_id: str):
+        buffer = self._buffers.pop(stream_id, None)
+        if buffer is not None:
+            buffer.close()
+            buffer.unlink()
+
+    async def analyze(self, stream_id: str, frame: np.ndarray) -> float:
+        """
+        Scores one decoded RGB frame on the stream's worker.
+
+        A stream must not submit its next frame before this returns, since the frame
+        buffer is reused (the face-confidence socket processes one frame at a time).
+
+        Args:
+            stream_id (str): Video stream (one per face-confidence connection) the frame belongs to
+            frame (np.ndarray): RGB uint8 frame of shape (height, width, 3)
+
+        Returns:
+            float: Face confidence score (0-100)
+        """
+        workers = self.start()
+        index = self._worker_for(stream_id)
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        buffer = self._buffer_for(stream_id, frame.nbytes)
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=buffer.buf)[:] = frame
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                workers[index], face_utils.analyze_frame, stream_id, buffer.name, frame.shape
+            )
+        finally:
+            self._pending -= 1
+
+    async def release(self, stream_id: str):
+        """
+        Frees the stream's FaceMesh on its worker and its shared-memory buffer.
+        """
+        index = self._assignments.pop(stream_id, None)
+        if index is not None and self._workers:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._workers[index], face_utils.release_stream, stream_id)
+            except Exception as e:
+                logger.error("face_stream_release_failed", extra={"stream_id": stream_id, "error": str(e)})
+        self._free_buffer(stream_id)
+
+# Shared engine used by the face-confidence socket
+engine = FaceEngine()
+registry.register("face_mesh", engine.warm_up)
+QUEUE_DEPTH.set_function(lambda: engine.queue_depth, queue="face")
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import numpy as np
+from scripts.utils.session_manager import SESSION_BACKEND
+from scripts.utils.log_utils import get_logger
+
+# Number of recent samples kept per session, and whether to persist samples as JSONL
+FACE_LOG_CAPACITY = int(os.getenv("FACE_LOG_CAPACITY", "1800"))
+FACE_LOG_PERSIST = os.getenv("FACE_LOG_PERSIST", "0") == "1"
+FACE_LOG_FLUSH_EVERY = int(os.getenv("FACE_LOG_FLUSH_EVERY", "15"))
+
+logger = get_logger("face_log")
+
+def average_confidence(count: int, total: float, zero_frames: int) -> float:
+    """
+    Average confidence minus a penalty (max 20) proportional to frames with no face detected.
+    """
+    if not count:
+        return 0
+    penalty = min((zero_frames / count) * 20, 20)
+    return round(max(0, total / count - penalty), 2)
+
+class FaceConfidenceSeries:
+    """
+    Fixed-size, array-backed ring buffer of face confidence samples for one session.
+
+    Running sum, count and zero-frame counters cover every sample since the session
+    started, so the average and no-face penalty are O(1) regardless of length.
+    """
+
+    def __init__(self, capacity: int = FACE_LOG_CAPACITY):
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.head = 0  # Next write position
+        self.count = 0
+        self.total = 0.0
+        self.zero_frames = 0
+        self.unflushed = 0
+
+    def append(self, confidence: float, timestamp: float = None):
+        self.timestamps[self.head] = timestamp if timestamp is not None else time.time()
+        self.values[self.head] = confidence
+        self.head = (self.head + 1) % self.capacity
+        self.count += 1
+        self.total += confidence
+        if confidence == 0:
+            self.zero_frames += 1
+        self.unflushed = min(self.unflushed + 1, self.capacity)
+
+    def average(self) -> float:
+        return average_confidence(self.count, self.total, self.zero_frames)
+
+    def recent(self, n: int):
+        """
+        Returns the last n (timestamp, confidence) samples, oldest first.
+        """
+        n = min(n, self.count, self.capacity)
+        idx = (self.head - n + np.arange(n)) % self.capacity
+        return list(zip(self.timestamps[idx].tolist(), self.values[idx].tolist()))
+
+class SQLiteFaceTotals:
+    """
+    Running face confidence totals per session in SQLite, shared by every worker process.
+
+    Each sample is added where it arrives, so the average also covers frames received by
+    another worker (e.g. the face WebSocket on one worker, /submit-answer on another).
+    """
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS face_totals ("
+            "session_id TEXT PRIMARY KEY, count INTEGER NOT NULL, total REAL NOT NULL, "
+            "zero_frames INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def add(self, session_id: str, confidence: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO face_totals (session_id, count, total, zero_frames, updated_at) VALUES (?, 1, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET count = count + 1, total = total + excluded.total, "
+                "zero_frames = zero_frames + excluded.zero_frames, updated_at = excluded.updated_at",
+                (session_id, confidence, int(confidence == 0), time.time()),
+            )
+
+    def average(self, session_id: str) -> float:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count, total, zero_frames FROM face_totals WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return average_confidence(*row) if row else 0
+
+    def delete(self, session_id: str = None):
+        with self._lock:
+            if session_id is None:
+                self._conn.execute("DELETE FROM face_totals")
+            else:
+                self._conn.execute("DELETE FROM face_totals WHERE session_id = ?", (session_id,))
+
+class FaceConfidenceStore:
+    """
+    Per-session face confidence series with optional append-only JSONL persistence.
+
+    With shared `totals` the averages come from there instead of this worker's series, which
+    then only buffer samples for the JSONL log and are dropped once their stream is flushed.
+    """
+
+    def __init__(self, log_path: str = None, persist: bool = FACE_LOG_PERSIST, totals: SQLiteFaceTotals = None):
+        self.log_path = log_path
+        self.persist = persist and log_path is not None
+        self.totals = totals
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def append(self, session_id: str, confidence: float):
+        with self._lock:
+            series = self._series.get(session_id)
+            if series is None:
+                series = self._series[session_id] = FaceConfidenceSeries()
+            series.append(confidence)
+            if self.persist and series.unflushed >= FACE_LOG_FLUSH_EVERY:
+                self._flush(session_id, series)
+        if self.totals is not None:
+            self.totals.add(session_id, confidence)
+
+    def average(self, session_id: str) -> float:
+        if self.totals is not None:
+            return self.totals.average(session_id)
+        with self._lock:
+            series = self._series.get(session_id)
+            return series.average() if series else 0
+
+    def flush(self, session_id: str):
+        with self._lock:
+            series = self._series.get(session_id)
+            if self.persist and series:
+                self._flush(session_id, series)
+            # Shared totals already hold every sample; other workers never evict this one
+            if self.totals is not None:
+                self._series.pop(session_id, None)
+
+    def _flush(self, session_id, series):
+        try:
+            with open(self.log_path, "a") as f:
+                for ts, conf in series.recent(series.unflushed):
+                    f.write(json.dumps({
+                        "session_id": session_id,
+                        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)),
+                        "confidence": round(conf, 2),
+                    }) + "\n")
+            series.unflushed = 0
+        except Exception as e:
+            logger.error("face_log_persist_failed", extra={"error": str(e)})
+
+    def reset(self, session_id: str = None):
+        """
+        Clears one session's samples, or every session (and the JSONL log) when session_id is None.
+        """
+        if self.totals is not None:
+            self.totals.delete(session_id)
+        with self._lock:
+            if session_id is not None:
+                self._series.pop(session_id, None)
+                return
+            self._series.clear()
+            if self.log_path and os.path.exists(self.log_path):
+                open(self.log_path, "w").close()
+
+def create_face_store(log_path: str, db_path: str) -> FaceConfidenceStore:
+    """
+    Builds the face store; with the shared session backend, averages are kept in the same SQLite file.
+    """
+    if SESSION_BACKEND == "sqlite":
+        return FaceConfidenceStore(log_path, totals=SQLiteFaceTotals(db_path))
+    return FaceConfidenceStore(log_path)
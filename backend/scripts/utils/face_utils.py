@@ -0,0 +1,258 @@
+import os
+import numpy as np
+from multiprocessing import shared_memory
+from scripts.utils.log_utils import configure_logging, get_logger
+
+# Typical capture size, used to size frame buffers and as the reference width for scoring
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 600
+
+# "fast" tracks a downscaled face region between periodic full-frame detections; "full" runs
+# FaceMesh on every full-resolution frame
+FACE_ANALYSIS_MODE = os.getenv("FACE_ANALYSIS_MODE", "fast")
+FACE_INFERENCE_WIDTH = int(os.getenv("FACE_INFERENCE_WIDTH", "320"))
+FACE_REDETECT_EVERY = int(os.getenv("FACE_REDETECT_EVERY", "10"))
+FACE_ROI_MARGIN = float(os.getenv("FACE_ROI_MARGIN", "0.5"))
+
+# FaceMesh landmark indices used for scoring
+NOSE_TIP = 1
+LEFT_EYE_OUTER = 33
+RIGHT_EYE_OUTER = 263
+SCORE_LANDMARKS = (NOSE_TIP, LEFT_EYE_OUTER, RIGHT_EYE_OUTER)
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+
+# Per-stream state owned by the current face worker process: analyzer (keeps tracking state) and frame buffer
+_streams = {}
+_face_mesh_module = None
+
+logger = get_logger("face_worker")
+
+def load_face_mesh_module():
+    import mediapipe as mp
+    return mp.solutions.face_mesh
+
+def _cv2():
+    import cv2
+    return cv2
+
+def init_worker():
+    """
+    Process pool initializer: imports MediaPipe once per worker so streams never pay the load cost.
+    """
+    global _face_mesh_module
+    # Spawned workers don't run main.py, so set up JSON logging here
+    configure_logging()
+    _face_mesh_module = load_face_mesh_module()
+    if FACE_ANALYSIS_MODE != "full":
+        _cv2()
+    logger.info("face_worker_ready", extra={"pid": os.getpid(), "mode": FACE_ANALYSIS_MODE})
+
+def ping() -> int:
+    """
+    No-op job used to make a worker start (and preload MediaPipe) ahead of real work.
+    """
+    return os.getpid()
+
+def score_landmarks(nose_x: float, left_eye_x: float, right_eye_x: float) -> float:
+    """
+    Computes the face confidence score (0-100) from the nose tip and outer eye corners,
+    given as x coordinates normalized to the full frame width, so the score doesn't
+    depend on the capture or inference resolution.
+
+    Coordinates are placed on a FRAME_WIDTH pixel grid, truncated to whole pixels like
+    the original per-frame formula, so scores match it exactly.
+    """
+    nose_x = int(nose_x * FRAME_WIDTH)
+    left_eye_x = int(left_eye_x * FRAME_WIDTH)
+    right_eye_x = int(right_eye_x * FRAME_WIDTH)
+    face_confidence = 100.0
+
+    # Penalise a nose more than a third of the frame away from the centre
+    deviation_x = abs(nose_x - FRAME_WIDTH // 2)
+    if deviation_x > FRAME_WIDTH // 3:
+        face_confidence -= min(deviation_x / FRAME_WIDTH * 100, 40)
+
+    # Penalise eyes closer or further apart than a fifth of the frame (head turned or too close/far)
+    eye_distance = abs(left_eye_x - right_eye_x)
+    expected_eye_distance = FRAME_WIDTH // 5
+    tilt_penalty = min(abs(expected_eye_distance - eye_distance) / expected_eye_distance * 40, 30)
+    face_confidence -= tilt_penalty
+
+    return max(min(face_confidence, 100), 0)
+
+def score_face(results):
+    """
+    Computes the face confidence score (0-100) from full-frame FaceMesh results.
+    """
+    if not results.multi_face_landmarks:
+        return 0  # No face detected
+
+    landmarks = results.multi_face_landmarks[0].landmark
+    return score_landmarks(landmarks[NOSE_TIP].x, landmarks[LEFT_EYE_OUTER].x, landmarks[RIGHT_EYE_OUTER].x)
+
+class FaceTracker:
+    """
+    Fast FaceMesh path for one video stream.
+
+    Every `redetect_every` frames, or whenever the face is lost, the whole frame is analysed
+    (downscaled to `inference_width`) by a static-image FaceMesh and a padded region of interest
+    is fitted around the face. Frames in between only analyse that region, also downscaled, with
+    a second, tracking FaceMesh. The region stays fixed between re-detections so the tracker sees
+    a stable image; it is reset whenever the region is refitted, since its tracking state is in
+    the old crop's coordinates. Landmarks are mapped back to full-frame normalized coordinates
+    before scoring.
+    """
+
+    def __init__(self, face_mesh_module, inference_width: int = FACE_INFERENCE_WIDTH,
+                 redetect_every: int = FACE_REDETECT_EVERY, roi_margin: float = FACE_ROI_MARGIN):
+        self._face_mesh_module = face_mesh_module
+        self.detector = face_mesh_module.FaceMesh(static_image_mode=True, max_num_faces=1)
+        self.tracker = face_mesh_module.FaceMesh(static_image_mode=False, max_num_faces=1)
+        self.inference_width = inference_width
+        self.redetect_every = redetect_every
+        self.roi_margin = roi_margin
+        self.roi = None  # (x0, y0, x1, y1), normalized to the full frame
+        self.frames_since_detect = 0
+
+    def close(self):
+        self.detector.close()
+        self.tracker.close()
+
+    def _reset_tracker(self):
+        if hasattr(self.tracker, "reset"):
+            self.tracker.reset()
+        else:
+            self.tracker.close()
+            self.tracker = self._face_mesh_module.FaceMesh(static_image_mode=False, max_num_faces=1)
+
+    def _landmarks(self, face_mesh, frame, roi, indices=None):
+        """
+        Runs face_mesh on the roi of frame and returns the landmarks at `indices` (all of them
+        by default) in full-frame normalized coordinates as an (n, 2) array, or None when no
+        face is found.
+        """
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = roi
+        crop = frame[int(y0 * height):int(y1 * height), int(x0 * width):int(x1 * width)]
+        if crop.shape[1] > self.inference_width:
+            cv2 = _cv2()
+            scale = self.inference_width / crop.shape[1]
+            crop = cv2.resize(crop, (self.inference_width, max(1, round(crop.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+        else:
+            crop = np.ascontiguousarray(crop)
+
+        results = face_mesh.process(crop)
+        if not results.multi_face_landmarks:
+            return None
+        landmarks = results.multi_face_landmarks[0].landmark
+        if indices is not None:
+            landmarks = [landmarks[i] for i in indices]
+        points = np.array([(p.x, p.y) for p in landmarks], dtype=np.float32)
+        points[:, 0] = x0 + points[:, 0] * (x1 - x0)
+        points[:, 1] = y0 + points[:, 1] * (y1 - y0)
+        return points
+
+    def _fit_roi(self, points):
+        (min_x, min_y), (max_x, max_y) = points.min(axis=0), points.max(axis=0)
+        pad_x = (max_x - min_x) * self.roi_margin
+        pad_y = (max_y - min_y) * self.roi_margin
+        return (
+            max(0.0, float(min_x - pad_x)), max(0.0, float(min_y - pad_y)),
+            min(1.0, float(max_x + pad_x)), min(1.0, float(max_y + pad_y)),
+        )
+
+    def process(self, frame) -> float:
+        """
+        Scores one RGB frame (0-100).
+        """
+        points = None
+        if self.roi is not None and self.frames_since_detect < self.redetect_every:
+            points = self._landmarks(self.tracker, frame, self.roi, SCORE_LANDMARKS)
+            self.frames_since_detect += 1
+
+        # Periodic re-detection, or tracking lost: analyse the whole frame and refit the region
+        if points is None:
+            points = self._landmarks(self.detector, frame, FULL_FRAME)
+            self.frames_since_detect = 0
+            if self.roi is not None:
+                self._reset_tracker()
+            if points is None:
+                self.roi = None
+                return 0  # No face detected
+            self.roi = self._fit_roi(points)
+            points = points[list(SCORE_LANDMARKS)]
+
+        nose, left_eye, right_eye = points[:, 0]
+        return score_landmarks(nose, left_eye, right_eye)
+
+class FullFrameAnalyzer:
+    """
+    Runs FaceMesh on every full-resolution frame.
+    """
+
+    def __init__(self, face_mesh_module):
+        self.face_mesh = face_mesh_module.FaceMesh(static_image_mode=False, max_num_faces=1)
+
+    def process(self, frame) -> float:
+        return score_face(self.face_mesh.process(frame))
+
+    def close(self):
+        self.face_mesh.close()
+
+def create_analyzer(face_mesh_module, mode: str = FACE_ANALYSIS_MODE):
+    if mode == "full":
+        return FullFrameAnalyzer(face_mesh_module)
+    return FaceTracker(face_mesh_module)
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to a frame buffer created by the server process without taking ownership of it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Spawned workers share the server's resource tracker, so the server's unlink still cleans up
+        return shared_memory.SharedMemory(name=name)
+
+def _stream(stream_id: str, shm_name: str):
+    global _face_mesh_module
+    state = _streams.get(stream_id)
+    if state is None:
+        if _face_mesh_module is None:
+            _face_mesh_module = load_face_mesh_module()
+        state = _streams[stream_id] = {"analyzer": create_analyzer(_face_mesh_module), "shm": None}
+
+    # The server reallocates the buffer when a larger frame arrives
+    if state["shm"] is None or state["shm"].name != shm_name.lstrip("/"):
+        if state["shm"] is not None:
+            state["shm"].close()
+        state["shm"] = attach_shared_memory(shm_name)
+    return state
+
+def analyze_frame(stream_id: str, shm_name: str, shape: tuple) -> float:
+    """
+    Scores one RGB frame that the server wrote into the stream's shared-memory buffer.
+    Runs inside a face worker; each stream always lands on the same worker, so its
+    FaceMesh keeps tracking the face between frames.
+
+    Args:
+        stream_id (str): Video stream the frame belongs to
+        shm_name (str): Name of the stream's shared-memory frame buffer
+        shape (Tuple[int, int, int]): Frame height, width and channels
+
+    Returns:
+        float: Face confidence score (0-100)
+    """
+    state = _stream(stream_id, shm_name)
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=state["shm"].buf)
+    return state["analyzer"].process(frame)
+
+def release_stream(stream_id: str):
+    """
+    Drops a stream's analyzer and detaches its frame buffer.
+    """
+    state = _streams.pop(stream_id, None)
+    if state is not None:
+        state["analyzer"].close()
+        if state["shm"] is not None:
+            state["shm"].close()
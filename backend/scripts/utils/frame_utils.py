@@ -0,0 +1,50 @@
+import struct
+import importlib
+import numpy as np
+from scripts.utils.model_registry import registry
+from scripts.utils.log_utils import get_logger
+
+logger = get_logger("face")
+
+# OpenCV is imported on first use (or during startup warm-up)
+registry.register("cv2", lambda: importlib.import_module("cv2"))
+
+# Binary raw-frame header: magic, width, height, channels (1 = grayscale, 3 = RGB)
+RAW_FRAME_MAGIC = b"MKFR"
+RAW_FRAME_HEADER = struct.Struct("<4sHHB")
+
+def decode_encoded_frame(buf):
+    """
+    Decodes JPEG/WebP/PNG bytes once with OpenCV and returns an RGB frame for MediaPipe.
+    """
+    cv2 = registry.get("cv2")
+    frame = cv2.imdecode(np.frombuffer(buf, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+def decode_raw_frame(buf):
+    """
+    Decodes an uncompressed frame with a RAW_FRAME_HEADER prefix into an RGB frame.
+    RGB buffers are used as-is; grayscale is expanded to three channels.
+    """
+    cv2 = registry.get("cv2")
+    _, width, height, channels = RAW_FRAME_HEADER.unpack_from(buf)
+    pixels = np.frombuffer(buf, dtype=np.uint8, offset=RAW_FRAME_HEADER.size)
+    if channels not in (1, 3) or pixels.size != width * height * channels:
+        return None
+    if channels == 1:
+        return cv2.cvtColor(pixels.reshape(height, width), cv2.COLOR_GRAY2RGB)
+    return pixels.reshape(height, width, 3)
+
+def decode_binary_frame(buf):
+    """
+    Decodes a binary WebSocket message: either a raw frame with header or an encoded image.
+    """
+    try:
+        if buf[:4] == RAW_FRAME_MAGIC:
+            return decode_raw_frame(buf)
+        return decode_encoded_frame(buf)
+    except Exception as e:
+        logger.debug("frame_decode_failed", extra={"error": str(e)})
+        return None
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from scripts.utils.metrics import CACHE_REQUESTS
+
+# Cache settings (overridable via environment)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(BACKEND_DIR, "llm_cache.db"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(30 * 24 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+
+def cache_key(model: str, messages, **params) -> str:
+    """
+    Stable hash of the model, prompt messages and request parameters.
+    """
+    payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """
+    Memoizes LLM completions: an in-memory LRU in front of a SQLite table.
+
+    Entries expire after `ttl` seconds; the disk table is trimmed to `max_entries`
+    (oldest first) and the memory front to `memory_entries`.
+
+    Async callers use get_async/set_async, which answer memory hits inline and run
+    SQLite reads, writes and trims on a worker thread, off the event loop.
+    """
+
+    def __init__(self, db_path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL_S, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 memory_entries: int = LLM_CACHE_MEMORY_ENTRIES, enabled: bool = LLM_CACHE_ENABLED):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.enabled = enabled
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (created_at, value)
+        self._lock = threading.Lock()  # Memory front only, so the event loop never waits on SQLite
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self._conn = None
+        if enabled:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache (created_at)")
+
+    def get(self, key: str):
+        """
+        Returns the cached completion text, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        value = self._get_memory(key)
+        return value if value is not None else self._get_disk(key)
+
+    async def get_async(self, key: str):
+        """
+        get() for the event loop: only a memory miss goes to a worker thread.
+        """
+        if not self.enabled:
+            return None
+
+        value = self._get_memory(key)
+        return value if value is not None else await asyncio.to_thread(self._get_disk, key)
+
+    def set(self, key: str, value: str):
+        if not self.enabled:
+            return
+
+        now = time.time()
+        self._remember(key, now, value)
+        self._store(key, value, now)
+
+    async def set_async(self, key: str, value: str):
+        """
+        set() for the event loop: the memory front is updated inline, the disk write on a worker thread.
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        self._remember(key, now, value)
+        await asyncio.to_thread(self._store, key, value, now)
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                return None
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+        CACHE_REQUESTS.inc(cache="llm", result="memory_hit")
+        return entry[1]
+
+    def _get_disk(self, key):
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ? AND created_at >= ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache="llm", result="miss")
+            return None
+
+        self.disk_hits += 1
+        CACHE_REQUESTS.inc(cache="llm", result="disk_hit")
+        self._remember(key, row[1], row[0])
+        return row[0]
+
+    def _store(self, key, value, now):
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)", (key, value, now)
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._trim(now)
+
+    def _remember(self, key, created_at, value):
+        with self._lock:
+            self._memory[key] = (created_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _trim(self, now):
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+        }
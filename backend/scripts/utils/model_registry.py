@@ -0,0 +1,82 @@
+import os
+import time
+import asyncio
+import threading
+from scripts.utils.log_utils import get_logger
+
+logger = get_logger("models")
+
+# Load every registered model in the background at startup (set to 0 to load purely on first use)
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+
+class ModelRegistry:
+    """
+    Loads heavy dependencies (models, SDK clients, native libraries) lazily on first use,
+    or ahead of time via warm_up(), recording how long each one took.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._load_times = {}
+        self._errors = {}
+        self._locks = {}
+
+    def register(self, name: str, loader):
+        """
+        Registers a zero-argument loader. Nothing is loaded until get() or warm_up().
+        """
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str):
+        """
+        Returns the loaded model, loading it on first use (thread-safe, loads once).
+        """
+        if name in self._models:
+            return self._models[name]
+
+        with self._locks[name]:
+            if name not in self._models:
+                started = time.perf_counter()
+                try:
+                    self._models[name] = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._load_times[name] = round(time.perf_counter() - started, 3)
+                self._errors.pop(name, None)
+                logger.info("model_loaded", extra={"model": name, "load_time_s": self._load_times[name]})
+        return self._models[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self._models for name in self._loaders)
+
+    def status(self) -> dict:
+        return {
+            name: {
+                "loaded": name in self._models,
+                "load_time_s": self._load_times.get(name),
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
+
+    async def warm_up(self):
+        """
+        Loads all registered models concurrently in worker threads.
+        """
+        async def load(name):
+            try:
+                await asyncio.to_thread(self.get, name)
+            except Exception as e:
+                logger.error("model_load_failed", extra={"model": name, "error": str(e)})
+
+        await asyncio.gather(*(load(name) for name in self._loaders))
+
+# Shared registry for the whole backend
+registry = ModelRegistry()
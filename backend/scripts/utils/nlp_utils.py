@@ -1,45 +1,97 @@
+import os
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-import spacy
+import json
+import math
+from collections import Counter
+from scripts.utils.model_registry import registry
+from scripts.utils.metrics import track_stage
+from scripts.utils.log_utils import get_logger
 
-# Load spaCy model with fallback download if missing
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    import subprocess
-    subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+# Only the tagger path is needed for POS filtering; skip the parser, NER and lemmatizer
+SPACY_EXCLUDE = ["parser", "ner", "lemmatizer", "senter"]
 
-def extract_keywords(text: str, top_n: int = 25) -> list:
+# Precomputed IDF table built from a job-description corpus (see scripts/build_idf.py)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+IDF_PATH = os.getenv("IDF_PATH", os.path.join(BACKEND_DIR, "data", "idf.json"))
+
+KEYWORD_POS = ("NOUN", "PROPN", "ADJ")
+
+logger = get_logger("nlp_utils")
+
+def _load_spacy():
+    # The model is installed at build time; never download it from a request path
+    import spacy
+    try:
+        return spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDE)
+    except OSError as e:
+        raise OSError("spaCy model en_core_web_sm is not installed; run `python -m spacy download en_core_web_sm`") from e
+
+registry.register("spacy", _load_spacy)
+
+def get_nlp():
+    return registry.get("spacy")
+
+def load_idf(path: str = IDF_PATH):
     """
-    Extracts top N keywords from the given text using spaCy POS filtering and TF-IDF scoring.
+    Loads the IDF table. Returns (idf dict, idf for unseen terms).
+    Without a table every term gets the same weight, i.e. ranking by term frequency.
+    """
+    try:
+        with open(path) as f:
+            table = json.load(f)
+        # Smoothed IDF of a term that appears in no corpus document
+        return table["idf"], math.log((1 + table["n_docs"]) / 1) + 1
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("idf_table_unavailable", extra={"path": path, "error": str(e)})
+        return {}, 1.0
+
+registry.register("idf_table", load_idf)
+
+def clean_text(text: str) -> str:
+    # Basic cleanup
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\d+", "", text)
+
+def candidate_tokens(doc) -> list:
+    """
+    Nouns, proper nouns and adjectives longer than two characters.
+    """
+    return [token.text for token in doc if token.pos_ in KEYWORD_POS and len(token.text) > 2]
+
+def extract_keywords_from(texts: list, top_n: int = 25) -> list:
+    """
+    Extracts top N keywords across several documents (e.g. resume and job description),
+    POS-tagging them in one batched nlp.pipe call and ranking by TF-IDF against the corpus IDF table.
 
     Args:
-        text (str): Input document.
+        texts (List[str]): Input documents.
         top_n (int): Number of top keywords to return.
 
     Returns:
         List[str]: Top N keywords ranked by TF-IDF.
     """
-    # Basic cleanup
-    clean_text = re.sub(r"[^\w\s]", " ", text.lower())
-    clean_text = re.sub(r"\d+", "", clean_text)
+    nlp = get_nlp()
+    idf_table, default_idf = registry.get("idf_table")
 
-    # POS tagging with spaCy
-    doc = nlp(clean_text)
-    tokens = [token.text for token in doc if token.pos_ in ("NOUN", "PROPN", "ADJ") and len(token.text) > 2]
+    with track_stage("keyword_extraction"):
+        counts = Counter()
+        for doc in nlp.pipe(clean_text(t) for t in texts):
+            counts.update(candidate_tokens(doc))
 
-    if not tokens:
-        return []
+        # Rank by tf * idf; ties broken alphabetically for stable output
+        scores = {term: tf * idf_table.get(term, default_idf) for term, tf in counts.items()}
+        ranked = sorted(scores, key=lambda term: (-scores[term], term))
+    return ranked[:top_n]
 
-    filtered_text = " ".join(tokens)
+def extract_keywords(text: str, top_n: int = 25) -> list:
+    """
+    Extracts top N keywords from the given text using spaCy POS filtering and TF-IDF scoring.
 
-    # TF-IDF scoring
-    vectorizer = TfidfVectorizer()
-    X = vectorizer.fit_transform([filtered_text])
-    scores = X.toarray()[0]
-    keywords = vectorizer.get_feature_names_out()
+    Args:
+        text (str): Input document.
+        top_n (int): Number of top keywords to return.
 
-    # Rank and return top keywords
-    keyword_scores = sorted(zip(keywords, scores), key=lambda x: x[1], reverse=True)
-    return [kw for kw, _ in keyword_scores[:top_n]]
+    Returns:
+        List[str]: Top N keywords ranked by TF-IDF.
+    """
+    return extract_keywords_from([text], top_n=top_n)
@@ -1,65 +1,170 @@
 import os
 import re
 import json
+import time
+import asyncio
+from types import SimpleNamespace
 from dotenv import load_dotenv
-from anthropic import Anthropic
-import openai
+from scripts.utils.llm_cache import LLMCache, cache_key
+from scripts.utils.model_registry import registry
+from scripts.utils.metrics import STAGE_SECONDS, ERRORS, track_stage
+from scripts.utils.resilience import CircuitBreaker, LatencyTracker, call_with_policy
+from scripts.utils.log_utils import get_logger
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize OpenAI and Claude clients using API keys
-client_openai = openai.Client(api_key=os.getenv("OPEN_API_KEY"))
-client_claude = Anthropic(api_key=os.getenv("CLAUDE_API_KEY"))
+# Latency budget for scoring one answer; judges that miss it are left out of the score
+EVALUATION_DEADLINE_S = float(os.getenv("EVALUATION_DEADLINE_S", "20"))
 
-def generate_questions(resume, jd, keywords, num_questions=2):
-    """
-    Generates a list of interview questions based on resume, job description, and keywords.
-    Uses OpenAI's GPT model to produce output in clean numbered format.
-    """
-    try:
-        # Compose prompt for question generation
-        prompt = f"""
-You are an expert job interviewer AI. Based on the following resume, job description, and keywords, generate {num_questions} technical and behavioral interview questions (easy to medium level). 
-Return only questions in numbered format. Do NOT include labels like 'Technical Question:' or use markdown.
+# Per-call timeout (seconds) and connection pool size for the async evaluation clients.
+# Defaults to half the evaluation budget, so a hung first attempt still leaves time for a retry
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", str(EVALUATION_DEADLINE_S / 2)))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_BATCH_TIMEOUT = float(os.getenv("LLM_BATCH_TIMEOUT", "120"))
 
-Resume: {resume}
-Job Description: {jd}
-Keywords: {keywords}
-        """
-
-        # Send request to OpenAI chat model
-        response = client_openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You're an expert interviewer AI."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+logger = get_logger("openai_utils")
 
-        # Parse text line-by-line, cleaning any formatting
-        raw_lines = [line.strip() for line in response.choices[0].message.content.split("\n") if line.strip()]
-        cleaned_questions = []
-
-        for line in raw_lines:
-            line = re.sub(r"^\d+\.\s*", "", line)  # Remove leading number (e.g., "1. ")
-            line = re.sub(r"\*\*(.*?)\*\*[:：]?", "", line)  # Remove bold/label formats
-            line = re.sub(r"^[:：\s]+", "", line)  # Clean extra colons or spaces
-            if line:
-                cleaned_questions.append(line)
-
-        return cleaned_questions
-
-    except Exception as e:
-        print("OpenAI Error in generate_questions:", e)
-        return []  # Fail silently with empty list if model fails
+def _load_clients():
+    """
+    Builds the OpenAI and Claude clients using API keys.
 
-def evaluate_with_chatgpt(question: str, answer: str):
+    Async clients share one pooled HTTP connection pool each, so concurrent
+    evaluations reuse keep-alive connections instead of opening new ones.
     """
-    Evaluates the quality of an answer based on clarity, technical depth, and structure using OpenAI GPT.
-    Expects structured JSON output.
+    import httpx
+    import openai
+    from anthropic import Anthropic, AsyncAnthropic
+
+    http_limits = httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+    )
+    return SimpleNamespace(
+        openai=openai.Client(api_key=os.getenv("OPEN_API_KEY")),
+        claude=Anthropic(api_key=os.getenv("CLAUDE_API_KEY")),
+        async_openai=openai.AsyncOpenAI(
+            api_key=os.getenv("OPEN_API_KEY"),
+            timeout=LLM_TIMEOUT,
+            http_client=openai.DefaultAsyncHttpxClient(limits=http_limits, timeout=LLM_TIMEOUT),
+        ),
+        async_claude=AsyncAnthropic(
+            api_key=os.getenv("CLAUDE_API_KEY"),
+            timeout=LLM_TIMEOUT,
+            http_client=httpx.AsyncClient(limits=http_limits, timeout=LLM_TIMEOUT),
+        ),
+    )
+
+registry.register("llm_clients", _load_clients)
+
+def _clients():
+    return registry.get("llm_clients")
+
+# Memoizes completions for identical model + prompt + parameters
+llm_cache = LLMCache()
+
+# Per-provider circuit breakers and latency history for the evaluation calls
+breakers = {"openai": CircuitBreaker("openai"), "anthropic": CircuitBreaker("anthropic")}
+latencies = {"openai": LatencyTracker(), "anthropic": LatencyTracker()}
+
+def _deadline(budget: float) -> float:
+    return asyncio.get_running_loop().time() + budget
+
+def _chat_gpt(messages, parse, model="gpt-4o"):
     """
-    prompt = f"""
+    Cached GPT chat completion. Only replies that `parse` accepts are cached.
+    """
+    key = cache_key(f"openai:{model}", messages)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return parse(cached)
+
+    with track_stage("llm_openai"):
+        response = _clients().openai.chat.completions.create(model=model, messages=messages)
+    content = response.choices[0].message.content
+    result = parse(content)
+    llm_cache.set(key, content)
+    return result
+
+async def _chat_gpt_async(messages, parse, model="gpt-4o", timeout=LLM_TIMEOUT, latency: LatencyTracker = None):
+    """
+    Cached async GPT chat completion. Only network calls are recorded in `latency`.
+    """
+    key = cache_key(f"openai:{model}", messages)
+    cached = await llm_cache.get_async(key)
+    if cached is not None:
+        return parse(cached)
+
+    started = time.perf_counter()
+    with track_stage("llm_openai"):
+        response = await _clients().async_openai.chat.completions.create(model=model, messages=messages, timeout=timeout)
+    if latency is not None:
+        latency.record(time.perf_counter() - started)
+    content = response.choices[0].message.content
+    result = parse(content)
+    await llm_cache.set_async(key, content)
+    return result
+
+def _chat_claude(messages, parse, model="claude-3-haiku-20240307", max_tokens=1024):
+    """
+    Cached Claude message completion. Only replies that `parse` accepts are cached.
+    """
+    key = cache_key(f"anthropic:{model}", messages, max_tokens=max_tokens)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return parse(cached)
+
+    with track_stage("llm_anthropic"):
+        response = _clients().claude.messages.create(model=model, max_tokens=max_tokens, messages=messages)
+    content = response.content[0].text
+    result = parse(content)
+    llm_cache.set(key, content)
+    return result
+
+async def _chat_claude_async(messages, parse, model="claude-3-haiku-20240307", max_tokens=1024, timeout=LLM_TIMEOUT,
+                             latency: LatencyTracker = None):
+    """
+    Cached async Claude message completion. Only network calls are recorded in `latency`.
+    """
+    key = cache_key(f"anthropic:{model}", messages, max_tokens=max_tokens)
+    cached = await llm_cache.get_async(key)
+    if cached is not None:
+        return parse(cached)
+
+    started = time.perf_counter()
+    with track_stage("llm_anthropic"):
+        response = await _clients().async_claude.messages.create(
+            model=model, max_tokens=max_tokens, messages=messages, timeout=timeout
+        )
+    if latency is not None:
+        latency.record(time.perf_counter() - started)
+    content = response.content[0].text
+    result = parse(content)
+    await llm_cache.set_async(key, content)
+    return result
+
+# Scores returned when an evaluator fails, with the error as feedback; failed results
+# are flagged so they're left out of the answer's score rather than averaged in as zeros
+def _failed_evaluation(error):
+    return {
+        "clarity": 0,
+        "technical_depth": 0,
+        "structure": 0,
+        "feedback": str(error) or type(error).__name__,
+        "failed": True,
+    }
+
+def _parse_evaluation(content: str):
+    """
+    Parses an evaluator's JSON reply, stripping Markdown code fences if present.
+    """
+    content = content.strip()
+    if content.startswith("```"):
+        content = re.sub(r"^```(json)?", "", content).strip("`").strip()
+    return json.loads(content)
+
+def _chatgpt_evaluation_prompt(question: str, answer: str) -> str:
+    return f"""
 You are an AI interview evaluator. Rate the following answer on:
 - Clarity (1–10)
 - Technical Depth (1–10)
@@ -79,82 +184,330 @@ Question: {question}
 Answer: {answer}
     """
 
+def _claude_evaluation_prompt(question: str, answer: str) -> str:
+    return f"""
+Evaluate the following interview response.
+
+Return JSON only:
+{{
+  "clarity": <1-10>,
+  "technical_depth": <1-10>,
+  "structure": <1-10>,
+  "feedback": "<feedback>"
+}}
+
+Question: {question}
+Answer: {answer}
+    """
+
+def _clean_question_line(line: str) -> str:
+    """
+    Strips numbering and label formatting from one line of the model's numbered list.
+    """
+    line = line.strip()
+    line = re.sub(r"^\d+\.\s*", "", line)  # Remove leading number (e.g., "1. ")
+    line = re.sub(r"\*\*(.*?)\*\*[:：]?", "", line)  # Remove bold/label formats
+    line = re.sub(r"^[:：\s]+", "", line)  # Clean extra colons or spaces
+    return line
+
+def _parse_questions(content: str) -> list:
+    """
+    Parses the model's numbered list line-by-line, cleaning any formatting.
+    """
+    cleaned_questions = []
+
+    for line in content.split("\n"):
+        line = _clean_question_line(line)
+        if line:
+            cleaned_questions.append(line)
+
+    return cleaned_questions
+
+def _batch_evaluation_prompt(pairs) -> str:
+    answers = "\n\n".join(
+        f"Answer {i}:\nQuestion: {question}\nAnswer: {answer}" for i, (question, answer) in enumerate(pairs, 1)
+    )
+    return f"""
+You are an AI interview evaluator. Rate each of the following {len(pairs)} answers on:
+- Clarity (1–10)
+- Technical Depth (1–10)
+- Structure (1–10)
+
+Then give concise feedback for each answer.
+
+Respond ONLY with a valid JSON array of exactly {len(pairs)} objects, in the same order as the answers:
+[
+  {{
+    "clarity": <1-10>,
+    "technical_depth": <1-10>,
+    "structure": <1-10>,
+    "feedback": "<feedback>"
+  }}
+]
+
+{answers}
+    """
+
+def _batch_parser(count: int):
+    """
+    Returns a parser that accepts only a JSON array with one evaluation per answer.
+    """
+    def parse(content: str):
+        results = _parse_evaluation(content)
+        if not isinstance(results, list) or len(results) != count:
+            raise ValueError(f"Expected {count} evaluations, got {len(results) if isinstance(results, list) else 'non-list'}")
+        return results
+    return parse
+
+def _question_messages(resume, jd, keywords, num_questions):
+    # Compose prompt for question generation
+    prompt = f"""
+You are an expert job interviewer AI. Based on the following resume, job description, and keywords, generate {num_questions} technical and behavioral interview questions (easy to medium level). 
+Return only questions in numbered format. Do NOT include labels like 'Technical Question:' or use markdown.
+
+Resume: {resume}
+Job Description: {jd}
+Keywords: {keywords}
+        """
+    return [
+        {"role": "system", "content": "You're an expert interviewer AI."},
+        {"role": "user", "content": prompt}
+    ]
+
+def generate_questions(resume, jd, keywords, num_questions=2):
+    """
+    Generates a list of interview questions based on resume, job description, and keywords.
+    Uses OpenAI's GPT model to produce output in clean numbered format.
+    """
+    try:
+        # Send request to OpenAI chat model (cached for identical inputs)
+        return _chat_gpt(_question_messages(resume, jd, keywords, num_questions), parse=_parse_questions)
+
+    except Exception as e:
+        logger.error("question_generation_failed", extra={"error": str(e)})
+        return []  # Fail silently with empty list if model fails
+
+async def generate_questions_stream(resume, jd, keywords, num_questions=2, model="gpt-4o", raise_errors=False):
+    """
+    Streaming version of generate_questions: yields each cleaned question as soon as
+    its line of the completion is finished, instead of waiting for the whole list.
+    The full completion is cached like generate_questions, so replays are instant.
+
+    Errors end the stream silently unless raise_errors is set, in which case they are
+    re-raised after the questions yielded so far.
+    """
+    messages = _question_messages(resume, jd, keywords, num_questions)
+    key = cache_key(f"openai:{model}", messages)
+    cached = await llm_cache.get_async(key)
+    if cached is not None:
+        for question in _parse_questions(cached):
+            yield question
+        return
+
+    content = []
+    buffer = ""
+    started = time.perf_counter()
+    try:
+        stream = await _clients().async_openai.chat.completions.create(model=model, messages=messages, stream=True)
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            content.append(delta)
+            buffer += delta
+
+            # Emit every completed line
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                question = _clean_question_line(line)
+                if question:
+                    yield question
+
+        question = _clean_question_line(buffer)
+        if question:
+            yield question
+
+        await llm_cache.set_async(key, "".join(content))
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_openai_stream")
+
+    except Exception as e:
+        ERRORS.inc(stage="llm_openai_stream")
+        logger.error("question_stream_failed", extra={"error": str(e)})
+        if raise_errors:
+            raise
+
+def evaluate_with_chatgpt(question: str, answer: str):
+    """
+    Evaluates the quality of an answer based on clarity, technical depth, and structure using OpenAI GPT.
+    Expects structured JSON output.
+    """
+    prompt = _chatgpt_evaluation_prompt(question, answer)
+
     try:
         # Query GPT for evaluation
-        response = client_openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
+        return _chat_gpt(
+            [
                 {"role": "system", "content": "You're an AI interview evaluator."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            parse=_parse_evaluation,
         )
 
-        content = response.choices[0].message.content.strip()
-
-        # Strip Markdown formatting if present (e.g., ```json)
-        if content.startswith("```"):
-            content = re.sub(r"^```(json)?", "", content).strip("`").strip()
-
-        return json.loads(content)
-
     except Exception as e:
-        print("GPT Evaluation Error:", e)
-        return {
-            "clarity": 0,
-            "technical_depth": 0,
-            "structure": 0,
-            "feedback": str(e)
-        }
+        logger.error("evaluation_failed", extra={"provider": "openai", "error": str(e)})
+        return _failed_evaluation(e)
 
 def evaluate_with_claude(question: str, answer: str):
     """
     Evaluates the same answer using Claude AI for a second opinion.
     Also expects structured JSON output.
     """
-    prompt = f"""
-Evaluate the following interview response.
+    prompt = _claude_evaluation_prompt(question, answer)
 
-Return JSON only:
-{{
-  "clarity": <1-10>,
-  "technical_depth": <1-10>,
-  "structure": <1-10>,
-  "feedback": "<feedback>"
-}}
+    try:
+        # Claude API call
+        return _chat_claude([{"role": "user", "content": prompt}], parse=_parse_evaluation)
 
-Question: {question}
-Answer: {answer}
+    except Exception as e:
+        logger.error("evaluation_failed", extra={"provider": "claude", "error": str(e)})
+        return _failed_evaluation(e)
+
+async def evaluate_with_chatgpt_async(question: str, answer: str, timeout: float = LLM_TIMEOUT, deadline: float = None):
+    """
+    Non-blocking version of evaluate_with_chatgpt using the pooled async OpenAI client.
+    Retries, hedges and circuit-breaks within `deadline` (event-loop time; default now + timeout).
     """
+    messages = [
+        {"role": "system", "content": "You're an AI interview evaluator."},
+        {"role": "user", "content": _chatgpt_evaluation_prompt(question, answer)}
+    ]
 
     try:
-        # Claude API call
-        response = client_claude.messages.create(
-            model="claude-3-haiku-20240307",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
+        return await call_with_policy(
+            "openai",
+            lambda remaining: _chat_gpt_async(
+                messages, parse=_parse_evaluation, timeout=min(timeout, remaining), latency=latencies["openai"]
+            ),
+            deadline if deadline is not None else _deadline(timeout),
+            breakers["openai"],
+            latencies["openai"],
         )
 
-        output = response.content[0].text.strip()
+    except Exception as e:
+        logger.error("evaluation_failed", extra={"provider": "openai", "error": str(e)})
+        return _failed_evaluation(e)
 
-        # Handle markdown if present
-        if output.startswith("```"):
-            output = re.sub(r"^```(json)?", "", output).strip("`").strip()
+async def evaluate_with_claude_async(question: str, answer: str, timeout: float = LLM_TIMEOUT, deadline: float = None):
+    """
+    Non-blocking version of evaluate_with_claude using the pooled async Anthropic client.
+    Retries, hedges and circuit-breaks within `deadline` (event-loop time; default now + timeout).
+    """
+    messages = [{"role": "user", "content": _claude_evaluation_prompt(question, answer)}]
 
-        return json.loads(output)
+    try:
+        return await call_with_policy(
+            "anthropic",
+            lambda remaining: _chat_claude_async(
+                messages, parse=_parse_evaluation, timeout=min(timeout, remaining), latency=latencies["anthropic"]
+            ),
+            deadline if deadline is not None else _deadline(timeout),
+            breakers["anthropic"],
+            latencies["anthropic"],
+        )
 
     except Exception as e:
-        print("Claude Evaluation Error:", e)
-        return {
-            "clarity": 0,
-            "technical_depth": 0,
-            "structure": 0,
-            "feedback": str(e)
-        }
+        logger.error("evaluation_failed", extra={"provider": "claude", "error": str(e)})
+        return _failed_evaluation(e)
+
+async def evaluate_answer(question: str, answer: str, timeout: float = LLM_TIMEOUT,
+                          budget: float = EVALUATION_DEADLINE_S):
+    """
+    Runs the GPT and Claude evaluations concurrently under one latency budget.
+    A judge that errors or misses the budget comes back flagged as failed.
+
+    Args:
+        question (str): The interview question.
+        answer (str): The transcribed answer.
+        timeout (float): Per-call timeout in seconds.
+        budget (float): Seconds until both judges must have answered.
+
+    Returns:
+        Tuple[Dict, Dict]: GPT result and Claude result.
+    """
+    deadline = _deadline(budget)
+    gpt_result, claude_result = await asyncio.gather(
+        evaluate_with_chatgpt_async(question, answer, timeout=timeout, deadline=deadline),
+        evaluate_with_claude_async(question, answer, timeout=timeout, deadline=deadline),
+    )
+    return gpt_result, claude_result
+
+async def evaluate_batch_with_chatgpt_async(pairs, timeout: float = LLM_BATCH_TIMEOUT):
+    """
+    Evaluates several (question, answer) pairs with a single GPT call.
+    Falls back to per-answer evaluation if the batched reply can't be used.
+    """
+    messages = [
+        {"role": "system", "content": "You're an AI interview evaluator."},
+        {"role": "user", "content": _batch_evaluation_prompt(pairs)}
+    ]
+    try:
+        # Not hedged (no latency history): a duplicate batch would double the cost of the whole interview
+        return await call_with_policy(
+            "openai",
+            lambda remaining: _chat_gpt_async(messages, parse=_batch_parser(len(pairs)), timeout=remaining),
+            _deadline(timeout),
+            breakers["openai"],
+            retries=1,
+        )
+    except Exception as e:
+        logger.warning("batch_evaluation_failed", extra={"provider": "openai", "error": str(e)})
+        return list(await asyncio.gather(*(evaluate_with_chatgpt_async(q, a) for q, a in pairs)))
+
+async def evaluate_batch_with_claude_async(pairs, timeout: float = LLM_BATCH_TIMEOUT):
+    """
+    Evaluates several (question, answer) pairs with a single Claude call.
+    Falls back to per-answer evaluation if the batched reply can't be used.
+    """
+    messages = [{"role": "user", "content": _batch_evaluation_prompt(pairs)}]
+    try:
+        return await call_with_policy(
+            "anthropic",
+            lambda remaining: _chat_claude_async(
+                messages, parse=_batch_parser(len(pairs)), max_tokens=min(4096, 400 * len(pairs) + 200), timeout=remaining
+            ),
+            _deadline(timeout),
+            breakers["anthropic"],
+            retries=1,
+        )
+    except Exception as e:
+        logger.warning("batch_evaluation_failed", extra={"provider": "claude", "error": str(e)})
+        return list(await asyncio.gather(*(evaluate_with_claude_async(q, a) for q, a in pairs)))
+
+async def evaluate_answers_batch(pairs, timeout: float = LLM_BATCH_TIMEOUT):
+    """
+    Runs one multi-answer evaluation per provider, concurrently.
+
+    Args:
+        pairs (List[Tuple[str, str]]): (question, transcript) pairs.
+        timeout (float): Per-call timeout in seconds.
+
+    Returns:
+        Tuple[List[Dict], List[Dict]]: GPT results and Claude results, in input order.
+    """
+    gpt_results, claude_results = await asyncio.gather(
+        evaluate_batch_with_chatgpt_async(pairs, timeout=timeout),
+        evaluate_batch_with_claude_async(pairs, timeout=timeout),
+    )
+    return gpt_results, claude_results
+
+def _compact_feedback(feedbacks) -> str:
+    # One numbered line per answer, with whitespace collapsed, instead of indented JSON
+    return "\n".join(f"{i}. {' '.join(str(f).split())}" for i, f in enumerate(feedbacks, 1)) or "(none)"
 
 def summarize_feedback_with_gpt(gpt_feedbacks, claude_feedbacks):
     """
     Generates an overall summary of feedback using both GPT and Claude feedback responses.
-    Output is a natural-language paragraph summarizing candidate performance.
+    Output is a natural-language paragraph summarizing candidate performance, or None on error.
     """
     prompt = f"""
 You are an expert interview coach.
@@ -162,26 +515,24 @@ You are an expert interview coach.
 Below is a list of feedbacks generated from multiple interview answers.
 
 GPT Feedbacks:
-{json.dumps(gpt_feedbacks, indent=2)}
+{_compact_feedback(gpt_feedbacks)}
 
 Claude Feedbacks:
-{json.dumps(claude_feedbacks, indent=2)}
+{_compact_feedback(claude_feedbacks)}
 
 Now summarize the candidate's overall performance, key strengths, and areas for improvement.
 Respond in a short, professional paragraph. Do not mention GPT or Claude.
     """
 
     try:
-        response = client_openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
+        return _chat_gpt(
+            [
                 {"role": "system", "content": "You are a helpful interview evaluator."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            parse=str.strip,
         )
 
-        return response.choices[0].message.content.strip()
-
     except Exception as e:
-        print("GPT Summary Error:", e)
-        return "Unable to generate summary due to an error."
+        logger.error("summary_failed", extra={"error": str(e)})
+        return None
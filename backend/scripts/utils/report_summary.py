@@ -0,0 +1,55 @@
+import os
+import asyncio
+from main import evaluation_store
+from scripts.utils.openai_utils import summarize_feedback_with_gpt
+
+# Generate the overall summary in the background as soon as a session's last answer is scored
+REPORT_PREFETCH_SUMMARY = os.getenv("REPORT_PREFETCH_SUMMARY", "1") == "1"
+
+# Summaries currently being generated, keyed by (session_id, version)
+_inflight = {}
+# Keep references to fire-and-forget tasks so they aren't garbage-collected mid-run
+_background = set()
+
+async def _generate(session_id: str, version: int):
+    gpt_feedbacks, claude_feedbacks = await asyncio.to_thread(evaluation_store.feedbacks, session_id)
+    summary = await asyncio.to_thread(summarize_feedback_with_gpt, gpt_feedbacks, claude_feedbacks)
+
+    # Only cache it if no answers arrived while it was being written
+    if summary is not None and evaluation_store.version(session_id) == version:
+        evaluation_store.set_summary(session_id, version, summary)
+    return summary
+
+async def get_summary(session_id: str, version: int):
+    """
+    Returns the overall feedback summary for this version of the session's evaluations,
+    generating it at most once per version (concurrent callers share one LLM call).
+
+    Returns:
+        str: Summary paragraph, or None if it couldn't be generated
+    """
+    cached = evaluation_store.summary(session_id, version)
+    if cached is not None:
+        return cached
+
+    key = (session_id, version)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_generate(session_id, version))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # A caller that disconnects must not cancel the generation other callers are waiting on
+    return await asyncio.shield(task)
+
+def prefetch_summary(session_id: str):
+    """
+    Starts generating the session's summary in the background, if enabled.
+    """
+    if not REPORT_PREFETCH_SUMMARY:
+        return
+    version = evaluation_store.version(session_id)
+    if not version:
+        return
+    task = asyncio.create_task(get_summary(session_id, version))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
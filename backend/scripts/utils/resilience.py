@@ -0,0 +1,188 @@
+import os
+import time
+import random
+import asyncio
+from collections import deque
+from scripts.utils.metrics import Counter, Gauge
+
+# Retry, hedging and circuit breaker settings (overridable via environment)
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+LLM_RETRY_BASE_S = float(os.getenv("LLM_RETRY_BASE_S", "0.5"))
+LLM_HEDGE_MIN_DELAY_S = float(os.getenv("LLM_HEDGE_MIN_DELAY_S", "1.0"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_S = float(os.getenv("BREAKER_RESET_S", "30"))
+
+CALL_EVENTS = Counter(
+    "mockai_llm_call_events_total",
+    "Resilience events per provider (retry, hedge, hedge_won, deadline, circuit_open).",
+    labelnames=("provider", "event"),
+)
+CIRCUIT_OPEN = Gauge(
+    "mockai_circuit_open",
+    "1 while a provider's circuit breaker is open.",
+    labelnames=("provider",),
+)
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of calling a provider whose circuit breaker is open.
+    """
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when a call doesn't succeed within its latency budget.
+    """
+
+class CircuitBreaker:
+    """
+    Stops calling a provider after `failure_threshold` consecutive failures. After `reset_after`
+    seconds one trial call is let through (half-open); its success closes the circuit again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_after: float = BREAKER_RESET_S):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+        CIRCUIT_OPEN.set_function(lambda: int(self.is_open), provider=name)
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        # One trial at a time; a trial that never reported back (e.g. cancelled) expires
+        trial_idle = self._trial_started is None or now - self._trial_started >= self.reset_after
+        if now - self.opened_at >= self.reset_after and trial_idle:
+            self._trial_started = now
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_started is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_started = None
+
+class LatencyTracker:
+    """
+    Rolling window of successful network call latencies (cache hits excluded), used to decide when to hedge.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def p95(self):
+        """
+        Returns the 95th percentile latency, or None until enough calls have been seen.
+        """
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+async def _first_success(tasks: set, deadline: float):
+    """
+    Waits for the first task to succeed; raises the last error if they all fail, or
+    DeadlineExceeded if none has succeeded by `deadline` (event-loop time).
+
+    Timeouts raised by the calls themselves (e.g. a client read timeout) are ordinary
+    failures, so only running out of budget here is treated as the deadline.
+    """
+    loop = asyncio.get_running_loop()
+    error = None
+    while tasks:
+        done, tasks = await asyncio.wait(
+            tasks, timeout=max(0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            raise DeadlineExceeded()
+        for task in done:
+            if task.exception() is None:
+                return task
+            error = task.exception()
+    raise error
+
+async def call_with_policy(provider: str, make_call, deadline: float, breaker: CircuitBreaker,
+                           latency: LatencyTracker = None, retries: int = LLM_RETRIES):
+    """
+    Calls a provider within a latency budget.
+
+    - Fails fast with CircuitOpen while the provider's breaker is open.
+    - If a call runs past the provider's p95 latency, a duplicate is sent and the first reply wins.
+    - Failed calls are retried with full-jitter exponential backoff while budget remains.
+
+    Args:
+        provider (str): Provider name, for metrics
+        make_call (Callable[[float], Awaitable]): Starts one call given its timeout in seconds
+        deadline (float): Event-loop time (loop.time()) by which a result is needed
+        breaker (CircuitBreaker): The provider's circuit breaker
+        latency (LatencyTracker): The provider's latency history, recorded by `make_call` for network
+            calls only; calls are only hedged when given
+        retries (int): Retries after the first failed attempt
+
+    Returns:
+        The first successful call's result
+    """
+    loop = asyncio.get_running_loop()
+    error = None
+
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            CALL_EVENTS.inc(provider=provider, event="circuit_open")
+            raise CircuitOpen(f"{provider} circuit breaker is open.")
+
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+
+        primary = asyncio.ensure_future(make_call(remaining))
+        tasks = {primary}
+        try:
+            p95 = latency.p95() if latency is not None else None
+            hedge_after = max(p95, LLM_HEDGE_MIN_DELAY_S) if p95 is not None else None
+            if hedge_after is not None and hedge_after < remaining:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    CALL_EVENTS.inc(provider=provider, event="hedge")
+                    tasks.add(asyncio.ensure_future(make_call(deadline - loop.time())))
+            winner = await _first_success(set(tasks), deadline)
+            if winner is not primary:
+                CALL_EVENTS.inc(provider=provider, event="hedge_won")
+            breaker.record_success()
+            return winner.result()
+        except DeadlineExceeded:
+            CALL_EVENTS.inc(provider=provider, event="deadline")
+            breaker.record_failure()
+            raise DeadlineExceeded(f"{provider} did not respond within the latency budget.")
+        except Exception as e:
+            breaker.record_failure()
+            error = e
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Full jitter: sleep a random fraction of the exponential backoff, if the budget allows
+        if attempt < retries:
+            backoff = random.uniform(0, LLM_RETRY_BASE_S * 2 ** attempt)
+            if loop.time() + backoff >= deadline:
+                break
+            CALL_EVENTS.inc(provider=provider, event="retry")
+            await asyncio.sleep(backoff)
+
+    raise error or DeadlineExceeded(f"{provider} did not respond within the latency budget.")
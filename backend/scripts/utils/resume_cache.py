@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from scripts.utils.llm_cache import BACKEND_DIR
+from scripts.utils.metrics import CACHE_REQUESTS
+from scripts.utils.log_utils import get_logger
+
+# Cache settings (overridable via environment)
+RESUME_CACHE_PATH = os.getenv("RESUME_CACHE_PATH", os.path.join(BACKEND_DIR, "resume_cache.db"))
+RESUME_CACHE_ENABLED = os.getenv("RESUME_CACHE_ENABLED", "1") == "1"
+RESUME_CACHE_TTL_S = float(os.getenv("RESUME_CACHE_TTL_S", str(30 * 24 * 60 * 60)))
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "500"))
+# Reuse the generated question set for a repeated resume + JD + question count (skips the LLM)
+RESUME_CACHE_QUESTIONS = os.getenv("RESUME_CACHE_QUESTIONS", "1") == "1"
+
+logger = get_logger("resume_cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_cache (
+    key TEXT PRIMARY KEY,
+    file_hash TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    text TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    questions TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resume_cache_file ON resume_cache (file_hash);
+CREATE INDEX IF NOT EXISTS idx_resume_cache_used ON resume_cache (last_used);
+"""
+
+def resume_key(file_hash: str, job_description: str) -> str:
+    """
+    Cache key for one resume (by the SHA-256 of its bytes) paired with one job description.
+    """
+    return hashlib.sha256(f"{file_hash}\x00{job_description.strip()}".encode("utf-8")).hexdigest()
+
+class ResumeCache:
+    """
+    Caches what /upload-resume derives from a resume + job description: the extracted text,
+    the keywords and the generated question sets (per question count).
+
+    Entries are evicted least-recently-used beyond `max_entries` and after `ttl` seconds;
+    content-addressed upload files are deleted once no entry references them.
+    """
+
+    def __init__(self, db_path: str = RESUME_CACHE_PATH, ttl: float = RESUME_CACHE_TTL_S,
+                 max_entries: int = RESUME_CACHE_MAX_ENTRIES, enabled: bool = RESUME_CACHE_ENABLED):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+        if enabled:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def get(self, key: str):
+        """
+        Returns {"text", "keywords", "questions"} for a cached resume + JD, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, keywords, questions FROM resume_cache WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                CACHE_REQUESTS.inc(cache="resume", result="miss")
+                return None
+            self._conn.execute("UPDATE resume_cache SET last_used = ? WHERE key = ?", (now, key))
+
+        CACHE_REQUESTS.inc(cache="resume", result="hit")
+        return {
+            "text": row["text"],
+            "keywords": json.loads(row["keywords"]),
+            "questions": json.loads(row["questions"]),
+        }
+
+    def text_for_file(self, file_hash: str):
+        """
+        Returns the extracted text of a resume seen before with any job description, or None.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM resume_cache WHERE file_hash = ? AND created_at >= ? LIMIT 1",
+                (file_hash, time.time() - self.ttl),
+            ).fetchone()
+        CACHE_REQUESTS.inc(cache="resume_text", result="hit" if row else "miss")
+        return row["text"] if row else None
+
+    def set(self, key: str, file_hash: str, file_path: str, text: str, keywords: list):
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resume_cache (key, file_hash, file_path, text, keywords, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, file_hash, file_path, text, json.dumps(keywords), now, now),
+            )
+            self._trim(now)
+
+    def set_questions(self, key: str, num_questions: int, questions: list):
+        """
+        Stores the question set generated for this resume + JD and question count.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            row = self._conn.execute("SELECT questions FROM resume_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            question_sets = json.loads(row["questions"])
+            question_sets[str(num_questions)] = questions
+            self._conn.execute(
+                "UPDATE resume_cache SET questions = ? WHERE key = ?", (json.dumps(question_sets), key)
+            )
+
+    def _trim(self, now):
+        expired = self._conn.execute(
+            "SELECT key, file_path FROM resume_cache WHERE created_at < ? "
+            "UNION SELECT key, file_path FROM (SELECT key, file_path FROM resume_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (now - self.ttl, self.max_entries),
+        ).fetchall()
+        if not expired:
+            return
+
+        self._conn.executemany("DELETE FROM resume_cache WHERE key = ?", [(row["key"],) for row in expired])
+
+        # Delete stored uploads that no remaining entry points to
+        for path in {row["file_path"] for row in expired}:
+            still_used = self._conn.execute("SELECT 1 FROM resume_cache WHERE file_path = ? LIMIT 1", (path,)).fetchone()
+            if still_used is None and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning("upload_delete_failed", extra={"path": path, "error": str(e)})
+
+# Shared cache used by the upload route
+resume_cache = ResumeCache()
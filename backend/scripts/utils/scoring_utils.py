@@ -1,43 +1,18 @@
-import json
-import os
-from datetime import datetime
-from main import FACE_LOG_PATH
+from scripts.utils.session_manager import DEFAULT_SESSION
 
-def get_average_face_confidence():
+def get_average_face_confidence(face_store, session_id: str = DEFAULT_SESSION):
     """
-    Reads face confidence scores from the log file and returns a weighted average.
+    Returns the session's average face confidence from the in-memory time series.
     Applies a penalty if too many frames had no face detected (score = 0).
 
+    Args:
+        face_store (FaceConfidenceStore): Store holding the per-session face samples.
+        session_id (str): Session to average.
+
     Returns:
         float: Final face confidence score between 0 and 100.
     """
-    print("Called get_average_face_confidence", flush=True)
-
-    if not os.path.exists(FACE_LOG_PATH):
-        print(f"File not found: {FACE_LOG_PATH}", flush=True)
-        return 0
-
-    try:
-        with open(FACE_LOG_PATH, "r") as f:
-            data = json.load(f)
-
-        if not data:
-            return 0
-
-        scores = [entry["confidence"] for entry in data]
-        missing_frames = sum(1 for score in scores if score == 0)
-
-        # Apply penalty if many frames had no face detected
-        penalty = min((missing_frames / len(scores)) * 20, 20)  # Max penalty = 20
-
-        average_score = sum(scores) / len(scores)
-        final_score = max(0, average_score - penalty)
-
-        return round(final_score, 2)
-
-    except Exception as e:
-        print("Error reading face confidence log:", e)
-        return 0
+    return face_store.average(session_id)
 
 def calculate_total_score(face_conf, answer_score, clarity, pronunciation):
     """
@@ -0,0 +1,342 @@
+import os
+import re
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from scripts.utils.log_utils import get_logger
+
+# Session settings (overridable via environment)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # "memory" or "sqlite"
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", str(2 * 60 * 60)))
+SESSION_MAX = int(os.getenv("SESSION_MAX", "1000"))
+# A cross-process session lock not released within this long is assumed abandoned (e.g. its worker died)
+SESSION_LOCK_TTL_S = float(os.getenv("SESSION_LOCK_TTL_S", "600"))
+# "realtime" scores each answer on submit; "deferred" batch-scores them at report time
+SCORING_MODE = os.getenv("SCORING_MODE", "realtime")
+
+SESSION_HEADER = "X-Session-Id"
+SESSION_COOKIE = "session_id"
+DEFAULT_SESSION = "default"
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+logger = get_logger("session_manager")
+
+def new_session_state():
+    return {
+        "questions": [],
+        "current_index": 0,  # Start from 0 always
+        "scoring_mode": SCORING_MODE,
+        "generating": False,  # True while questions are still streaming in
+        "generation_id": None,
+    }
+
+def get_session_id(conn) -> str:
+    """
+    Reads the session id from a Request or WebSocket: header, then cookie, then query parameter.
+    Falls back to the shared default session for clients that don't send a valid one.
+    """
+    session_id = (
+        conn.headers.get(SESSION_HEADER)
+        or conn.cookies.get(SESSION_COOKIE)
+        or conn.query_params.get("session_id")
+    )
+    # Session ids end up in file names, so only accept simple tokens
+    if session_id and SESSION_ID_PATTERN.match(session_id):
+        return session_id
+    return DEFAULT_SESSION
+
+class MemorySessionBackend:
+    """
+    In-process session store with TTL expiry and LRU eviction.
+    Only suitable for a single worker.
+    """
+
+    shared = False
+
+    def __init__(self, ttl: float = SESSION_TTL_S, max_sessions: int = SESSION_MAX):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session_id -> (last_access, state)
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return json.loads(entry[1])
+
+    def save(self, session_id: str, state: dict):
+        with self._lock:
+            self._sessions[session_id] = (time.time(), json.dumps(state))
+            self._sessions.move_to_end(session_id)
+
+    def update(self, session_id: str, mutate):
+        """
+        Applies mutate(state) and saves the result atomically; returns what mutate returned.
+        """
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                state = new_session_state()
+            else:
+                state = json.loads(entry[1])
+            result = mutate(state)
+            self._sessions[session_id] = (time.time(), json.dumps(state))
+            self._sessions.move_to_end(session_id)
+        return result
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict(self) -> list:
+        """
+        Drops expired sessions and the least recently used ones beyond max_sessions.
+        """
+        now = time.time()
+        evicted = []
+        with self._lock:
+            for session_id, (last_access, _) in list(self._sessions.items()):
+                if now - last_access > self.ttl:
+                    del self._sessions[session_id]
+                    evicted.append(session_id)
+            while len(self._sessions) > self.max_sessions:
+                session_id, _ = self._sessions.popitem(last=False)
+                evicted.append(session_id)
+        return evicted
+
+class SQLiteSessionBackend:
+    """
+    Session store shared by every worker process on one machine (e.g. uvicorn --workers N).
+
+    Changes that depend on the current state must go through update(), which holds SQLite's
+    write lock (BEGIN IMMEDIATE) across the read and the write so other processes can't
+    interleave; a load() followed by save() is not atomic across workers.
+
+    Also holds the per-session lock leases that make SessionManager.lock() exclusive across workers.
+    """
+
+    shared = True
+
+    def __init__(self, db_path: str, ttl: float = SESSION_TTL_S, max_sessions: int = SESSION_MAX):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_locks (id TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def load(self, session_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, last_access FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                return None
+            self._conn.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (time.time(), session_id))
+            return json.loads(row[0])
+
+    def save(self, session_id: str, state: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (id, state, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET state = excluded.state, last_access = excluded.last_access",
+                (session_id, json.dumps(state), time.time()),
+            )
+
+    def update(self, session_id: str, mutate):
+        """
+        Applies mutate(state) and saves the result in one write transaction; returns what mutate returned.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT state, last_access FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                state = new_session_state() if row is None or time.time() - row[1] > self.ttl else json.loads(row[0])
+                result = mutate(state)
+                self._conn.execute(
+                    "INSERT INTO sessions (id, state, last_access) VALUES (?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET state = excluded.state, last_access = excluded.last_access",
+                    (session_id, json.dumps(state), time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def try_lock(self, session_id: str, owner: str, ttl: float = SESSION_LOCK_TTL_S) -> bool:
+        """
+        Takes the session's lock lease for `owner` if it is free or expired; returns whether it was taken.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO session_locks (id, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE session_locks.expires_at < ?",
+                (session_id, owner, now + ttl, now),
+            )
+            return cursor.rowcount == 1
+
+    def unlock(self, session_id: str, owner: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM session_locks WHERE id = ? AND owner = ?", (session_id, owner))
+
+    def evict(self) -> list:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [r[0] for r in self._conn.execute(
+                "SELECT id FROM sessions WHERE last_access < ?", (cutoff,)
+            )]
+            overflow = [r[0] for r in self._conn.execute(
+                "SELECT id FROM sessions WHERE last_access >= ? ORDER BY last_access DESC LIMIT -1 OFFSET ?",
+                (cutoff, self.max_sessions),
+            )]
+            evicted = expired + overflow
+            self._conn.executemany("DELETE FROM sessions WHERE id = ?", [(sid,) for sid in evicted])
+            self._conn.execute("DELETE FROM session_locks WHERE expires_at < ?", (time.time(),))
+        return evicted
+
+class SessionLock:
+    """
+    Async context manager for one session's lock: the worker's asyncio lock, plus the backend's
+    lease when the backend is shared, so the section runs in at most one worker at a time.
+    Waiters in the same worker queue on the asyncio lock; other workers poll for the lease.
+    """
+
+    def __init__(self, local: asyncio.Lock, backend, session_id: str):
+        self.local = local
+        self.backend = backend
+        self.session_id = session_id
+        self._owner = None
+
+    async def __aenter__(self):
+        await self.local.acquire()
+        if not self.backend.shared:
+            return self
+        try:
+            owner = uuid.uuid4().hex
+            delay = 0.05
+            while not await asyncio.to_thread(self.backend.try_lock, self.session_id, owner):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 1.0)
+            self._owner = owner
+        except BaseException:
+            self.local.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            if self._owner is not None:
+                await asyncio.to_thread(self.backend.unlock, self.session_id, self._owner)
+                self._owner = None
+        finally:
+            self.local.release()
+
+class SessionManager:
+    """
+    Per-candidate interview state keyed by session id.
+
+    update() applies a read-modify-write atomically in the backend (across worker processes
+    with the SQLite backend). lock() guards longer sections that must not run twice
+    concurrently for one session; with the SQLite backend it holds across workers too.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.on_evict = []  # Callbacks receiving each evicted session id
+        self._locks = {}
+        self._updates = {}  # session_id -> Event set on the next notify()
+
+    def create(self) -> str:
+        session_id = uuid.uuid4().hex
+        self.backend.save(session_id, new_session_state())
+        return session_id
+
+    def get(self, session_id: str) -> dict:
+        state = self.backend.load(session_id)
+        return state if state is not None else new_session_state()
+
+    def save(self, session_id: str, state: dict):
+        self.backend.save(session_id, state)
+
+    def update(self, session_id: str, mutate):
+        """
+        Atomically applies mutate(state) to the session's stored state and returns mutate's result.
+        mutate runs while the backend is locked, so it must be quick and must not await.
+        """
+        return self.backend.update(session_id, mutate)
+
+    def lock(self, session_id: str) -> SessionLock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return SessionLock(lock, self.backend, session_id)
+
+    def notify(self, session_id: str):
+        """
+        Wakes every coroutine waiting in wait_for_update for this session.
+        """
+        event = self._updates.pop(session_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for_update(self, session_id: str, timeout: float):
+        """
+        Waits until the session is updated in this process, or the timeout passes.
+        Callers re-read state afterwards; the timeout doubles as polling for shared backends
+        where the update may come from another worker.
+        """
+        event = self._updates.setdefault(session_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def evict(self):
+        for session_id in self.backend.evict():
+            lock = self._locks.get(session_id)
+            if lock is not None and not lock.locked():
+                del self._locks[session_id]
+            for callback in self.on_evict:
+                try:
+                    callback(session_id)
+                except Exception as e:
+                    logger.error("eviction_hook_failed", extra={"session_id": session_id, "error": str(e)})
+
+    async def run_eviction(self, interval: float = 60):
+        """
+        Background task that periodically evicts idle sessions.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.evict()
+
+def create_session_manager(db_path: str) -> SessionManager:
+    if SESSION_BACKEND == "sqlite":
+        return SessionManager(SQLiteSessionBackend(db_path))
+    return SessionManager(MemorySessionBackend())
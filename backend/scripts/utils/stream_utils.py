@@ -0,0 +1,219 @@
+import io
+import os
+import asyncio
+import threading
+import numpy as np
+from scripts.utils.model_registry import registry
+from scripts.utils.whisper_utils import SAMPLE_RATE, WHISPER_CHUNK_LENGTH_S
+from scripts.utils.transcription_engine import engine
+from scripts.utils.metrics import track_stage
+
+# Silence (ms) after speech before a segment is considered finished and sent to Whisper
+STREAM_MIN_SILENCE_MS = int(os.getenv("STREAM_MIN_SILENCE_MS", "700"))
+# Minimum time (seconds) between VAD checks of the uncommitted audio
+STREAM_DECODE_INTERVAL_S = float(os.getenv("STREAM_DECODE_INTERVAL_S", "1.0"))
+# Uncommitted audio longer than this is transcribed even without a pause, so VAD and
+# Whisper never see more than one window per pass
+STREAM_MAX_SEGMENT_S = float(os.getenv("STREAM_MAX_SEGMENT_S", str(WHISPER_CHUNK_LENGTH_S)))
+
+def _load_vad():
+    # Silero VAD model is cached by faster-whisper after the first load
+    from faster_whisper.vad import get_vad_model
+    return get_vad_model()
+
+registry.register("silero_vad", _load_vad)
+
+class ChunkPipe(io.RawIOBase):
+    """
+    Read side of a byte stream that is still being received: read() blocks until
+    more chunks arrive or the input is closed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._input_closed = False
+        self._cond = threading.Condition()
+
+    def readable(self) -> bool:
+        return True
+
+    def feed(self, chunk: bytes):
+        with self._cond:
+            self._buffer.extend(chunk)
+            self._cond.notify()
+
+    def close_input(self):
+        with self._cond:
+            self._input_closed = True
+            self._cond.notify()
+
+    def readinto(self, target) -> int:
+        with self._cond:
+            while not self._buffer and not self._input_closed:
+                self._cond.wait()
+            n = min(len(target), len(self._buffer))
+            target[:n] = self._buffer[:n]
+            del self._buffer[:n]
+            return n
+
+class StreamDecoder:
+    """
+    Decodes a compressed audio stream (webm, ogg, ...) incrementally on a background thread,
+    so every received byte is demuxed and decoded exactly once. Containers such as webm only
+    carry their headers in the first chunk, which a persistent decoder keeps.
+    """
+
+    def __init__(self):
+        self._pipe = ChunkPipe()
+        self._parts = []
+        self._parts_lock = threading.Lock()
+        self.error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import av
+
+        try:
+            with av.open(self._pipe, mode="r") as container:
+                resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+                for frame in container.decode(audio=0):
+                    self._append(resampler.resample(frame))
+                self._append(resampler.resample(None))
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    def _append(self, frames):
+        for frame in frames:
+            samples = frame.to_ndarray().reshape(-1).astype(np.float32) / 32768.0
+            with self._parts_lock:
+                self._parts.append(samples)
+
+    def feed(self, chunk: bytes):
+        self._pipe.feed(chunk)
+
+    def take(self) -> np.ndarray:
+        """
+        Returns the samples decoded since the last call.
+        """
+        with self._parts_lock:
+            parts, self._parts = self._parts, []
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+    def close(self):
+        """
+        Ends the input; the decoder flushes what it has and stops.
+        """
+        self._pipe.close_input()
+
+    def finish(self):
+        """
+        Ends the input and blocks until everything has been decoded.
+        """
+        self.close()
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+
+class StreamingTranscriber:
+    """
+    Incrementally transcribes an answer while it is being recorded.
+
+    Audio chunks are decoded as they arrive (raw pcm16 needs no decoding). At most every
+    STREAM_DECODE_INTERVAL_S, the uncommitted audio is run through Silero VAD; every speech
+    segment that has been followed by enough silence is transcribed, committed to the running
+    transcript and dropped from memory. When recording stops only the final, still-open
+    segment has to be transcribed.
+    """
+
+    def __init__(self, audio_format: str = "webm"):
+        self.audio_format = audio_format
+        self.transcript_parts = []
+        self.mispronounced_words = []
+        self.received = False
+        self._pending = np.zeros(0, dtype=np.float32)  # Decoded, not yet transcribed
+        self._pcm = bytearray()  # Odd trailing byte of a pcm16 chunk
+        self._decoder = None if audio_format == "pcm16" else StreamDecoder()
+        self._last_check = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(part for part in self.transcript_parts if part)
+
+    def add_chunk(self, chunk: bytes):
+        self.received = True
+        if self._decoder is not None:
+            self._decoder.feed(chunk)
+            return
+
+        self._pcm.extend(chunk)
+        usable = len(self._pcm) - len(self._pcm) % 2
+        samples = np.frombuffer(bytes(self._pcm[:usable]), dtype=np.int16).astype(np.float32) / 32768.0
+        del self._pcm[:usable]
+        self._pending = np.concatenate([self._pending, samples])
+
+    def close(self):
+        """
+        Stops the background decoder (e.g. when the socket goes away before "stop").
+        """
+        if self._decoder is not None:
+            self._decoder.close()
+
+    def _collect(self):
+        if self._decoder is not None:
+            new = self._decoder.take()
+            if len(new):
+                self._pending = np.concatenate([self._pending, new])
+        return self._pending
+
+    def _closed_segment_end(self, pending) -> int:
+        """
+        Returns the sample offset (relative to `pending`) where the last finished speech segment ends, or 0.
+        """
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        registry.get("silero_vad")
+        silence_samples = STREAM_MIN_SILENCE_MS * SAMPLE_RATE // 1000
+        speech = get_speech_timestamps(pending, VadOptions(min_silence_duration_ms=STREAM_MIN_SILENCE_MS))
+        closed = [s for s in speech if len(pending) - s["end"] >= silence_samples]
+        return closed[-1]["end"] if closed else 0
+
+    async def process(self, final: bool = False) -> bool:
+        """
+        Transcribes any finished speech segments (or everything left when final=True).
+
+        Returns:
+            bool: True if the transcript changed.
+        """
+        async with self._lock:
+            if not self.received:
+                return False
+
+            loop = asyncio.get_running_loop()
+            if final:
+                if self._decoder is not None:
+                    # Only waits for the decoder to catch up on the last chunks
+                    with track_stage("audio_decode_stream"):
+                        await asyncio.to_thread(self._decoder.finish)
+            elif self._last_check is not None and loop.time() - self._last_check < STREAM_DECODE_INTERVAL_S:
+                return False
+            self._last_check = loop.time()
+
+            pending = self._collect()
+            if final or len(pending) >= STREAM_MAX_SEGMENT_S * SAMPLE_RATE:
+                cut = len(pending)
+            else:
+                cut = await asyncio.to_thread(self._closed_segment_end, pending)
+            if cut <= 0:
+                return False
+
+            text, words = await engine.transcribe_samples(pending[:cut])
+            self._pending = self._pending[cut:]
+            self.transcript_parts.append(text.strip())
+            self.mispronounced_words.extend(words)
+            return bool(text.strip())
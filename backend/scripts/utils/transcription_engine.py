@@ -0,0 +1,182 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from scripts.utils import whisper_utils
+from scripts.utils.model_registry import registry
+from scripts.utils.metrics import QUEUE_DEPTH, track_stage
+from scripts.utils.log_utils import get_logger
+
+# Pool sizing (overridable via environment)
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "2"))
+WHISPER_MAX_QUEUE = int(os.getenv("WHISPER_MAX_QUEUE", "16"))
+
+# Cross-answer batching (only with the batched pipeline, WHISPER_BATCH_SIZE > 0)
+WHISPER_BATCH_MAX_ANSWERS = int(os.getenv("WHISPER_BATCH_MAX_ANSWERS", "8"))
+WHISPER_BATCH_WAIT_MS = int(os.getenv("WHISPER_BATCH_WAIT_MS", "20"))
+
+logger = get_logger("transcription_engine")
+
+class TranscriptionQueueFull(Exception):
+    """
+    Raised when the transcription queue already holds the maximum number of jobs.
+    """
+
+class TranscriptionEngine:
+    """
+    Runs Whisper transcription in a pool of worker processes, each with its own preloaded model,
+    so long answers never block the event loop.
+
+    At most `max_queue` jobs may be queued or running at once; further submissions are rejected
+    with TranscriptionQueueFull instead of piling up unbounded.
+
+    When the batched pipeline is enabled, answers queued while every worker is busy are handed
+    to the next free worker together (up to `max_batch` at a time) and decoded in shared batches.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = WHISPER_NUM_WORKERS,
+        max_queue: int = WHISPER_MAX_QUEUE,
+        max_batch: int = WHISPER_BATCH_MAX_ANSWERS,
+        batch_wait_ms: int = WHISPER_BATCH_WAIT_MS,
+    ):
+        self.num_workers = num_workers
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait_ms / 1000
+        self._executor = None
+        self._pending = 0
+        self._batch = []  # (samples, future) waiting for a worker
+        self._dispatcher = None
+        self._free_workers = None
+        self._batch_tasks = set()
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of jobs currently queued or running.
+        """
+        return self._pending
+
+    def start(self):
+        """
+        Starts the worker pool (idempotent). Workers preload their models immediately.
+        """
+        if self._executor is None:
+            # spawn avoids forking the server process with its running threads and sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=whisper_utils.init_worker,
+            )
+            logger.info("transcription_engine_started", extra={"workers": self.num_workers})
+        return self._executor
+
+    def warm_up(self):
+        """
+        Starts every worker and blocks until each has loaded its model.
+        Worker processes are spawned on demand, so one no-op job per worker forces them up.
+        """
+        executor = self.start()
+        wait([executor.submit(whisper_utils.ping) for _ in range(self.num_workers)])
+        return self
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def transcribe(self, data: bytes, extension: str):
+        """
+        Queues an audio clip for transcription and awaits the result.
+
+        Args:
+            data (bytes): Encoded audio bytes
+            extension (str): Container format of the audio
+
+        Returns:
+            Tuple[str, List[Dict]]: transcript text and mispronounced words
+        """
+        return await self._submit(whisper_utils.transcribe_bytes, data, extension)
+
+    async def transcribe_samples(self, samples):
+        """
+        Queues already-decoded mono 16kHz samples (e.g., one streamed speech segment) for transcription.
+        """
+        if whisper_utils.WHISPER_BATCH_SIZE > 0:
+            return await self._submit_batched(samples)
+        return await self._submit(whisper_utils.transcribe_samples, samples)
+
+    def _check_capacity(self):
+        if self._pending >= self.max_queue:
+            raise TranscriptionQueueFull(f"Transcription queue is full ({self.max_queue} jobs).")
+
+    async def _submit(self, fn, *args):
+        self._check_capacity()
+
+        executor = self.start()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # Includes time spent queued behind other answers, which is what callers wait for
+            with track_stage("transcription"):
+                return await loop.run_in_executor(executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def _submit_batched(self, samples):
+        self._check_capacity()
+
+        future = asyncio.get_running_loop().create_future()
+        self._batch.append((samples, future))
+        self._pending += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_batches())
+        try:
+            with track_stage("transcription"):
+                return await future
+        finally:
+            self._pending -= 1
+
+    async def _dispatch_batches(self):
+        """
+        Hands queued answers to workers as they free up, so answers that arrive while all
+        workers are busy are decoded together in one job.
+        """
+        if self._free_workers is None:
+            self._free_workers = asyncio.Semaphore(self.num_workers)
+
+        while self._batch:
+            await self._free_workers.acquire()
+            await asyncio.sleep(self.batch_wait)  # Let answers submitted at the same moment join
+            batch, self._batch = self._batch[:self.max_batch], self._batch[self.max_batch:]
+            batch = [(samples, future) for samples, future in batch if not future.done()]
+            if not batch:
+                self._free_workers.release()
+                continue
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch):
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(
+                self.start(), whisper_utils.transcribe_many, [samples for samples, _ in batch]
+            )
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._free_workers.release()
+
+# Shared engine used by all routes
+engine = TranscriptionEngine()
+registry.register("whisper", engine.warm_up)
+QUEUE_DEPTH.set_function(lambda: engine.queue_depth, queue="transcription")
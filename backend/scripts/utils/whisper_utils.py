@@ -1,10 +1,75 @@
 import os
 import io
-from faster_whisper import WhisperModel
-from pydub import AudioSegment
+import bisect
+import asyncio
+import numpy as np
+from scripts.utils.metrics import track_stage
+from scripts.utils.log_utils import configure_logging, get_logger
 
-# Load Whisper model with efficient quantization
-model = WhisperModel("tiny", compute_type="int8")
+# Whisper model settings (overridable via environment)
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "tiny")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "2"))
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "5"))
+
+# Skip silence with Silero VAD before decoding
+WHISPER_VAD_FILTER = os.getenv("WHISPER_VAD_FILTER", "1") == "1"
+WHISPER_VAD_MIN_SILENCE_MS = int(os.getenv("WHISPER_VAD_MIN_SILENCE_MS", "500"))
+
+# Chunks decoded per forward pass by the batched pipeline; 0 decodes sequentially
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "0"))
+WHISPER_CHUNK_LENGTH_S = 30  # Whisper's input window
+
+# Whisper expects mono 16 kHz audio
+SAMPLE_RATE = 16000
+
+# Model (and batched pipeline, if enabled) owned by the current transcription worker process
+_worker_model = None
+_worker_pipeline = None
+
+logger = get_logger("whisper")
+
+def load_model():
+    """
+    Loads a Whisper model with efficient quantization using the configured settings.
+    """
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(
+        WHISPER_MODEL_SIZE,
+        device=WHISPER_DEVICE,
+        compute_type=WHISPER_COMPUTE_TYPE,
+        cpu_threads=WHISPER_CPU_THREADS,
+    )
+
+def _ensure_model():
+    global _worker_model, _worker_pipeline
+    if _worker_model is None:
+        _worker_model = load_model()
+        if WHISPER_BATCH_SIZE > 0:
+            from faster_whisper import BatchedInferencePipeline
+            _worker_pipeline = BatchedInferencePipeline(_worker_model)
+
+def init_worker():
+    """
+    Process pool initializer: preloads one Whisper model per worker so jobs never pay the load cost.
+    """
+    # Spawned workers don't run main.py, so set up JSON logging here
+    configure_logging()
+    _ensure_model()
+    logger.info("whisper_worker_ready", extra={
+        "pid": os.getpid(),
+        "model": WHISPER_MODEL_SIZE,
+        "compute_type": WHISPER_COMPUTE_TYPE,
+        "mode": f"batched x{WHISPER_BATCH_SIZE}" if _worker_pipeline else "sequential",
+    })
+
+def ping() -> int:
+    """
+    No-op job used to make a worker start (and preload its model) ahead of real work.
+    """
+    return os.getpid()
 
 def get_mispronounced_words(segments):
     """
@@ -19,7 +84,7 @@ def get_mispronounced_words(segments):
     mispronounced = []
 
     for segment in segments:
-        for word in getattr(segment, "words", []):
+        for word in getattr(segment, "words", None) or []:
             if word.probability and word.probability < 0.75:
                 mispronounced.append({
                     "word": word.word.strip()
@@ -27,14 +92,141 @@ def get_mispronounced_words(segments):
 
     return mispronounced
 
+def decode_to_array(source, extension: str) -> np.ndarray:
+    """
+    Decodes audio straight into a mono 16kHz float32 array in [-1, 1], which Whisper accepts directly.
+    Containers (webm, ogg, mp4, ...) are demuxed and resampled by PyAV in a single pass.
+
+    Args:
+        source (bytes | file-like): Encoded audio, raw 16-bit PCM when extension is "pcm16",
+            or a readable file object such as an UploadFile spool
+        extension (str): Container format of the audio
+
+    Returns:
+        np.ndarray: Decoded samples
+    """
+    if extension == "pcm16":
+        if not isinstance(source, (bytes, bytearray)):
+            source = source.read()
+        return np.frombuffer(source, dtype=np.int16).astype(np.float32) / 32768.0
+
+    from faster_whisper.audio import decode_audio
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return decode_audio(source, sampling_rate=SAMPLE_RATE)
+
+def _result(segments):
+    transcript = " ".join([s.text.strip() for s in segments])
+    return transcript, get_mispronounced_words(segments)
+
+def speech_chunks(samples: np.ndarray, offset: int = 0) -> list:
+    """
+    Splits one clip into voiced regions of at most one Whisper window, as sample ranges
+    shifted by `offset`. Without VAD the clip is cut into fixed windows instead.
+    """
+    window = WHISPER_CHUNK_LENGTH_S * SAMPLE_RATE
+    if not WHISPER_VAD_FILTER:
+        return [
+            {"start": offset + start, "end": offset + min(start + window, len(samples))}
+            for start in range(0, len(samples), window)
+        ]
+
+    from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments
+
+    options = VadOptions(min_silence_duration_ms=WHISPER_VAD_MIN_SILENCE_MS, max_speech_duration_s=WHISPER_CHUNK_LENGTH_S)
+    chunks = merge_segments(get_speech_timestamps(samples, options), options)
+    return [{"start": offset + c["start"], "end": offset + c["end"]} for c in chunks]
+
+def transcribe_many(clips: list) -> list:
+    """
+    Transcribes several clips (e.g., queued answers) inside a transcription worker.
+
+    With the batched pipeline, every clip's voiced chunks are decoded together in batches of
+    WHISPER_BATCH_SIZE, so a long answer is decoded as parallel chunks and short answers share
+    forward passes. Chunks never cross clip boundaries, so each segment belongs to exactly one clip.
+
+    Args:
+        clips (List[np.ndarray]): float32 mono 16kHz clips
+
+    Returns:
+        List[Tuple[str, List[Dict]]]: transcript and mispronounced words per clip
+    """
+    _ensure_model()
+
+    if _worker_pipeline is None:
+        results = []
+        for samples in clips:
+            segments, info = _worker_model.transcribe(
+                samples,
+                language="en",
+                word_timestamps=True,
+                beam_size=WHISPER_BEAM_SIZE,
+                vad_filter=WHISPER_VAD_FILTER,
+                vad_parameters={"min_silence_duration_ms": WHISPER_VAD_MIN_SILENCE_MS},
+            )
+            results.append(_result(list(segments)))
+        return results
+
+    # Lay the clips end to end and decode only their voiced chunks
+    starts, chunks, offset = [], [], 0
+    for samples in clips:
+        starts.append(offset)
+        chunks.extend(speech_chunks(samples, offset))
+        offset += len(samples)
+    if not chunks:
+        return [("", []) for _ in clips]
+
+    segments, info = _worker_pipeline.transcribe(
+        np.concatenate(clips).astype(np.float32, copy=False),
+        language="en",
+        word_timestamps=True,
+        beam_size=WHISPER_BEAM_SIZE,
+        clip_timestamps=chunks,
+        batch_size=WHISPER_BATCH_SIZE,
+    )
+
+    # Hand each segment back to its clip (by midpoint, since timestamps are rounded)
+    per_clip = [[] for _ in clips]
+    for segment in segments:
+        midpoint = (segment.start + segment.end) / 2
+        index = bisect.bisect_right(starts, midpoint * SAMPLE_RATE) - 1
+        per_clip[max(index, 0)].append(segment)
+    return [_result(s) for s in per_clip]
+
+def transcribe_samples(samples: np.ndarray):
+    """
+    Transcribes already-decoded mono 16kHz samples inside a transcription worker.
+
+    Args:
+        samples (np.ndarray): float32 audio samples
+
+    Returns:
+        Tuple[str, List[Dict]]: transcript text and mispronounced words
+    """
+    return transcribe_many([samples])[0]
+
+def transcribe_bytes(data: bytes, extension: str):
+    """
+    Decodes and transcribes raw audio bytes inside a transcription worker.
+
+    Args:
+        data (bytes): Encoded audio (e.g., webm, ogg, mp4)
+        extension (str): Container format of the audio
+
+    Returns:
+        Tuple[str, List[Dict]]: transcript text and mispronounced words
+    """
+    return transcribe_samples(decode_to_array(data, extension))
+
 async def transcribe_audio(file):
     """
     Transcribes an uploaded audio file using Whisper and returns both transcript and mispronounced words.
 
     Steps:
-    1. Read file and detect format
-    2. Convert to mono 16kHz WAV
-    3. Run Whisper transcription with word-level timestamps
+    1. Detect format
+    2. Decode the upload spool directly to mono 16kHz float32 samples (no intermediate WAV)
+    3. Hand the samples to the transcription worker pool for Whisper with word-level timestamps
     4. Return transcript and list of mispronounced words
 
     Args:
@@ -43,33 +235,20 @@ async def transcribe_audio(file):
     Returns:
         Tuple[str, List[Dict]]: transcript text and mispronounced words
     """
-    try:
-        print("Received file:", file.filename)
+    from scripts.utils.transcription_engine import engine
 
+    try:
         # Infer file extension (e.g., "mp4", "webm", "ogg")
         extension = os.path.splitext(file.filename)[1][1:].lower()
-        print("Detected format:", extension)
-
-        # Read audio data and convert to WAV
-        data = await file.read()
-        audio = AudioSegment.from_file(io.BytesIO(data), format=extension)
-        audio = audio.set_frame_rate(16000).set_channels(1)
-
-        buffer = io.BytesIO()
-        audio.export(buffer, format="wav")
-        buffer.seek(0)
-
-        # Run Whisper transcription with word timestamps
-        segments, info = model.transcribe(buffer, language="en", word_timestamps=True)
-
-        # Compile transcript text
-        transcript = " ".join([s.text for s in segments])
+        logger.debug("answer_received", extra={"filename": file.filename, "format": extension})
 
-        # Identify mispronounced words based on probability
-        mispronounced = get_mispronounced_words(segments)
+        # Decode from the spooled upload without reading it into memory first
+        file.file.seek(0)
+        with track_stage("audio_decode"):
+            samples = await asyncio.to_thread(decode_to_array, file.file, extension)
 
-        return transcript, mispronounced
+        return await engine.transcribe_samples(samples)
 
     except Exception as e:
-        print("Transcription Error:", str(e))
+        logger.error("transcription_failed", extra={"error": str(e)})
         raise e
@@ -0,0 +1,29 @@
+import os
+import sys
+import pytest
+
+# Tests never touch the on-disk caches or the real APIs, and import the backend as `scripts.*`
+os.environ.setdefault("OPEN_API_KEY", "test")
+os.environ.setdefault("CLAUDE_API_KEY", "test")
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("RESUME_CACHE_ENABLED", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """
+    TestClient for the app, with its databases, uploads and static files in a temporary directory.
+    """
+    from fastapi.testclient import TestClient
+
+    data_dir = tmp_path_factory.mktemp("app")
+    os.environ["EVALUATION_DB_PATH"] = str(data_dir / "evaluation.db")
+    os.environ["SESSION_DB_PATH"] = str(data_dir / "sessions.db")
+    os.environ["FACE_LOG_PATH"] = str(data_dir / "face_confidence_log.jsonl")
+    cwd = os.getcwd()
+    os.chdir(data_dir)  # main creates uploads/ and static/ in the working directory
+    try:
+        from main import app
+        yield TestClient(app)
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,92 @@
+import os
+import asyncio
+import threading
+from scripts.utils import audio_utils
+
+class FakeBackend:
+    name = "fake"
+    extension = "mp3"
+    media_type = "audio/mpeg"
+    default_voice = "com"
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text, lang, voice):
+        self.calls += 1
+        return f"{lang}|{voice}|{text}".encode()
+
+def use_fake_backend(monkeypatch, tmp_path):
+    fake = FakeBackend()
+    monkeypatch.setattr(audio_utils, "backend", fake)
+    monkeypatch.setattr(audio_utils, "STATIC_DIR", str(tmp_path))
+    return fake
+
+def test_cache_key_covers_every_input(monkeypatch, tmp_path):
+    use_fake_backend(monkeypatch, tmp_path)
+    key = audio_utils.audio_cache_key("Tell me about yourself.")
+
+    assert audio_utils.audio_cache_key("Tell me about yourself.") == key
+    assert audio_utils.audio_cache_key("Tell me about yourself.", voice="com") == key  # Default voice
+    assert audio_utils.audio_cache_key("Tell me about yourself!") != key
+    assert audio_utils.audio_cache_key("Tell me about yourself.", lang="fr") != key
+    assert audio_utils.audio_cache_key("Tell me about yourself.", voice="co.uk") != key
+
+def test_rendered_audio_is_reused(monkeypatch, tmp_path):
+    fake = use_fake_backend(monkeypatch, tmp_path)
+
+    path = audio_utils.text_to_speech("What is a closure?")
+    assert path == audio_utils.audio_cache_path("What is a closure?")
+    assert audio_utils.text_to_speech("What is a closure?") == path
+    assert audio_utils.cached_speech("What is a closure?") == path
+    assert fake.calls == 1
+    with open(path, "rb") as f:
+        assert f.read() == b"en|com|What is a closure?"
+
+    audio_utils.text_to_speech("What is a closure?", voice="co.uk")
+    assert fake.calls == 2
+
+def test_concurrent_async_renders_share_one_synthesis(monkeypatch, tmp_path):
+    fake = use_fake_backend(monkeypatch, tmp_path)
+
+    async def run():
+        return await asyncio.gather(*(audio_utils.text_to_speech_async("Describe a hash map.") for _ in range(5)))
+
+    paths = asyncio.run(run())
+    assert len(set(paths)) == 1
+    assert fake.calls == 1
+
+def test_atomic_writes_from_threads_leave_no_temp_files(tmp_path):
+    target = str(tmp_path / "tts_clip.mp3")
+    threads = [threading.Thread(target=audio_utils._write_atomic, args=(target, bytes([i]) * 1000)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert os.listdir(tmp_path) == ["tts_clip.mp3"]
+    with open(target, "rb") as f:
+        data = f.read()
+    assert len(data) == 1000 and len(set(data)) == 1
+
+def test_pyttsx3_pool_is_started_once(monkeypatch):
+    started = []
+
+    class FakeExecutor:
+        def __init__(self, **kwargs):
+            started.append(self)
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            pass
+
+    monkeypatch.setattr(audio_utils, "ProcessPoolExecutor", FakeExecutor)
+    tts = audio_utils.Pyttsx3Backend()
+    threads = [threading.Thread(target=tts.start) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(started) == 1
+    tts.shutdown()
+    assert tts._executor is None
@@ -0,0 +1,39 @@
+import json
+import asyncio
+from types import SimpleNamespace
+from scripts.utils import openai_utils
+
+EVALUATION = {"clarity": 7, "technical_depth": 6, "structure": 8, "feedback": "Clear answer."}
+
+class FakeOpenAI:
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, timeout=None):
+        self.calls += 1
+        count = messages[-1]["content"].count("\nQuestion: ")
+        content = json.dumps([EVALUATION] * count)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+class FakeClaude:
+    def __init__(self):
+        self.calls = 0
+        self.messages = SimpleNamespace(create=self.create)
+
+    async def create(self, model, max_tokens, messages, timeout=None):
+        self.calls += 1
+        count = messages[-1]["content"].count("\nQuestion: ")
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps([EVALUATION] * count))])
+
+def test_deferred_batch_makes_one_call_per_provider(monkeypatch):
+    clients = SimpleNamespace(async_openai=FakeOpenAI(), async_claude=FakeClaude())
+    monkeypatch.setattr(openai_utils, "_clients", lambda: clients)
+
+    pairs = [(f"Question {i}?", f"Answer {i}.") for i in range(5)]
+    gpt_results, claude_results = asyncio.run(openai_utils.evaluate_answers_batch(pairs))
+
+    assert clients.async_openai.calls == 1
+    assert clients.async_claude.calls == 1
+    assert gpt_results == [EVALUATION] * len(pairs)
+    assert claude_results == [EVALUATION] * len(pairs)
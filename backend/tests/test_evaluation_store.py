@@ -0,0 +1,47 @@
+from scripts.utils.evaluation_store import EvaluationStore
+
+def answer(i):
+    return {"question": f"Question {i}?", "transcription": f"Answer {i}.", "mispronounced_words": [], "face_confidence": 80}
+
+def evaluation(i):
+    return {"question": f"Question {i}?", "transcription": f"Answer {i}.", "clarity_score": 7, "final_score": 70,
+            "judges": ["gpt"], "feedback": {"gpt": "ok"}}
+
+def test_claimed_answers_are_scored_by_one_worker_only(tmp_path):
+    # Two stores on one database stand in for two worker processes
+    path = str(tmp_path / "evaluation.db")
+    first, second = EvaluationStore(path), EvaluationStore(path)
+    for i in range(3):
+        first.add_pending("s1", answer(i))
+
+    claimed = first.claim_pending("s1", "claim-a")
+    assert [a["question"] for _, a in claimed] == ["Question 0?", "Question 1?", "Question 2?"]
+    assert second.claim_pending("s1", "claim-b") == []
+
+    # Two answers scored, one left unscored: only the scored ones are stored, the other is queued again
+    stored = first.resolve_claim("s1", "claim-a", [(claimed[0][0], evaluation(0)), (claimed[1][0], evaluation(1))])
+    assert stored == 2
+    assert second.averages("s1")["total"] == 2
+    assert [a["question"] for _, a in second.claim_pending("s1", "claim-b")] == ["Question 2?"]
+
+def test_stale_claim_taken_over_is_not_stored_twice(tmp_path):
+    path = str(tmp_path / "evaluation.db")
+    first, second = EvaluationStore(path), EvaluationStore(path)
+    first.add_pending("s1", answer(0))
+
+    (pending_id, _), = first.claim_pending("s1", "claim-a")
+    # The first claim is treated as abandoned and re-claimed by the second worker
+    assert len(second.claim_pending("s1", "claim-b", stale_after=-1)) == 1
+
+    assert first.resolve_claim("s1", "claim-a", [(pending_id, evaluation(0))]) == 0
+    assert second.resolve_claim("s1", "claim-b", [(pending_id, evaluation(0))]) == 1
+    assert first.averages("s1")["total"] == 1
+    assert first.pending_count("s1") == 0
+
+def test_released_claim_returns_answers_to_the_queue(tmp_path):
+    store = EvaluationStore(str(tmp_path / "evaluation.db"))
+    store.add_pending("s1", answer(0))
+
+    assert len(store.claim_pending("s1", "claim-a")) == 1
+    store.release_claim("claim-a")
+    assert len(store.claim_pending("s1", "claim-b")) == 1
@@ -0,0 +1,58 @@
+import io
+import os
+import time
+import asyncio
+import hashlib
+import pytest
+from fastapi import UploadFile
+from scripts.utils.extraction_utils import ExtractionEngine, ExtractionError, UploadTooLarge, spool_upload
+
+def upload(data: bytes, filename="resume.pdf"):
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+def test_spool_upload_stores_content_addressed(tmp_path):
+    data = b"%PDF-1.4 resume " * 40000  # Several read chunks
+    path, digest = asyncio.run(spool_upload(upload(data), str(tmp_path), ".pdf"))
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert path == os.path.join(str(tmp_path), f"{digest}.pdf")
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+    # The same bytes again map to the same file, stored once
+    assert asyncio.run(spool_upload(upload(data), str(tmp_path), ".pdf")) == (path, digest)
+    assert os.listdir(tmp_path) == [f"{digest}.pdf"]
+
+def test_spool_upload_rejects_oversized_files(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool_upload(upload(b"x" * 1001), str(tmp_path), ".pdf", max_bytes=1000))
+    assert os.listdir(tmp_path) == []  # No partial file left behind
+
+def test_restart_stops_running_jobs_and_replaces_the_pool():
+    engine = ExtractionEngine(num_workers=1)
+
+    async def run():
+        pool = engine.start()
+        stuck = asyncio.ensure_future(engine._run(pool, time.sleep, 60))
+        await asyncio.sleep(0.1)
+
+        started = time.monotonic()
+        await engine._restart(pool)
+        with pytest.raises(ExtractionError):
+            await stuck
+        assert time.monotonic() - started < 10
+
+        # The next job runs on a fresh pool
+        assert engine.start() is not pool
+        return await engine._run(engine.start(), os.getpid)
+
+    try:
+        assert asyncio.run(run()) != os.getpid()
+    finally:
+        engine.shutdown()
+
+def test_legacy_doc_upload_is_rejected(client):
+    # python-docx can't read the old binary Word format
+    response = client.post("/upload-resume", files={"file": ("resume.doc", b"\xd0\xcf\x11\xe0")},
+                           data={"job_description": "Backend engineer"})
+    assert response.status_code == 415
@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+
+@pytest.fixture
+def LatestFrame(client):
+    from scripts.routes.face_confidence import LatestFrame
+    return LatestFrame
+
+def test_replaced_frames_are_counted_as_dropped(LatestFrame):
+    async def run():
+        slot = LatestFrame()
+        for i in range(3):
+            slot.put({"bytes": bytes([i])})
+        # Only the newest frame is handed out; the two it replaced were dropped
+        assert await slot.get() == {"bytes": b"\x02"}
+        assert slot.dropped == 2
+
+        slot.put({"bytes": b"\x03"})
+        assert await slot.get() == {"bytes": b"\x03"}
+        assert slot.dropped == 2  # Frames taken in time are not drops
+
+    asyncio.run(run())
+
+def test_get_waits_for_a_frame_and_ends_on_close(LatestFrame):
+    async def run():
+        slot = LatestFrame()
+        waiter = asyncio.ensure_future(slot.get())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        slot.put({"bytes": b"\x00"})
+        assert await waiter == {"bytes": b"\x00"}
+
+        slot.close()
+        assert await slot.get() is None
+        assert slot.closed
+
+    asyncio.run(run())
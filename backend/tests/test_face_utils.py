@@ -0,0 +1,54 @@
+import random
+from types import SimpleNamespace
+from scripts.utils.face_utils import LEFT_EYE_OUTER, NOSE_TIP, RIGHT_EYE_OUTER, score_face, score_landmarks
+
+FRAME_WIDTH = 640
+
+def original_score(landmarks):
+    # The per-frame pixel formula the face-confidence socket used before scoring moved to the workers
+    face_confidence = 100.0
+    nose_x = int(landmarks[1].x * FRAME_WIDTH)
+    left_eye_x = int(landmarks[33].x * FRAME_WIDTH)
+    right_eye_x = int(landmarks[263].x * FRAME_WIDTH)
+
+    center_x = FRAME_WIDTH // 2
+    deviation_x = abs(nose_x - center_x)
+    max_deviation = FRAME_WIDTH // 3
+
+    if deviation_x > max_deviation:
+        face_confidence -= min((deviation_x / FRAME_WIDTH) * 100, 40)
+
+    eye_distance = abs(left_eye_x - right_eye_x)
+    expected_eye_distance = FRAME_WIDTH // 5
+    tilt_penalty = min(abs(expected_eye_distance - eye_distance) / expected_eye_distance * 40, 30)
+    face_confidence -= tilt_penalty
+
+    return max(min(face_confidence, 100), 0)
+
+def face_results(nose_x, left_eye_x, right_eye_x):
+    landmarks = [SimpleNamespace(x=0.5) for _ in range(RIGHT_EYE_OUTER + 1)]
+    landmarks[NOSE_TIP].x, landmarks[LEFT_EYE_OUTER].x, landmarks[RIGHT_EYE_OUTER].x = nose_x, left_eye_x, right_eye_x
+    return SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=landmarks)])
+
+def test_score_matches_original_pixel_formula():
+    rng = random.Random(7)
+    cases = [(rng.random(), rng.random(), rng.random()) for _ in range(2000)]
+    # Just inside and outside the centre band and the expected eye distance, where truncation matters
+    cases += [
+        (0.5 + 213.5 / 640, 0.4, 0.6),
+        (0.5 - 213.9 / 640, 0.4, 0.6),
+        (0.5 + 214.2 / 640, 0.4, 0.6),
+        (0.5, 0.4 + 0.7 / 640, 0.6),
+        (0.5, 0.4, 0.6 + 0.99 / 640),
+        (0.0, 0.0, 1.0),
+        (1.0, 0.5, 0.5),
+    ]
+
+    for nose_x, left_eye_x, right_eye_x in cases:
+        results = face_results(nose_x, left_eye_x, right_eye_x)
+        expected = original_score(results.multi_face_landmarks[0].landmark)
+        assert score_landmarks(nose_x, left_eye_x, right_eye_x) == expected
+        assert score_face(results) == expected
+
+def test_no_face_scores_zero():
+    assert score_face(SimpleNamespace(multi_face_landmarks=None)) == 0
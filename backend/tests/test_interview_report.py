@@ -0,0 +1,69 @@
+import uuid
+import pytest
+from scripts.utils.session_manager import SESSION_HEADER
+
+def evaluation(i):
+    return {"question": f"Question {i}?", "transcription": f"Answer {i}.", "clarity_score": 7, "technical_score": 6,
+            "structure_score": 8, "face_confidence": 80, "final_score": 70, "judges": ["gpt"], "feedback": {"gpt": "Clear."}}
+
+@pytest.fixture
+def report(client, monkeypatch):
+    """
+    Fetches the report for a fresh session, with the summary model replaced by a counter.
+    """
+    from main import evaluation_store
+    from scripts.utils import report_summary
+
+    summaries = []
+    monkeypatch.setattr(report_summary, "summarize_feedback_with_gpt",
+                        lambda gpt, claude: summaries.append(gpt) or f"Summary of {len(gpt)} answers.")
+    session_id = uuid.uuid4().hex
+
+    def get(etag=None):
+        headers = {SESSION_HEADER: session_id}
+        if etag:
+            headers["If-None-Match"] = etag
+        return client.get("/interview-report", headers=headers)
+
+    get.session_id = session_id
+    get.store = evaluation_store
+    get.summaries = summaries
+    return get
+
+def test_unchanged_report_is_not_modified(report):
+    report.store.add(report.session_id, evaluation(0))
+
+    first = report()
+    assert first.status_code == 200
+    assert first.json()["overall_feedback"] == "Summary of 1 answers."
+    etag = first.headers["ETag"]
+
+    again = report(etag)
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert report(f'W/{etag}, "other"').status_code == 304  # Weak and listed validators match too
+    assert len(report.summaries) == 1  # The summary was generated once
+
+    # A new answer changes the version, so the old ETag no longer matches
+    report.store.add(report.session_id, evaluation(1))
+    changed = report(etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["overall_feedback"] == "Summary of 2 answers."
+
+def test_report_with_unscored_answers_is_not_cacheable(report, monkeypatch):
+    from scripts.routes import submit_answer
+
+    async def judges_down(pairs):
+        raise RuntimeError("judges unavailable")
+
+    monkeypatch.setattr(submit_answer, "evaluate_answers_batch", judges_down)
+    report.store.add(report.session_id, evaluation(0))
+    etag = report().headers["ETag"]
+    report.store.add_pending(report.session_id, {"question": "Question 1?", "transcription": "Answer 1.",
+                                                  "mispronounced_words": [], "face_confidence": 80})
+
+    response = report(etag)
+    assert response.status_code == 200
+    assert response.json()["pending_answers"] == 1
+    assert "ETag" not in response.headers
@@ -0,0 +1,70 @@
+import time
+import asyncio
+import threading
+from scripts.utils.llm_cache import LLMCache, cache_key
+
+MESSAGES = [{"role": "user", "content": "What is a closure?"}]
+
+def make_cache(tmp_path, **kwargs):
+    return LLMCache(str(tmp_path / "llm_cache.db"), enabled=True, **kwargs)
+
+def test_cache_key_is_stable():
+    # Keys are persisted on disk, so a change here silently invalidates every cached completion
+    key = cache_key("openai:gpt-4o", MESSAGES, temperature=0)
+    assert key == "c6320f4106712b63a4d98743a1f68adf788aaad77f22205b7a75831d5f620852"
+    assert cache_key("openai:gpt-4o", [{"content": "What is a closure?", "role": "user"}], temperature=0) == key
+
+    assert cache_key("openai:gpt-4o-mini", MESSAGES, temperature=0) != key
+    assert cache_key("openai:gpt-4o", MESSAGES, temperature=1) != key
+    assert cache_key("openai:gpt-4o", MESSAGES) != key
+    assert cache_key("openai:gpt-4o", [{"role": "user", "content": "What is a closure"}], temperature=0) != key
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05)
+    cache.set("k", "reply")
+    assert cache.get("k") == "reply"
+
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    # Expired on disk too, not just in the memory front
+    assert make_cache(tmp_path, ttl=0.05).get("k") is None
+
+def test_memory_front_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", "3")
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.get("b") == "2"  # Still on disk
+    assert cache.stats()["disk_hits"] == 1
+
+def test_disk_table_is_trimmed_to_max_entries(tmp_path):
+    cache = make_cache(tmp_path, max_entries=10)
+    for i in range(100):  # The table is trimmed every 100th write
+        cache.set(f"k{i}", str(i))
+
+    keys = [row[0] for row in cache._conn.execute("SELECT key FROM llm_cache")]
+    assert len(keys) == 10 and "k99" in keys and "k0" not in keys
+
+def test_async_access_keeps_sqlite_off_the_event_loop(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=1)
+    threads = set()
+    conn = cache._conn
+
+    class RecordingConnection:
+        def execute(self, *args):
+            threads.add(threading.get_ident())
+            return conn.execute(*args)
+
+    cache._conn = RecordingConnection()
+
+    async def run():
+        await cache.set_async("a", "1")
+        await cache.set_async("b", "2")  # Pushes "a" out of the memory front
+        return threading.get_ident(), await cache.get_async("a"), await cache.get_async("b")
+
+    loop_thread, a, b = asyncio.run(run())
+    assert (a, b) == ("1", "2")
+    assert threads and loop_thread not in threads
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+from scripts.utils import nlp_utils
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer to build real-time data pipelines for our payments platform. "
+    "You will design Kafka consumers and REST APIs in Python, tune PostgreSQL queries, and run services on "
+    "Kubernetes. Experience with Kafka, Python and distributed systems is required; Terraform is a plus."
+)
+
+# Part-of-speech tags spaCy gives the words of JOB_DESCRIPTION that aren't nouns or adjectives
+FUNCTION_WORDS = {"we", "are", "a", "to", "for", "our", "you", "will", "and", "in", "on", "with", "is", "the"}
+VERBS = {"hiring", "build", "design", "tune", "run", "required"}
+
+class FakeTagger:
+    """
+    Stands in for en_core_web_sm's tagger so ranking is tested without the model.
+    """
+
+    def pipe(self, texts):
+        for text in texts:
+            yield [
+                SimpleNamespace(text=word, pos_="ADP" if word in FUNCTION_WORDS else "VERB" if word in VERBS else "NOUN")
+                for word in text.split()
+            ]
+
+def test_top_keywords_for_a_job_description(monkeypatch):
+    monkeypatch.setattr(nlp_utils, "get_nlp", lambda: FakeTagger())
+
+    keywords = nlp_utils.extract_keywords(JOB_DESCRIPTION)
+    assert keywords[:8] == ["kafka", "python", "consumers", "queries", "distributed", "real", "terraform", "payments"]
+    # Words every job description uses rank last
+    assert keywords[-2:] == ["engineer", "experience"]
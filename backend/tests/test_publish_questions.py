@@ -0,0 +1,58 @@
+import uuid
+import asyncio
+import pytest
+
+@pytest.fixture
+def upload_resume(client, monkeypatch):
+    from scripts.routes import upload_resume
+
+    async def no_speech(texts):
+        pass
+
+    cached = []
+    monkeypatch.setattr(upload_resume, "prerender_speech", no_speech)
+    monkeypatch.setattr(upload_resume.resume_cache, "set_questions", lambda *args: cached.append(args))
+    upload_resume.cached = cached
+    return upload_resume
+
+def start_session(upload_resume, generation_id):
+    session_id = uuid.uuid4().hex
+    upload_resume.session_manager.save(session_id, {
+        "questions": [], "current_index": 0, "generating": True, "generation_id": generation_id,
+    })
+    return session_id
+
+def test_questions_are_published_and_cached(upload_resume, monkeypatch):
+    async def stream(*args, **kwargs):
+        for question in ("What is a closure?", "Explain a hash map."):
+            yield question
+
+    monkeypatch.setattr(upload_resume, "generate_questions_stream", stream)
+    session_id = start_session(upload_resume, "gen-1")
+
+    asyncio.run(upload_resume.publish_questions(session_id, "gen-1", "resume", "jd", [], 2, cache_key="key"))
+
+    state = upload_resume.session_manager.get(session_id)
+    assert state["questions"] == ["What is a closure?", "Explain a hash map."]
+    assert state["generating"] is False
+    assert upload_resume.cached == [("key", 2, ["What is a closure?", "Explain a hash map."])]
+
+def test_superseded_generation_stops_publishing(upload_resume, monkeypatch):
+    manager = upload_resume.session_manager
+
+    async def stream(*args, **kwargs):
+        yield "Old question 1?"
+        # The candidate uploads again while this generation is still streaming
+        manager.update(session_id, lambda state: state.update(questions=[], generating=True, generation_id="gen-2"))
+        yield "Old question 2?"
+
+    monkeypatch.setattr(upload_resume, "generate_questions_stream", stream)
+    session_id = start_session(upload_resume, "gen-1")
+
+    asyncio.run(upload_resume.publish_questions(session_id, "gen-1", "resume", "jd", [], 2, cache_key="key"))
+
+    state = manager.get(session_id)
+    assert state["questions"] == []  # Nothing from the old generation lands in the new one
+    assert state["generating"] is True  # Still owned by the newer generation
+    assert state["generation_id"] == "gen-2"
+    assert upload_resume.cached == []
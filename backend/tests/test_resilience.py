@@ -0,0 +1,109 @@
+import time
+import asyncio
+import pytest
+from scripts.utils import openai_utils, resilience
+from scripts.utils.resilience import CircuitBreaker, CircuitOpen, DeadlineExceeded, LatencyTracker, call_with_policy
+
+class FakeCall:
+    """
+    Stands in for a provider call; each entry of `outcomes` is a delay in seconds or an exception to raise.
+    """
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self, remaining):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        await asyncio.sleep(outcome)
+        return f"reply {self.calls}"
+
+def call(make_call, budget=5.0, breaker=None, latency=None, retries=2):
+    async def run():
+        deadline = asyncio.get_running_loop().time() + budget
+        return await call_with_policy("test", make_call, deadline, breaker or CircuitBreaker("test"), latency, retries)
+    return asyncio.run(run())
+
+def test_breaker_lets_one_trial_through_when_half_open():
+    breaker = CircuitBreaker("half-open", failure_threshold=2, reset_after=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial at a time
+
+    # A failed trial reopens the circuit at once, without waiting for the threshold again
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open and breaker.allow()
+
+def test_open_breaker_fails_fast():
+    breaker = CircuitBreaker("fail-fast", failure_threshold=1, reset_after=60)
+    breaker.record_failure()
+    make_call = FakeCall(0)
+
+    with pytest.raises(CircuitOpen):
+        call(make_call, breaker=breaker)
+    assert make_call.calls == 0
+
+def test_slow_call_is_hedged_and_first_reply_wins(monkeypatch):
+    monkeypatch.setattr(resilience, "LLM_HEDGE_MIN_DELAY_S", 0.01)
+    latency = LatencyTracker(min_samples=5)
+    for _ in range(5):
+        latency.record(0.02)
+    make_call = FakeCall(2.0, 0)  # The primary stalls, the duplicate answers at once
+
+    started = time.monotonic()
+    assert call(make_call, latency=latency) == "reply 2"
+    assert make_call.calls == 2
+    assert time.monotonic() - started < 1
+
+def test_no_hedge_without_latency_history():
+    make_call = FakeCall(0.05)
+    assert call(make_call, latency=LatencyTracker(min_samples=5)) == "reply 1"
+    assert make_call.calls == 1
+
+def test_retries_back_off_with_full_jitter(monkeypatch):
+    backoffs = []
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: backoffs.append((low, high)) or 0)
+    make_call = FakeCall(ValueError("bad reply"), ValueError("bad reply"), 0)
+
+    assert call(make_call) == "reply 3"
+    base = resilience.LLM_RETRY_BASE_S
+    assert backoffs == [(0, base), (0, 2 * base)]
+
+def test_inner_timeout_is_retried_not_treated_as_deadline(monkeypatch):
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 0)
+    # e.g. a client read timeout, or asyncio.TimeoutError (TimeoutError on 3.11+)
+    make_call = FakeCall(TimeoutError("read timed out"), 0)
+
+    assert call(make_call) == "reply 2"
+    assert make_call.calls == 2
+
+def test_call_past_the_budget_raises_deadline_exceeded():
+    breaker = CircuitBreaker("deadline")
+    with pytest.raises(DeadlineExceeded):
+        call(FakeCall(1.0), budget=0.05, breaker=breaker)
+    assert breaker.failures == 1
+
+def test_cached_replies_are_not_recorded_as_latency(monkeypatch):
+    class HitCache:
+        async def get_async(self, key):
+            return '{"clarity": 7}'
+
+    monkeypatch.setattr(openai_utils, "llm_cache", HitCache())
+    latency = LatencyTracker()
+    messages = [{"role": "user", "content": "Evaluate this answer."}]
+
+    assert asyncio.run(openai_utils._chat_gpt_async(messages, parse=openai_utils._parse_evaluation, latency=latency)) == {"clarity": 7}
+    assert asyncio.run(openai_utils._chat_claude_async(messages, parse=openai_utils._parse_evaluation, latency=latency)) == {"clarity": 7}
+    assert len(latency.samples) == 0
@@ -0,0 +1,89 @@
+import time
+import asyncio
+import threading
+from scripts.utils.face_log import FaceConfidenceStore, SQLiteFaceTotals
+from scripts.utils.session_manager import MemorySessionBackend, SQLiteSessionBackend, SessionManager
+
+def increment(state):
+    state["current_index"] += 1
+    return state["current_index"]
+
+def test_sqlite_update_is_atomic_across_connections(tmp_path):
+    # One backend (connection) per thread stands in for one per worker process
+    path = str(tmp_path / "sessions.db")
+    SQLiteSessionBackend(path).save("s1", {"current_index": 0})
+    results = []
+
+    def worker():
+        backend = SQLiteSessionBackend(path)
+        for _ in range(50):
+            results.append(backend.update("s1", increment))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == list(range(1, 201))
+    assert SQLiteSessionBackend(path).load("s1")["current_index"] == 200
+
+def test_memory_update_is_atomic():
+    backend = MemorySessionBackend()
+    threads = [threading.Thread(target=lambda: [backend.update("s1", increment) for _ in range(100)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert backend.load("s1")["current_index"] == 400
+
+def test_eviction_drops_idle_and_least_recently_used_sessions(tmp_path):
+    for backend in (MemorySessionBackend(ttl=60, max_sessions=2),
+                    SQLiteSessionBackend(str(tmp_path / "sessions.db"), ttl=60, max_sessions=2)):
+        manager = SessionManager(backend)
+        evicted = []
+        manager.on_evict.append(evicted.append)
+        for session_id in ("a", "b", "c"):
+            manager.save(session_id, {"current_index": 0})
+            time.sleep(0.01)
+        manager.get("a")  # Touching a session makes it recently used
+
+        manager.evict()
+        assert evicted == ["b"]
+
+        backend.ttl = 0
+        time.sleep(0.01)
+        manager.evict()
+        assert sorted(evicted) == ["a", "b", "c"]
+        assert backend.load("a") is None
+
+def test_session_lock_is_exclusive_across_workers(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    workers = [SessionManager(SQLiteSessionBackend(path)) for _ in range(2)]
+    events = []
+
+    async def section(manager, name):
+        async with manager.lock("s1"):
+            events.append(f"{name}-start")
+            await asyncio.sleep(0.1)
+            events.append(f"{name}-end")
+
+    async def run():
+        await asyncio.gather(section(workers[0], "a"), section(workers[1], "b"))
+
+    asyncio.run(run())
+    assert events in (["a-start", "a-end", "b-start", "b-end"], ["b-start", "b-end", "a-start", "a-end"])
+
+def test_face_average_is_shared_across_workers(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    socket_worker = FaceConfidenceStore(totals=SQLiteFaceTotals(path))
+    scoring_worker = FaceConfidenceStore(totals=SQLiteFaceTotals(path))
+
+    for confidence in (80, 90, 0, 70):
+        socket_worker.append("s1", confidence)
+    # 60 average, minus a 5 point penalty for one frame in four without a face
+    assert scoring_worker.average("s1") == 55
+
+    scoring_worker.reset("s1")
+    assert socket_worker.average("s1") == 0
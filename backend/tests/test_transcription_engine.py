@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from scripts.utils import whisper_utils
+from scripts.utils.transcription_engine import TranscriptionEngine, TranscriptionQueueFull
+
+def thread_engine(max_queue=2):
+    # Threads stand in for the Whisper worker processes
+    engine = TranscriptionEngine(num_workers=1, max_queue=max_queue, batch_wait_ms=0)
+    engine._executor = ThreadPoolExecutor(max_workers=1)
+    return engine
+
+def test_full_queue_rejects_new_answers(monkeypatch):
+    gate = threading.Event()
+    monkeypatch.setattr(whisper_utils, "transcribe_bytes", lambda data, extension: gate.wait() and ("text", []))
+    engine = thread_engine()
+
+    async def run():
+        jobs = [asyncio.ensure_future(engine.transcribe(b"audio", "webm")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert engine.queue_depth == 2
+
+        with pytest.raises(TranscriptionQueueFull):
+            await engine.transcribe(b"audio", "webm")
+
+        gate.set()
+        assert await asyncio.gather(*jobs) == [("text", []), ("text", [])]
+        assert engine.queue_depth == 0
+        # Capacity frees up once jobs finish
+        assert await engine.transcribe(b"audio", "webm") == ("text", [])
+
+    try:
+        asyncio.run(run())
+    finally:
+        engine.shutdown()
+
+def test_full_queue_rejects_batched_segments(monkeypatch):
+    gate = threading.Event()
+    monkeypatch.setattr(whisper_utils, "WHISPER_BATCH_SIZE", 4)
+    monkeypatch.setattr(whisper_utils, "transcribe_many", lambda clips: gate.wait() and [("text", [])] * len(clips))
+    engine = thread_engine()
+    samples = np.zeros(16000, dtype=np.float32)
+
+    async def run():
+        jobs = [asyncio.ensure_future(engine.transcribe_samples(samples)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(TranscriptionQueueFull):
+            await engine.transcribe_samples(samples)
+
+        gate.set()
+        assert await asyncio.gather(*jobs) == [("text", []), ("text", [])]
+        assert engine.queue_depth == 0
+
+    try:
+        asyncio.run(run())
+    finally:
+        engine.shutdown()
+
+def test_submit_answer_returns_503_when_queue_is_full(client, monkeypatch):
+    from scripts.routes import submit_answer
+
+    async def queue_full(file):
+        raise TranscriptionQueueFull("Transcription queue is full (16 jobs).")
+
+    monkeypatch.setattr(submit_answer, "transcribe_audio", queue_full)
+    response = client.post("/submit-answer", files={"file": ("answer.webm", b"audio")}, data={"question": "Why?"})
+    assert response.status_code == 503
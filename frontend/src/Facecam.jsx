@@ -1,10 +1,13 @@
 import React, { useRef, useState, useEffect, useCallback } from "react";
 import Webcam from "react-webcam";
 
+const MIN_CAPTURE_INTERVAL_MS = 200;
+
 const FaceCam = () => {
     const webcamRef = useRef(null);
     const [faceConfidence, setFaceConfidence] = useState(100);
     const [socket, setSocket] = useState(null);
+    const captureIntervalRef = useRef(MIN_CAPTURE_INTERVAL_MS);
     const [isPlaying, setIsPlaying] = useState(false);
     const [isUploading, setIsUploading] = useState(false);
     const [isProcessing, setIsProcessing] = useState(false);
@@ -27,6 +30,10 @@ const FaceCam = () => {
                     if (data.face_confidence !== undefined) {
                         setFaceConfidence(data.face_confidence);
                     }
+                    // Slow down capture when the server reports it can't keep up
+                    if (data.server_fps) {
+                        captureIntervalRef.current = Math.max(MIN_CAPTURE_INTERVAL_MS, 1000 / data.server_fps);
+                    }
                 } catch (error) {
                     console.error("Error parsing WebSocket message:", error);
                 }
@@ -54,14 +61,23 @@ const FaceCam = () => {
 
     const captureFrame = useCallback(() => {
         if (webcamRef.current && socket && socket.readyState === WebSocket.OPEN) {
-            const imageSrc = webcamRef.current.getScreenshot();
-            socket.send(JSON.stringify({ image: imageSrc }));
+            const canvas = webcamRef.current.getCanvas();
+            if (!canvas) return;
+            // Send raw JPEG bytes as a binary frame instead of a base64 data URL
+            canvas.toBlob((blob) => {
+                if (blob && socket.readyState === WebSocket.OPEN) socket.send(blob);
+            }, "image/jpeg", 0.8);
         }
     }, [socket]);
 
     useEffect(() => {
-        const interval = setInterval(captureFrame, 200);
-        return () => clearInterval(interval);
+        let timeoutId;
+        const loop = () => {
+            captureFrame();
+            timeoutId = setTimeout(loop, captureIntervalRef.current);
+        };
+        timeoutId = setTimeout(loop, captureIntervalRef.current);
+        return () => clearTimeout(timeoutId);
     }, [captureFrame]);
 
     const handleFileChange = (event) => {
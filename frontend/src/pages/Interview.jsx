@@ -2,6 +2,10 @@ import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import Section from "../components/Section";
 
+const MIN_CAPTURE_INTERVAL_MS = 1000;
+
+const getSessionId = () => sessionStorage.getItem("interview-session-id") || "";
+
 const Interview = () => {
   const navigate = useNavigate();
   const videoRef = useRef(null);
@@ -33,6 +37,7 @@ const Interview = () => {
   const chunksRef = useRef([]);
   const [user, setUser] = useState(null);
   const [socket, setSocket] = useState(null);
+  const captureIntervalRef = useRef(MIN_CAPTURE_INTERVAL_MS);
 
   useEffect(() => {
     const storedUser = localStorage.getItem("user");
@@ -95,7 +100,9 @@ const Interview = () => {
   const fetchNextQuestion = async () => {
     try {
       setIsLoadingQuestion(true);
-      const res = await fetch("https://mockai-mqnl.onrender.com/play-question");
+      const res = await fetch("https://mockai-mqnl.onrender.com/play-question", {
+        headers: { "X-Session-Id": getSessionId() },
+      });
       const data = await res.json();
 
       if (data.audio_url) {
@@ -147,6 +154,26 @@ const Interview = () => {
     navigate("/results");
   };
 
+  const submitRecording = async (blob) => {
+    const formData = new FormData();
+    formData.append("file", blob, "answer.webm");
+    formData.append("question", currentQuestion);
+
+    try {
+      const res = await fetch(
+        "https://mockai-mqnl.onrender.com/submit-answer",
+        {
+          method: "POST",
+          headers: { "X-Session-Id": getSessionId() },
+          body: formData,
+        }
+      );
+      await res.json();
+    } catch (err) {
+      console.error("Evaluation error:", err);
+    }
+  };
+
   const toggleRecording = async () => {
     if (isRecording) {
       mediaRecorderRef.current.stop();
@@ -158,35 +185,68 @@ const Interview = () => {
         options = { mimeType: "audio/ogg" };
         if (!MediaRecorder.isTypeSupported(options.mimeType)) options = {};
       }
+      const format = (options.mimeType || "audio/webm").split("/")[1];
+
+      // Stream chunks to the server so it can transcribe while the candidate speaks
+      const answerSocket = new WebSocket(
+        `wss://mockai-mqnl.onrender.com/answer-stream?session_id=${getSessionId()}`
+      );
+      answerSocket.binaryType = "arraybuffer";
+
+      // Upload the whole recording if streaming doesn't deliver an evaluation
+      let answerBlob = null;
+      let answerSettled = false;
+      const fallbackToUpload = async () => {
+        if (answerSettled || !answerBlob) return;
+        answerSettled = true;
+        await submitRecording(answerBlob);
+      };
+
+      answerSocket.onopen = () =>
+        answerSocket.send(
+          JSON.stringify({ type: "start", question: currentQuestion, format })
+        );
+      answerSocket.onmessage = (event) => {
+        try {
+          const data = JSON.parse(event.data);
+          if (data.type === "final") {
+            answerSettled = true;
+            answerSocket.close();
+          } else if (data.type === "error") {
+            answerSocket.close();
+            fallbackToUpload();
+          }
+        } catch {}
+      };
+      // Also fires after a socket error; a no-op once the answer was evaluated
+      answerSocket.onclose = () => fallbackToUpload();
 
       const recorder = new MediaRecorder(stream, options);
       recorder.ondataavailable = (e) => {
-        if (e.data.size > 0) chunksRef.current.push(e.data);
+        if (e.data.size > 0) {
+          chunksRef.current.push(e.data);
+          if (answerSocket.readyState === WebSocket.OPEN) {
+            answerSocket.send(e.data);
+          }
+        }
       };
 
       recorder.onstop = async () => {
         const blob = new Blob(chunksRef.current, { type: "audio/webm" });
         chunksRef.current = [];
-        const formData = new FormData();
-        formData.append("file", blob, "answer.webm");
-        formData.append("question", currentQuestion);
+        stream.getTracks().forEach((track) => track.stop());
+        answerBlob = blob;
 
-        try {
-          const res = await fetch(
-            "https://mockai-mqnl.onrender.com/submit-answer",
-            {
-              method: "POST",
-              body: formData,
-            }
-          );
-          await res.json();
-        } catch (err) {
-          console.error("Evaluation error:", err);
+        if (answerSocket.readyState === WebSocket.OPEN) {
+          answerSocket.send(JSON.stringify({ type: "stop" }));
+        } else {
+          answerSocket.close();
+          await fallbackToUpload();
         }
       };
 
       mediaRecorderRef.current = recorder;
-      recorder.start();
+      recorder.start(1000);
       setIsRecording(true);
     }
   };
@@ -194,7 +254,9 @@ const Interview = () => {
   useEffect(() => {
     let ws;
     const connectWebSocket = () => {
-      ws = new WebSocket("ws://127.0.0.1:8000/face-confidence");
+      ws = new WebSocket(
+        `ws://127.0.0.1:8000/face-confidence?session_id=${getSessionId()}`
+      );
 
       ws.onopen = () => console.log("Connected to face-confidence WebSocket");
       ws.onmessage = (event) => {
@@ -203,6 +265,13 @@ const Interview = () => {
           if (data.face_confidence !== undefined) {
             setFaceConfidence(data.face_confidence);
           }
+          // Slow down capture when the server reports it can't keep up
+          if (data.server_fps) {
+            captureIntervalRef.current = Math.max(
+              MIN_CAPTURE_INTERVAL_MS,
+              1000 / data.server_fps
+            );
+          }
         } catch {}
       };
       ws.onclose = () => setTimeout(connectWebSocket, 2000);
@@ -218,18 +287,27 @@ const Interview = () => {
   }, []);
 
   useEffect(() => {
-    const interval = setInterval(() => {
+    let timeoutId;
+    const captureFrame = () => {
       if (videoRef.current && socket && socket.readyState === WebSocket.OPEN) {
         const canvas = document.createElement("canvas");
         canvas.width = videoRef.current.videoWidth;
         canvas.height = videoRef.current.videoHeight;
         const ctx = canvas.getContext("2d");
         ctx.drawImage(videoRef.current, 0, 0, canvas.width, canvas.height);
-        const image = canvas.toDataURL("image/jpeg");
-        socket.send(JSON.stringify({ image }));
+        // Send raw JPEG bytes as a binary frame instead of a base64 data URL
+        canvas.toBlob(
+          (blob) => {
+            if (blob && socket.readyState === WebSocket.OPEN) socket.send(blob);
+          },
+          "image/jpeg",
+          0.8
+        );
       }
-    }, 1000);
-    return () => clearInterval(interval);
+      timeoutId = setTimeout(captureFrame, captureIntervalRef.current);
+    };
+    timeoutId = setTimeout(captureFrame, captureIntervalRef.current);
+    return () => clearTimeout(timeoutId);
   }, [socket]);
 
   return (
@@ -30,7 +30,12 @@ const Results = () => {
     const fetchReport = async () => {
       try {
         const res = await fetch(
-          "https://mockai-mqnl.onrender.com/interview-report"
+          "https://mockai-mqnl.onrender.com/interview-report",
+          {
+            headers: {
+              "X-Session-Id": sessionStorage.getItem("interview-session-id") || "",
+            },
+          }
         );
         const data = await res.json();
         setReport(data);
@@ -53,7 +58,7 @@ const Results = () => {
       </Section>
     );
 
-  const { summary, evaluations, overall_feedback } = report;
+  const { summary, evaluations, overall_feedback, pending_answers } = report;
 
   // Data for bar chart visualization
   const data = {
@@ -112,6 +117,12 @@ const Results = () => {
       <div className="bg-white bg-opacity-10 rounded-lg p-6 shadow-lg">
         <h3 className="text-2xl font-semibold mb-4">Overall AI Feedback</h3>
         <p className="mb-6 text-lg">{overall_feedback}</p>
+        {pending_answers > 0 && (
+          <p className="mb-6 text-sm text-yellow-300">
+            {pending_answers} answer(s) couldn't be scored yet and aren't included.
+            Refresh this page in a moment to include them.
+          </p>
+        )}
 
         {/* Bar chart visualizing average scores */}
         <Bar data={data} options={options} />
@@ -151,7 +162,7 @@ const Results = () => {
               )}
               <div className="mt-2">
                 <p className="font-semibold text-green-300">Feedback:</p>
-                <p className="text-sm mb-2">{evalItem.feedback.gpt}</p>
+                <p className="text-sm mb-2">{evalItem.feedback.gpt ?? evalItem.feedback.claude}</p>
               </div>
             </div>
           ))}
@@ -57,6 +57,8 @@ const ResumeUploader = () => {
       }
 
       console.log("Upload success:", data);
+      // Identifies this interview on every later request
+      sessionStorage.setItem("interview-session-id", data.session_id);
       setIsUploaded(true);
     } catch (error) {
       console.error("Upload failed:", error);
@@ -98,7 +100,7 @@ const ResumeUploader = () => {
             </label>
             <input
               type="file"
-              accept=".pdf,.doc,.docx"
+              accept=".pdf,.docx"
               onChange={handleResumeChange}
               className="w-full p-3 border border-gray-300 rounded-lg shadow-sm text-white"
               required